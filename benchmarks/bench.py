@@ -0,0 +1,299 @@
+"""Benchmark suite for the cost engine, projections, figures and full reruns.
+
+Run from the repository root::
+
+    python benchmarks/bench.py                         # run everything, print a table
+    python benchmarks/bench.py --save results.json     # ... and save the results
+    python benchmarks/bench.py --baseline base.json --threshold 1.25
+    python benchmarks/bench.py --only engine,projection --quick --repeats 15
+
+Every benchmark reports the median time of one operation over several
+repeats.  With ``--baseline`` each result is compared to the stored one and
+the run exits with status 1 if any benchmark regressed.  The comparison
+uses the fastest repeat of each, which other load on the machine disturbs
+least, and widens ``--threshold`` by the spread between the repeats of
+either run, so a noisy benchmark needs a larger slowdown to fail.
+
+Timings only compare on one machine under the same load, so no baseline
+is kept in the repository.  Generate it from the base commit right before
+comparing, e.g. in CI::
+
+    git worktree add /tmp/base origin/main
+    python /tmp/base/benchmarks/bench.py --save /tmp/base.json
+    python benchmarks/bench.py --baseline /tmp/base.json
+
+The persistent result store is disabled, so cost functions are measured
+computing rather than reading earlier results back.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault('ECOMMERCE_RESULT_STORE', 'off')
+
+import numpy as np  # noqa: E402
+
+from ecommerce_costs import (  # noqa: E402
+    batch_platform_costs,
+    calculate_platform_costs,
+    clear_caches,
+    compile_catalog,
+    get_platform_data,
+    project_platform_costs,
+    quote_all_platforms,
+)
+
+APP = ROOT / 'ecomemrce.py'
+BUSINESS_SIZES = (
+    "Startup (0-100 products)",
+    "Small Business (100-1,000 products)",
+    "Medium Business (1,000-10,000 products)",
+    "Enterprise (10,000+ products)",
+)
+
+BENCHMARKS = {}
+
+
+def benchmark(group, name, unit='op'):
+    """Register ``func(quick) -> (callable, ops_per_call)`` under ``group/name``."""
+    def decorator(func):
+        BENCHMARKS[f'{group}/{name}'] = (group, func, unit)
+        return func
+    return decorator
+
+
+def measure(run, ops=1, repeats=7, min_time=0.05):
+    """Median seconds per operation of ``run`` (which performs ``ops`` operations)."""
+    run()  # warm up imports and caches that every real call would hit too
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            run()
+        if time.perf_counter() - start >= min_time or loops >= 1 << 20:
+            break
+        loops *= 4
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(loops):
+            run()
+        samples.append((time.perf_counter() - start) / (loops * ops))
+    return {'seconds': statistics.median(samples), 'min': min(samples), 'max': max(samples),
+            'repeats': repeats, 'loops': loops}
+
+
+# Cost engine
+
+@benchmark('engine', 'calculate_platform_costs', unit='platform quote')
+def bench_calculate_platform_costs(quick):
+    platforms = list(get_platform_data().items())
+    revenues = np.linspace(0, 500_000, 50)
+
+    def run():
+        for revenue in revenues:
+            for name, data in platforms:
+                calculate_platform_costs(name, data, revenue, BUSINESS_SIZES[1])
+    return run, len(revenues) * len(platforms)
+
+
+@benchmark('engine', 'quote_all_platforms', unit='scenario')
+def bench_quote_all_platforms(quick):
+    catalog = compile_catalog(get_platform_data())
+    return lambda: quote_all_platforms(catalog, 25_000.0, BUSINESS_SIZES[2]), 1
+
+
+@benchmark('engine', 'batch_platform_costs', unit='platform quote')
+def bench_batch_platform_costs(quick):
+    catalog = compile_catalog(get_platform_data())
+    n = 100_000 if quick else 1_000_000
+    rng = np.random.default_rng(0)
+    revenue = rng.uniform(0, 500_000, n)[:, None]
+    size = rng.integers(0, len(BUSINESS_SIZES), n)[:, None]
+    platforms = np.arange(len(catalog.platforms))
+    return lambda: batch_platform_costs(catalog, revenue, size, platforms), n * len(platforms)
+
+
+# ROI projection scaling with projection_months
+
+def _projection_benchmark(months):
+    def setup(quick):
+        catalog = compile_catalog(get_platform_data())
+        costs = quote_all_platforms(catalog, 25_000.0, BUSINESS_SIZES[1])
+        return lambda: project_platform_costs(costs, 25_000.0, 10.0, months), 1
+    return setup
+
+
+for _months in (12, 60, 240, 1200):
+    benchmark('projection', f'months={_months}', unit='projection')(_projection_benchmark(_months))
+
+
+# Figure construction (memoization bypassed)
+
+@benchmark('figures', 'dashboard figures', unit='page of figures')
+def bench_figures(quick):
+    from ecommerce_costs import figures
+
+    catalog = compile_catalog(get_platform_data())
+    costs = quote_all_platforms(catalog, 25_000.0, BUSINESS_SIZES[1])
+    projection = project_platform_costs(costs, 25_000.0, 10.0, 36)
+
+    def run():
+        figures.build_total_cost_figure.__wrapped__(costs, 'total_monthly', 'Monthly', 'USD', 'viridis')
+        figures.build_total_cost_figure.__wrapped__(costs, 'annual_cost', 'Annual', 'USD', 'plasma')
+        figures.build_breakdown_figure.__wrapped__(costs)
+        for name in costs:
+            figures.build_pie_figure.__wrapped__(costs, name)
+        figures.build_projection_figure.__wrapped__(tuple(costs), projection)
+    return run, 1
+
+
+# Full-page reruns through Streamlit's app-testing harness
+
+SLIDER_SETTINGS = [
+    {'business_size': BUSINESS_SIZES[0], 'revenue': 2_000},
+    {'business_size': BUSINESS_SIZES[1], 'revenue': 25_000},
+    {'business_size': BUSINESS_SIZES[2], 'revenue': 150_000, 'plan': 'Cheapest plan at this revenue'},
+    {'business_size': BUSINESS_SIZES[3], 'revenue': 480_000},
+]
+
+
+def _app_test():
+    from streamlit.testing.v1 import AppTest
+    return AppTest.from_file(str(APP), default_timeout=120)
+
+
+def _apply(at, setting):
+    at.sidebar.selectbox[0].set_value(setting['business_size'])
+    at.sidebar.slider[0].set_value(setting['revenue'])
+    at.sidebar.radio[0].set_value(setting.get('plan', 'By business size'))
+
+
+@benchmark('app', 'cold rerun', unit='rerun')
+def bench_cold_rerun(quick):
+    def run():
+        clear_caches()
+        at = _app_test().run()
+        assert not at.exception, at.exception
+    return run, 1
+
+
+@benchmark('app', 'slider reruns', unit='rerun')
+def bench_slider_reruns(quick):
+    at = _app_test().run()
+    settings = SLIDER_SETTINGS[:2] if quick else SLIDER_SETTINGS
+
+    def run():
+        for setting in settings:
+            _apply(at, setting)
+            at.run()
+            assert not at.exception, at.exception
+    return run, len(settings)
+
+
+def run_benchmarks(names, quick, repeats=None):
+    results = {}
+    for name in names:
+        group, setup, unit = BENCHMARKS[name]
+        run, ops = setup(quick)
+        result = measure(run, ops, repeats=repeats or (3 if quick or group == 'app' else 7),
+                         min_time=0.01 if quick else 0.05)
+        result['unit'] = unit
+        results[name] = result
+        print(f"{name:42s} {_format_seconds(result['seconds']):>12s} / {unit}", file=sys.stderr)
+    return results
+
+
+def _format_seconds(seconds):
+    for scale, suffix in ((1, 's'), (1e-3, 'ms'), (1e-6, 'us')):
+        if seconds >= scale:
+            return f'{seconds / scale:.2f} {suffix}'
+    return f'{seconds / 1e-9:.1f} ns'
+
+
+def environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def noise(result):
+    """Relative spread between a result's fastest and slowest repeat."""
+    return result.get('max', result['min']) / result['min'] - 1
+
+
+def compare(results, baseline, threshold):
+    """Print current vs baseline; return the names that regressed.
+
+    A benchmark regressed when its fastest repeat is more than ``threshold``
+    times the baseline's, widened by the noise of the noisier run.
+    """
+    regressions = []
+    print(f"\n{'benchmark':42s} {'baseline':>12s} {'current':>12s} {'ratio':>7s} {'allowed':>8s}")
+    for name, result in results.items():
+        reference = baseline['results'].get(name)
+        if reference is None:
+            print(f"{name:42s} {'-':>12s} {_format_seconds(result['min']):>12s}      new")
+            continue
+        ratio = result['min'] / reference['min']
+        allowed = threshold * (1 + max(noise(result), noise(reference)))
+        flag = '  SLOWER' if ratio > allowed else ''
+        print(f"{name:42s} {_format_seconds(reference['min']):>12s} "
+              f"{_format_seconds(result['min']):>12s} {ratio:6.2f}x {allowed:7.2f}x{flag}")
+        if ratio > allowed:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--only', help='comma-separated groups or benchmark names '
+                                       f"(groups: {', '.join(sorted({g for g, _, _ in BENCHMARKS.values()}))})")
+    parser.add_argument('--quick', action='store_true', help='smaller inputs and fewer repeats')
+    parser.add_argument('--save', type=Path, help='write results to this JSON file')
+    parser.add_argument('--baseline', type=Path, help='compare against this saved JSON file')
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help='fail when current / baseline time exceeds this ratio, widened by the '
+                             'benchmarks\' noise (default: 1.25)')
+    parser.add_argument('--repeats', type=int,
+                        help='repeats per benchmark (default: 7, or 3 for --quick and app reruns)')
+    args = parser.parse_args(argv)
+
+    names = list(BENCHMARKS)
+    if args.only:
+        wanted = set(args.only.split(','))
+        names = [name for name in names if name in wanted or BENCHMARKS[name][0] in wanted]
+
+    report = {'environment': environment(), 'quick': args.quick, 'results': run_benchmarks(names, args.quick, args.repeats)}
+    if args.save:
+        args.save.write_text(json.dumps(report, indent=2) + '\n')
+    if args.baseline:
+        regressions = compare(report['results'], json.loads(args.baseline.read_text()), args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) slower than the baseline beyond the allowed ratio: "
+                  f"{', '.join(regressions)}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
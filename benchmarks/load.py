@@ -0,0 +1,215 @@
+"""Concurrent-session load test for the dashboard.
+
+Run from the repository root::
+
+    python benchmarks/load.py                            # 1, 2, 4 and 8 sessions
+    python benchmarks/load.py --sessions 1,4,16 --reruns 30 --save load.json
+
+For each session count N, N simulated browser sessions share one process,
+as they do behind one Streamlit server: each is an ``AppTest`` client on its
+own thread that keeps moving a random sidebar widget and rerunning the
+script.  The report gives per-rerun latency percentiles, throughput, the
+process's resident memory, and the memory each session adds on top of the
+shared state (the compiled catalog, plan breakpoints and cached results).
+
+Every session count runs in a fresh child process, so memory figures do not
+carry over between them.  A warm-up session runs first and is not counted:
+its rerun fills the shared caches that any live server would already hold.
+AppTest keeps each session's rendered elements on the client side, so the
+per-session figure somewhat overstates what a real server holds.
+
+The persistent result store is disabled, so reruns compute rather than read
+earlier results back.
+"""
+import argparse
+import ast
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault('ECOMMERCE_RESULT_STORE', 'off')
+
+import numpy as np  # noqa: E402
+
+from ecommerce_costs.instrumentation import resident_memory  # noqa: E402
+
+APP = ROOT / 'ecomemrce.py'
+BUSINESS_SIZES = (
+    "Startup (0-100 products)",
+    "Small Business (100-1,000 products)",
+    "Medium Business (1,000-10,000 products)",
+    "Enterprise (10,000+ products)",
+)
+PLAN_SELECTIONS = ("By business size", "Cheapest plan at this revenue")
+
+# CPython 3.11's AST constructor is not safe to use from several threads at
+# once (gh-106905), and each AppTest run compiles the script
+_parse, _parse_lock = ast.parse, threading.Lock()
+
+
+def _locked_parse(*args, **kwargs):
+    with _parse_lock:
+        return _parse(*args, **kwargs)
+
+
+ast.parse = _locked_parse
+
+
+def _enable_app_testing():
+    # AppTest.run patches config.get_option for the duration of each run;
+    # with runs overlapping on several threads the patches unwind out of
+    # order, so set the option for the whole process instead
+    from streamlit import config
+    config.set_option('global.appTest', True)
+
+
+# Widget moves, on the value grid each sidebar widget allows
+
+def _revenue(at, rng):
+    at.sidebar.slider[0].set_value(rng.randrange(0, 500_001, 1000))
+
+
+def _products(at, rng):
+    at.sidebar.slider[1].set_value(rng.randrange(1, 50_001, 50))
+
+
+def _traffic(at, rng):
+    at.sidebar.slider[2].set_value(rng.randrange(100, 1_000_001, 1000))
+
+
+def _business_size(at, rng):
+    at.sidebar.selectbox[0].set_value(rng.choice(BUSINESS_SIZES))
+
+
+def _plan_selection(at, rng):
+    at.sidebar.radio[0].set_value(rng.choice(PLAN_SELECTIONS))
+
+
+MOVES = (_revenue, _revenue, _traffic, _products, _business_size, _plan_selection)
+
+
+def _app_test():
+    from streamlit.testing.v1 import AppTest
+    return AppTest.from_file(str(APP), default_timeout=300)
+
+
+def _session(index, reruns, seed, ready, go, latencies, errors, keep):
+    try:
+        rng = random.Random(seed * 1_000_003 + index)
+        at = _app_test().run()
+        keep.append(at)
+        ready.wait()          # every session is up: memory is measured here
+        go.wait()
+        for _ in range(reruns):
+            rng.choice(MOVES)(at, rng)
+            start = time.perf_counter()
+            at.run()
+            latencies.append(time.perf_counter() - start)
+            if at.exception:
+                errors.append(str(at.exception[0].message))
+    except Exception as exc:  # reported, not raised: the other sessions keep going
+        errors.append(repr(exc))
+        ready.abort()
+
+
+def run_level(sessions, reruns, seed):
+    """Run ``sessions`` concurrent sessions in this process and return the measurements."""
+    _enable_app_testing()
+    warm = _app_test().run()
+    if warm.exception:
+        raise RuntimeError(f"warm-up run failed: {warm.exception[0].message}")
+    del warm
+    baseline, _ = resident_memory()
+
+    ready = threading.Barrier(sessions + 1)
+    go = threading.Event()
+    latencies, errors, keep = [], [], []
+    threads = [
+        threading.Thread(target=_session, args=(i, reruns, seed, ready, go, latencies, errors, keep), daemon=True)
+        for i in range(sessions)
+    ]
+    for thread in threads:
+        thread.start()
+    try:
+        ready.wait()
+    except threading.BrokenBarrierError:
+        pass
+    loaded, _ = resident_memory()
+
+    start = time.perf_counter()
+    go.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    final, peak = resident_memory()
+
+    latencies = np.array(latencies)
+    return {
+        'sessions': sessions,
+        'reruns': len(latencies),
+        'errors': errors[:10],
+        'p50_ms': float(np.percentile(latencies, 50) * 1000) if len(latencies) else None,
+        'p99_ms': float(np.percentile(latencies, 99) * 1000) if len(latencies) else None,
+        'max_ms': float(latencies.max() * 1000) if len(latencies) else None,
+        'reruns_per_second': len(latencies) / elapsed if elapsed else None,
+        'rss_baseline_mb': baseline / 2**20 if baseline is not None else None,
+        'rss_mb': final / 2**20 if final is not None else None,
+        'rss_peak_mb': peak / 2**20 if peak is not None else None,
+        'per_session_kb': (loaded - baseline) / sessions / 1024 if None not in (loaded, baseline) else None,
+    }
+
+
+def _format(value, spec):
+    return '-' if value is None else format(value, spec)
+
+
+def print_table(results):
+    print(f"\n{'sessions':>8s} {'reruns':>7s} {'p50 ms':>8s} {'p99 ms':>8s} {'reruns/s':>9s} "
+          f"{'RSS MB':>8s} {'peak MB':>8s} {'KB/session':>11s}")
+    for r in results:
+        print(f"{r['sessions']:8d} {r['reruns']:7d} {_format(r['p50_ms'], '8.0f')} {_format(r['p99_ms'], '8.0f')} "
+              f"{_format(r['reruns_per_second'], '9.1f')} {_format(r['rss_mb'], '8.0f')} "
+              f"{_format(r['rss_peak_mb'], '8.0f')} {_format(r['per_session_kb'], '11.0f')}")
+        for error in r['errors']:
+            print(f"{'':8s} error: {error}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--sessions', default='1,2,4,8', help='comma-separated session counts (default: 1,2,4,8)')
+    parser.add_argument('--reruns', type=int, default=20, help='reruns per session (default: 20)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--save', type=Path, help='write results to this JSON file')
+    parser.add_argument('--level', type=int, help=argparse.SUPPRESS)   # child process: run one level
+    args = parser.parse_args(argv)
+
+    if args.level is not None:
+        print(json.dumps(run_level(args.level, args.reruns, args.seed)))
+        return 0
+
+    results = []
+    for sessions in (int(n) for n in args.sessions.split(',')):
+        print(f"{sessions} session(s)...", file=sys.stderr)
+        child = subprocess.run(
+            [sys.executable, __file__, '--level', str(sessions), '--reruns', str(args.reruns), '--seed', str(args.seed)],
+            capture_output=True, text=True, check=True,
+        )
+        results.append(json.loads(child.stdout.strip().splitlines()[-1]))
+    print_table(results)
+
+    if args.save:
+        from bench import environment
+        args.save.write_text(json.dumps({'environment': environment(), 'reruns': args.reruns,
+                                         'results': results}, indent=2) + '\n')
+    return 1 if any(r['errors'] for r in results) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,197 @@
+"""HTTP load test for the quoting service.
+
+Run from the repository root::
+
+    python benchmarks/service_load.py                    # check the documented target
+    python benchmarks/service_load.py --connections 64 --duration 20 --save service.json
+
+Starts the service under uvicorn in a child process, then keeps
+``--connections`` keep-alive connections busy for ``--duration`` seconds
+each, in three runs:
+
+* ``quote (repeat)``: single quotes drawn from a small set of scenarios, so
+  almost every request is answered from the response cache;
+* ``quote (unique)``: single quotes that never repeat, so every request is
+  priced;
+* ``quotes x1000``: batches of 1,000 unique scenarios.
+
+The client speaks raw HTTP/1.1 over asyncio streams, so it needs nothing
+beyond the standard library; it shares the machine with the server, which
+makes the figures conservative.  The run exits with status 1 when the
+target documented in ``ecommerce_costs.service`` is missed: ``--target-rps``
+cached and ``--target-priced-rps`` priced single quotes per second, each
+with a p99 under ``--target-p99-ms``, and a batch p50 under
+``--target-batch-ms``.
+
+The persistent result store is disabled, as in the other benchmarks.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault('ECOMMERCE_RESULT_STORE', 'off')
+
+import numpy as np  # noqa: E402
+
+BUSINESS_SIZES = ('Startup', 'Small', 'Medium', 'Enterprise')
+
+
+def _scenario(rng):
+    scenario = {'monthly_revenue': round(rng.uniform(0, 500_000), 2),
+                'plan_selection': rng.choice(('size', 'cheapest'))}
+    if rng.random() < 0.5:
+        scenario['num_products'] = rng.randrange(1, 50_000)
+        scenario['monthly_traffic'] = rng.randrange(100, 1_000_000)
+    else:
+        scenario['business_size'] = rng.choice(BUSINESS_SIZES)
+    return scenario
+
+
+def _request(path, body):
+    payload = json.dumps(body).encode()
+    return (f'POST {path} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n'
+            f'Content-Length: {len(payload)}\r\n\r\n').encode() + payload
+
+
+async def _read_response(reader):
+    head = await reader.readuntil(b'\r\n\r\n')
+    status = int(head.split(b' ', 2)[1])
+    length = 0
+    for line in head.split(b'\r\n')[1:]:
+        name, _, value = line.partition(b':')
+        if name.strip().lower() == b'content-length':
+            length = int(value)
+    await reader.readexactly(length)
+    return status
+
+
+async def _connection(port, requests, deadline, latencies, errors):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    try:
+        while time.perf_counter() < deadline:
+            request = next(requests)
+            start = time.perf_counter()
+            writer.write(request)
+            await writer.drain()
+            status = await _read_response(reader)
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+async def _run(port, requests, connections, duration):
+    latencies, errors = [], []
+    start = time.perf_counter()
+    deadline = start + duration
+    await asyncio.gather(*(_connection(port, requests, deadline, latencies, errors) for _ in range(connections)))
+    elapsed = time.perf_counter() - start
+    latencies = np.array(latencies)
+    return {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'requests_per_second': len(latencies) / elapsed,
+        'p50_ms': float(np.percentile(latencies, 50) * 1000),
+        'p99_ms': float(np.percentile(latencies, 99) * 1000),
+    }
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _start_server(port):
+    server = subprocess.Popen([sys.executable, '-m', 'ecommerce_costs.service', '--port', str(port)], cwd=ROOT)
+    for _ in range(200):
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.1).close()
+            return server
+        except OSError:
+            if server.poll() is not None:
+                raise RuntimeError('the service exited on start-up')
+            time.sleep(0.05)
+    server.terminate()
+    raise RuntimeError('the service did not start listening')
+
+
+def workloads(seed, batch_size):
+    rng = random.Random(seed)
+    repeated = [_request('/quote', _scenario(rng)) for _ in range(200)]
+    return {
+        'quote (repeat)': lambda: itertools.cycle(repeated),
+        'quote (unique)': lambda: (_request('/quote', _scenario(rng)) for _ in itertools.count()),
+        f'quotes x{batch_size}': lambda: (
+            _request('/quotes', {'scenarios': [_scenario(rng) for _ in range(batch_size)]})
+            for _ in itertools.count()
+        ),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--connections', type=int, default=16, help='concurrent connections (default: 16)')
+    parser.add_argument('--duration', type=float, default=10.0, help='seconds per run (default: 10)')
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--target-rps', type=float, default=2000)
+    parser.add_argument('--target-priced-rps', type=float, default=600)
+    parser.add_argument('--target-p99-ms', type=float, default=50)
+    parser.add_argument('--target-batch-ms', type=float, default=250)
+    parser.add_argument('--save', type=Path, help='write results to this JSON file')
+    args = parser.parse_args(argv)
+
+    port = _free_port()
+    server = _start_server(port)
+    results = {}
+    try:
+        for name, requests in workloads(args.seed, args.batch_size).items():
+            # Batches are timed one at a time: their latency is the figure
+            connections = 1 if name.startswith('quotes') else args.connections
+            asyncio.run(_run(port, requests(), connections, min(1.0, args.duration)))   # warm up
+            results[name] = {'connections': connections,
+                             **asyncio.run(_run(port, requests(), connections, args.duration))}
+            print(f"{name} done", file=sys.stderr)
+    finally:
+        server.terminate()
+        server.wait()
+
+    print(f"\n{'workload':16s} {'conns':>5s} {'requests':>9s} {'req/s':>8s} {'p50 ms':>8s} {'p99 ms':>8s} {'errors':>6s}")
+    for name, r in results.items():
+        print(f"{name:16s} {r['connections']:5d} {r['requests']:9d} {r['requests_per_second']:8.0f} "
+              f"{r['p50_ms']:8.1f} {r['p99_ms']:8.1f} {r['errors']:6d}")
+
+    if args.save:
+        from bench import environment
+        args.save.write_text(json.dumps({'environment': environment(), 'results': results}, indent=2) + '\n')
+
+    failures = []
+    for name, target_rps in (('quote (repeat)', args.target_rps), ('quote (unique)', args.target_priced_rps)):
+        r = results[name]
+        if r['requests_per_second'] < target_rps or r['p99_ms'] > args.target_p99_ms:
+            failures.append(f"{name}: {r['requests_per_second']:.0f} req/s, p99 {r['p99_ms']:.1f} ms "
+                            f"(target {target_rps:.0f} req/s, p99 {args.target_p99_ms:.0f} ms)")
+    batch = results[f'quotes x{args.batch_size}']
+    if batch['p50_ms'] > args.target_batch_ms:
+        failures.append(f"quotes x{args.batch_size}: p50 {batch['p50_ms']:.0f} ms (target {args.target_batch_ms:.0f} ms)")
+    if any(r['errors'] for r in results.values()):
+        failures.append('some requests failed')
+    for failure in failures:
+        print(f"missed: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
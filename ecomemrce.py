@@ -1,10 +1,26 @@
+import tempfile
+from pathlib import Path
+
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 import numpy as np
 
+from ecommerce_costs import cache_stats, clear_caches, get_platform_data, get_store
+from ecommerce_costs.api import get_compiled_catalog
+from ecommerce_costs.bulk import quote_file
+from ecommerce_costs.cache import get_cache, make_key
+from ecommerce_costs.figures import (
+    build_break_even_probability_figure, build_pie_figure, build_risk_band_figure, build_sensitivity_figures,
+)
+from ecommerce_costs.frame import platform_row, results_frame
+from ecommerce_costs.instrumentation import (
+    RerunProfile, configure_profile_log, deep_sizeof, render_prometheus, resident_memory, start_metrics_server,
+)
+from ecommerce_costs.montecarlo import RiskAssumptions, simulate_platform_costs
+from ecommerce_costs.pipeline import DASHBOARD, PipelineState
+from ecommerce_costs.report import ReportScenario, pdf_available, start_report
+from ecommerce_costs.workspace import METRICS, Scenario, ScenarioWorkspace
+
 # Page configuration
 st.set_page_config(
     page_title="Ecommerce Cost Calculator - Qatar Business",
@@ -13,6 +29,14 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Rerun logs and a Prometheus /metrics endpoint, when enabled in the
+# environment (ECOMMERCE_PROFILE_LOG, ECOMMERCE_METRICS_PORT); set up once per process
+configure_profile_log()
+metrics_server = start_metrics_server()
+
+# Section timings for the profiling panel; cProfile only when requested
+profile = RerunProfile(cprofile=st.session_state.pop("profile_next_rerun", False))
+
 # Custom CSS for better styling
 st.markdown("""
 <style>
@@ -53,10 +77,9 @@ st.markdown('<p style="text-align: center; font-size: 1.2rem; color: #666;">For
 st.sidebar.header("📊 Business Parameters")
 
 # Business size selection
-business_size = st.sidebar.selectbox(
-    "Business Size",
-    ["Startup (0-100 products)", "Small Business (100-1,000 products)", "Medium Business (1,000-10,000 products)", "Enterprise (10,000+ products)"]
-)
+BUSINESS_SIZE_OPTIONS = ["Startup (0-100 products)", "Small Business (100-1,000 products)",
+                         "Medium Business (1,000-10,000 products)", "Enterprise (10,000+ products)"]
+business_size = st.sidebar.selectbox("Business Size", BUSINESS_SIZE_OPTIONS)
 
 # Monthly revenue slider
 monthly_revenue = st.sidebar.slider(
@@ -99,182 +122,33 @@ business_type = st.sidebar.selectbox(
     ["B2C Retail", "B2B Wholesale", "Digital Products", "Subscription", "Marketplace"]
 )
 
-# Platform comparison data
-def get_platform_data():
-    return {
-        'Shopify': {
-            'plans': {
-                'Basic': {'monthly': 39, 'transaction_fee': 0.029, 'products': 'Unlimited'},
-                'Shopify': {'monthly': 105, 'transaction_fee': 0.025, 'products': 'Unlimited'},
-                'Advanced': {'monthly': 399, 'transaction_fee': 0.022, 'products': 'Unlimited'},
-                'Plus': {'monthly': 2500, 'transaction_fee': 0.015, 'products': 'Unlimited'}
-            },
-            'additional_costs': {
-                'theme': 300,  # One-time premium theme
-                'apps_basic': 150,  # Monthly for essential apps
-                'apps_advanced': 500,  # Monthly for advanced apps
-                'third_party_gateway': 0.02,  # Additional fee for Qatar (no Shopify Payments)
-                'international_fee': 0.015,  # Currency conversion
-                'ssl': 0  # Included
-            },
-            'pros': ['Easy setup', 'Great app ecosystem', 'International features', 'Reliable hosting'],
-            'cons': ['No Shopify Payments in Qatar', 'Transaction fees', 'Limited customization', '2024 price increases']
-        },
-        'WooCommerce': {
-            'plans': {
-                'Starter': {'monthly': 25, 'transaction_fee': 0, 'products': 'Unlimited'},
-                'Growth': {'monthly': 100, 'transaction_fee': 0, 'products': 'Unlimited'},
-                'Scale': {'monthly': 300, 'transaction_fee': 0, 'products': 'Unlimited'},
-                'Enterprise': {'monthly': 1500, 'transaction_fee': 0, 'products': 'Unlimited'}
-            },
-            'additional_costs': {
-                'hosting': 50,  # Monthly hosting cost
-                'plugins': 100,  # Monthly for essential plugins
-                'security': 25,  # Monthly security plugins
-                'ssl': 10,  # Monthly SSL certificate
-                'maintenance': 200,  # Monthly maintenance/updates
-                'payment_gateway': 0.025  # Dibsy for Qatar
-            },
-            'pros': ['Full customization', 'No transaction fees', 'Open source', 'Qatar payment gateways'],
-            'cons': ['Requires technical expertise', 'Hosting costs', 'Security responsibility', 'Maintenance overhead']
-        },
-        'Custom Next.js': {
-            'plans': {
-                'Startup': {'monthly': 150, 'transaction_fee': 0, 'products': 'Unlimited'},
-                'Small': {'monthly': 500, 'transaction_fee': 0, 'products': 'Unlimited'},
-                'Medium': {'monthly': 2000, 'transaction_fee': 0, 'products': 'Unlimited'},
-                'Enterprise': {'monthly': 5000, 'transaction_fee': 0, 'products': 'Unlimited'}
-            },
-            'additional_costs': {
-                'development': 10000,  # One-time development cost
-                'database': 100,  # Monthly database cost
-                'cdn': 50,  # Monthly CDN cost
-                'monitoring': 100,  # Monthly monitoring tools
-                'email_service': 20,  # Monthly email service
-                'stripe_fee': 0.029,  # Stripe processing fee
-                'international_fee': 0.015  # International card fee
-            },
-            'pros': ['Ultimate flexibility', 'Best performance', 'Full control', 'Scalable architecture'],
-            'cons': ['High development cost', 'Technical expertise required', 'Infrastructure management', 'Longer time to market']
-        },
-        'BigCommerce': {
-            'plans': {
-                'Standard': {'monthly': 29, 'transaction_fee': 0, 'products': 'Unlimited'},
-                'Plus': {'monthly': 79, 'transaction_fee': 0, 'products': 'Unlimited'},
-                'Pro': {'monthly': 299, 'transaction_fee': 0, 'products': 'Unlimited'},
-                'Enterprise': {'monthly': 1000, 'transaction_fee': 0, 'products': 'Unlimited'}
-            },
-            'additional_costs': {
-                'payment_processing': 0.0259,  # Base processing fee
-                'international_fee': 0.015,  # International transactions
-                'apps': 100,  # Monthly apps cost
-                'theme': 200,  # One-time theme cost
-                'ssl': 0  # Included
-            },
-            'pros': ['No transaction fees', 'Built-in features', 'Auto-scaling', 'Good API'],
-            'cons': ['Limited themes', 'Revenue-based plan upgrades', 'Fewer apps than Shopify', 'Complex pricing tiers']
-        },
-        'Wix': {
-            'plans': {
-                'Core': {'monthly': 29, 'transaction_fee': 0.029, 'products': 'Unlimited'},
-                'Business': {'monthly': 36, 'transaction_fee': 0.029, 'products': 'Unlimited'},
-                'Business Elite': {'monthly': 159, 'transaction_fee': 0.029, 'products': 'Unlimited'}
-            },
-            'additional_costs': {
-                'payment_processing': 0.029,  # Wix Payments
-                'international_fee': 0.025,  # International transactions
-                'apps': 50,  # Monthly apps cost
-                'ssl': 0  # Included
-            },
-            'pros': ['Easy drag-and-drop', 'Included hosting', 'Good templates', 'All-in-one solution'],
-            'cons': ['Limited scalability', 'Fewer ecommerce features', 'Limited customization', 'Vendor lock-in']
-        },
-        'Squarespace': {
-            'plans': {
-                'Basic': {'monthly': 16, 'transaction_fee': 0.03, 'products': 'Unlimited'},
-                'Commerce': {'monthly': 29, 'transaction_fee': 0.03, 'products': 'Unlimited'},
-                'Advanced': {'monthly': 99, 'transaction_fee': 0, 'products': 'Unlimited'}
-            },
-            'additional_costs': {
-                'payment_processing': 0.029,  # Stripe processing
-                'international_fee': 0.015,  # International transactions
-                'ssl': 0,  # Included
-                'apps': 30  # Limited app ecosystem
-            },
-            'pros': ['Beautiful templates', 'Included hosting', 'Good for content', 'Simple pricing'],
-            'cons': ['Limited apps', 'Basic ecommerce features', 'Not for high volume', 'Limited integrations']
-        }
-    }
+# Plan selection strategy
+PLAN_SELECTIONS = {"By business size": "size", "Cheapest plan at this revenue": "cheapest"}
+plan_selection = st.sidebar.radio(
+    "Plan Selection",
+    list(PLAN_SELECTIONS),
+    help="Pick each platform's plan by business size, or the plan that costs least at the expected revenue"
+)
 
-# Calculate costs based on parameters
-def calculate_platform_costs(platform_name, platform_data, monthly_revenue, business_size):
-    plans = platform_data['plans']
-    additional = platform_data['additional_costs']
-    
-    # Determine appropriate plan based on business size and revenue
-    if business_size.startswith("Startup"):
-        plan_name = list(plans.keys())[0]  # First plan
-    elif business_size.startswith("Small"):
-        plan_name = list(plans.keys())[min(1, len(plans)-1)]  # Second plan or last
-    elif business_size.startswith("Medium"):
-        plan_name = list(plans.keys())[min(2, len(plans)-1)]  # Third plan or last
-    else:  # Enterprise
-        plan_name = list(plans.keys())[-1]  # Last plan
-    
-    plan = plans[plan_name]
-    
-    # Calculate monthly costs
-    monthly_platform = plan['monthly']
-    
-    # Transaction fees
-    transaction_volume = monthly_revenue
-    base_transaction_fee = plan['transaction_fee']
-    
-    # Additional fees specific to Qatar
-    if platform_name == 'Shopify':
-        # No Shopify Payments in Qatar, must use third-party
-        total_transaction_rate = base_transaction_fee + additional.get('third_party_gateway', 0) + additional.get('international_fee', 0)
-        monthly_apps = additional['apps_basic'] if business_size.startswith("Startup") else additional['apps_advanced']
-        monthly_additional = monthly_apps
-        one_time = additional['theme']
-    elif platform_name == 'WooCommerce':
-        total_transaction_rate = additional['payment_gateway']  # Dibsy for Qatar
-        monthly_additional = additional['hosting'] + additional['plugins'] + additional['security'] + additional['ssl'] + additional['maintenance']
-        one_time = 0
-    elif platform_name == 'Custom Next.js':
-        total_transaction_rate = additional['stripe_fee'] + additional['international_fee']
-        monthly_additional = additional['database'] + additional['cdn'] + additional['monitoring'] + additional['email_service']
-        one_time = additional['development']
-    else:
-        total_transaction_rate = base_transaction_fee + additional.get('international_fee', 0)
-        monthly_additional = additional.get('apps', 0)
-        one_time = additional.get('theme', 0)
-    
-    monthly_transaction_fees = transaction_volume * total_transaction_rate
-    
-    total_monthly = monthly_platform + monthly_additional + monthly_transaction_fees
-    annual_cost = total_monthly * 12 + one_time
-    
-    return {
-        'plan_name': plan_name,
-        'monthly_platform': monthly_platform,
-        'monthly_additional': monthly_additional,
-        'monthly_transaction_fees': monthly_transaction_fees,
-        'total_monthly': total_monthly,
-        'annual_cost': annual_cost,
-        'one_time_costs': one_time,
-        'transaction_rate': total_transaction_rate
-    }
+profile.lap("sidebar")
 
 # Main dashboard
 platforms_data = get_platform_data()
-
-# Calculate costs for all platforms
-platform_costs = {}
-for platform_name, platform_data in platforms_data.items():
-    platform_costs[platform_name] = calculate_platform_costs(
-        platform_name, platform_data, monthly_revenue, business_size
-    )
+catalog = get_compiled_catalog()
+
+# Everything below is computed through the session's pipeline: only nodes
+# downstream of an input that changed since the last run are recomputed
+pipeline = st.session_state.get("pipeline")
+if pipeline is None:
+    pipeline = st.session_state.pipeline = PipelineState(DASHBOARD)
+pipeline.begin_run()
+pipeline.set(catalog=catalog, business_size=business_size, monthly_revenue=monthly_revenue,
+             num_products=num_products, monthly_traffic=monthly_traffic, market_focus=market_focus,
+             business_type=business_type, plan_selection=PLAN_SELECTIONS[plan_selection])
+
+# Costs for all platforms in one vectorized pass
+platform_costs = pipeline.get('platform_costs')
+profile.lap("costs")
 
 # Display key metrics
 col1, col2, col3, col4 = st.columns(4)
@@ -292,132 +166,115 @@ with col4:
     st.metric("Monthly Traffic", f"{monthly_traffic:,}")
 
 st.markdown("---")
+profile.lap("metrics")
 
 # Platform comparison section
 st.header("💰 Platform Cost Comparison")
 
-# Create comparison table
-comparison_data = []
-for platform_name, costs in platform_costs.items():
-    comparison_data.append({
-        'Platform': platform_name,
-        'Plan': costs['plan_name'],
-        'Monthly Platform Fee': f"${costs['monthly_platform']:.0f}",
-        'Monthly Additional': f"${costs['monthly_additional']:.0f}",
-        'Transaction Fees': f"${costs['monthly_transaction_fees']:.0f}",
-        'Total Monthly': f"${costs['total_monthly']:.0f}",
-        'Annual Cost': f"${costs['annual_cost']:.0f}",
-        'Transaction Rate': f"{costs['transaction_rate']:.1%}"
-    })
-
-df_comparison = pd.DataFrame(comparison_data)
-st.dataframe(df_comparison, use_container_width=True)
+# Comparison table: the numeric results frame, formatted only for display
+results = pipeline.get('results')
+usd = "$%.0f"
+st.dataframe(
+    results,
+    column_config={
+        'platform': st.column_config.TextColumn("Platform"),
+        'plan': st.column_config.TextColumn("Plan"),
+        'monthly_platform': st.column_config.NumberColumn("Monthly Platform Fee", format=usd),
+        'monthly_additional': st.column_config.NumberColumn("Monthly Additional", format=usd),
+        'monthly_usage': st.column_config.NumberColumn(
+            "Usage-based", format=usd, help="Traffic- and catalog-driven infrastructure, included in Monthly Additional"
+        ),
+        'monthly_transaction_fees': st.column_config.NumberColumn("Transaction Fees", format=usd),
+        'total_monthly': st.column_config.NumberColumn("Total Monthly", format=usd),
+        'annual_cost': st.column_config.NumberColumn("Annual Cost", format=usd),
+        'one_time_costs': None,
+        'transaction_rate': st.column_config.NumberColumn("Transaction Rate", format="percent"),
+        'runner_up_plan': st.column_config.TextColumn("Runner-up Plan"),
+        'runner_up_margin': st.column_config.NumberColumn("Saving vs Runner-up", format=usd),
+    },
+    hide_index=True,
+    use_container_width=True,
+)
+profile.lap("comparison table")
 
 # Cost breakdown charts
 col1, col2 = st.columns(2)
 
 with col1:
     # Monthly cost breakdown
-    monthly_costs = [costs['total_monthly'] for costs in platform_costs.values()]
-    platform_names = list(platform_costs.keys())
-    
-    fig_monthly = px.bar(
-        x=platform_names,
-        y=monthly_costs,
-        title="Monthly Total Costs by Platform",
-        labels={'x': 'Platform', 'y': 'Monthly Cost (USD)'},
-        color=monthly_costs,
-        color_continuous_scale='viridis'
-    )
-    fig_monthly.update_layout(showlegend=False, height=400)
+    fig_monthly = pipeline.get('monthly_cost_figure')
     st.plotly_chart(fig_monthly, use_container_width=True)
 
 with col2:
     # Annual cost breakdown
-    annual_costs = [costs['annual_cost'] for costs in platform_costs.values()]
-    
-    fig_annual = px.bar(
-        x=platform_names,
-        y=annual_costs,
-        title="Annual Total Costs by Platform",
-        labels={'x': 'Platform', 'y': 'Annual Cost (USD)'},
-        color=annual_costs,
-        color_continuous_scale='plasma'
-    )
-    fig_annual.update_layout(showlegend=False, height=400)
+    fig_annual = pipeline.get('annual_cost_figure')
     st.plotly_chart(fig_annual, use_container_width=True)
+profile.lap("bar charts")
 
 # Detailed cost breakdown
 st.header("📊 Detailed Cost Breakdown")
 
 # Create stacked bar chart
-platforms = list(platform_costs.keys())
-platform_fees = [costs['monthly_platform'] for costs in platform_costs.values()]
-additional_fees = [costs['monthly_additional'] for costs in platform_costs.values()]
-transaction_fees = [costs['monthly_transaction_fees'] for costs in platform_costs.values()]
-
-fig_breakdown = go.Figure(data=[
-    go.Bar(name='Platform Fees', x=platforms, y=platform_fees),
-    go.Bar(name='Additional Services', x=platforms, y=additional_fees),
-    go.Bar(name='Transaction Fees', x=platforms, y=transaction_fees)
-])
-
-fig_breakdown.update_layout(
-    barmode='stack',
-    title='Monthly Cost Breakdown by Component',
-    xaxis_title='Platform',
-    yaxis_title='Cost (USD)',
-    height=500
-)
-
+fig_breakdown = pipeline.get('breakdown_figure')
 st.plotly_chart(fig_breakdown, use_container_width=True)
+profile.lap("breakdown")
+
+# Infrastructure scaling
+# How the self-hosted platforms' metered infrastructure grows with traffic
+@st.fragment
+def render_infrastructure_section(pipeline):
+    st.header("🏗️ Infrastructure Scaling")
+    st.caption(
+        "Hosting, database and CDN for the self-hosted platforms are priced by usage: bandwidth, requests, "
+        "storage and servers needed at peak load, derived from monthly traffic and catalog size."
+    )
+    fig_scaling = pipeline.get('usage_scaling_figure')
+    st.plotly_chart(fig_scaling, use_container_width=True)
 
-# Platform details
-st.header("🔍 Platform Details & Recommendations")
 
-# Create tabs for each platform
-tabs = st.tabs(list(platforms_data.keys()))
+with profile.section("infrastructure scaling"):
+    render_infrastructure_section(pipeline)
 
-for i, (platform_name, platform_data) in enumerate(platforms_data.items()):
-    with tabs[i]:
-        costs = platform_costs[platform_name]
-        
-        col1, col2 = st.columns([2, 1])
-        
-        with col1:
-            st.markdown(f'<div class="platform-card">', unsafe_allow_html=True)
-            st.markdown(f"**{platform_name}** - {costs['plan_name']} Plan")
-            st.markdown(f'<div class="cost-highlight">${costs["total_monthly"]:.0f}/month</div>', unsafe_allow_html=True)
-            st.markdown(f"Annual Cost: **${costs['annual_cost']:,.0f}**")
-            st.markdown(f"Transaction Rate: **{costs['transaction_rate']:.1%}**")
-            if costs['one_time_costs'] > 0:
-                st.markdown(f"One-time Costs: **${costs['one_time_costs']:,.0f}**")
-            st.markdown('</div>', unsafe_allow_html=True)
-            
-            # Pros and cons
-            col_pro, col_con = st.columns(2)
-            with col_pro:
-                st.markdown("**✅ Pros:**")
-                for pro in platform_data['pros']:
-                    st.markdown(f"• {pro}")
-            
-            with col_con:
-                st.markdown("**❌ Cons:**")
-                for con in platform_data['cons']:
-                    st.markdown(f"• {con}")
-        
-        with col2:
-            # Cost components pie chart
-            labels = ['Platform Fee', 'Additional Services', 'Transaction Fees']
-            values = [costs['monthly_platform'], costs['monthly_additional'], costs['monthly_transaction_fees']]
-            
-            fig_pie = px.pie(
-                values=values,
-                names=labels,
-                title=f"{platform_name} Cost Breakdown"
-            )
-            fig_pie.update_layout(height=300)
-            st.plotly_chart(fig_pie, use_container_width=True)
+# Platform details
+# Only the selected platform is rendered, and as a fragment: switching
+# platforms reruns this section alone.
+@st.fragment
+def render_platform_details(platforms_data, platform_costs):
+    st.header("🔍 Platform Details & Recommendations")
+
+    platform_names = list(platforms_data.keys())
+    platform_name = st.segmented_control(
+        "Platform", platform_names, default=platform_names[0], key="detail_platform", label_visibility="collapsed"
+    ) or platform_names[0]
+    platform_data = platforms_data[platform_name]
+    costs = platform_row(results_frame(platform_costs), platform_name)
+
+    col1, col2 = st.columns([2, 1])
+
+    with col1:
+        st.markdown(f'<div class="platform-card">', unsafe_allow_html=True)
+        st.markdown(f"**{platform_name}** - {costs['plan']} Plan")
+        st.markdown(f'<div class="cost-highlight">${costs["total_monthly"]:.0f}/month</div>', unsafe_allow_html=True)
+        st.markdown(f"Annual Cost: **${costs['annual_cost']:,.0f}**")
+        st.markdown(f"Transaction Rate: **{costs['transaction_rate']:.1%}**")
+        if costs['one_time_costs'] > 0:
+            st.markdown(f"One-time Costs: **${costs['one_time_costs']:,.0f}**")
+        st.markdown('</div>', unsafe_allow_html=True)
+
+        # Pros and cons
+        col_pro, col_con = st.columns(2)
+        with col_pro:
+            st.markdown("**✅ Pros:**\n\n" + "\n".join(f"• {pro}  " for pro in platform_data['pros']))
+
+        with col_con:
+            st.markdown("**❌ Cons:**\n\n" + "\n".join(f"• {con}  " for con in platform_data['cons']))
+
+    with col2:
+        fig_pie = build_pie_figure(platform_costs, platform_name)
+        st.plotly_chart(fig_pie, use_container_width=True)
+
+with profile.section("platform details"):
+    render_platform_details(platforms_data, platform_costs)
 
 # Qatar-specific considerations
 st.header("🇶🇦 Qatar-Specific Considerations")
@@ -457,74 +314,181 @@ with col2:
     - Local data residency considerations
     - Arabic language support recommended
     """)
+profile.lap("qatar notes")
 
 # ROI Calculator
-st.header("📈 ROI & Break-even Analysis")
-
-st.markdown("Compare platforms based on your revenue projections:")
-
-# Revenue projection inputs
-col1, col2, col3 = st.columns(3)
-
-with col1:
-    growth_rate = st.slider("Monthly Growth Rate (%)", 0, 50, 10)
-
-with col2:
-    projection_months = st.slider("Projection Period (months)", 3, 36, 12)
-
-with col3:
-    conversion_rate = st.slider("Conversion Rate (%)", 0.5, 10.0, 2.5)
-
-# Calculate ROI projections
-months = list(range(1, projection_months + 1))
-revenues = [monthly_revenue * (1 + growth_rate/100)**i for i in months]
-
-# Create projection chart
-fig_projection = go.Figure()
-
-for platform_name, costs in platform_costs.items():
-    monthly_cost = costs['total_monthly']
-    cumulative_costs = [monthly_cost * i + costs['one_time_costs'] for i in months]
-    cumulative_revenues = [sum(revenues[:i+1]) for i in range(len(revenues))]
-    profits = [rev - cost for rev, cost in zip(cumulative_revenues, cumulative_costs)]
-    
-    fig_projection.add_trace(go.Scatter(
-        x=months,
-        y=profits,
-        mode='lines+markers',
-        name=platform_name,
-        line=dict(width=3)
-    ))
+# Runs as a fragment: moving its sliders reruns only this section, and the
+# pipeline recomputes only the projection nodes downstream of them.
+@st.fragment
+def render_roi_section(pipeline):
+    st.header("📈 ROI & Break-even Analysis")
+
+    st.markdown("Compare platforms based on your revenue projections:")
+
+    # Revenue projection inputs
+    col1, col2, col3 = st.columns(3)
+
+    with col1:
+        growth_rate = st.slider("Monthly Growth Rate (%)", 0, 50, 10, key="roi_growth_rate")
+
+    with col2:
+        projection_months = st.slider("Projection Period (months)", 3, 240, 12, key="roi_projection_months")
+
+    with col3:
+        conversion_rate = st.slider("Conversion Rate (%)", 0.5, 10.0, 2.5)
+
+    col1, col2 = st.columns([1, 2])
+
+    with col1:
+        model_upgrades = st.toggle("📶 Model plan upgrades as revenue grows")
+
+    with col2:
+        migration_cost = st.number_input("Migration Cost per Upgrade (USD)", min_value=0, value=500, step=100,
+                                         disabled=not model_upgrades)
+
+    # Calculate ROI projections
+    pipeline.set(growth_rate=growth_rate, projection_months=projection_months, model_upgrades=model_upgrades,
+                 migration_cost=migration_cost)
+    platform_costs = pipeline.get('platform_costs')
+    projection = pipeline.get('projection')
+
+    # Create projection chart
+    fig_projection = pipeline.get('projection_figure')
+    st.plotly_chart(fig_projection, use_container_width=True)
+
+    # Break-even month per platform
+    break_even_cols = st.columns(len(platform_costs))
+    for col, platform_name, month in zip(break_even_cols, platform_costs, projection.break_even_month):
+        with col:
+            st.metric(f"{platform_name} break-even", f"Month {month:.0f}" if not np.isnan(month) else "Not reached")
+
+    if model_upgrades:
+        timeline = pipeline.get('upgrade_timeline')
+        if timeline:
+            st.markdown("**Plan upgrade timeline:**")
+            st.dataframe(pd.DataFrame(timeline).rename(columns={
+                'platform': 'Platform', 'month': 'Month', 'from_plan': 'From', 'to_plan': 'To', 'reason': 'Reason'
+            }), use_container_width=True, hide_index=True)
+        else:
+            st.markdown("No plan upgrades needed within the projection period.")
+
+    if st.toggle("🎲 Monte Carlo risk mode"):
+        render_risk_simulation(platform_costs, pipeline.get('monthly_revenue'), pipeline.get('monthly_traffic'),
+                               growth_rate, projection_months, conversion_rate)
+
+def render_risk_simulation(platform_costs, monthly_revenue, monthly_traffic, growth_rate, projection_months, conversion_rate):
+    st.markdown("Sample growth, revenue and fee-rate uncertainty around the projection above. "
+                "Unlike the projection, which keeps transaction fees at the starting revenue, "
+                "the simulation charges them on each simulated month's revenue.")
+
+    col1, col2, col3 = st.columns(3)
+
+    with col1:
+        growth_sd = st.slider("Growth Volatility (± % per month)", 0.0, 20.0, 5.0)
+        n_paths = st.select_slider("Simulated Paths", [10_000, 100_000, 250_000, 500_000, 1_000_000], value=100_000)
+
+    with col2:
+        revenue_sd = st.slider("Starting Revenue Uncertainty (σ)", 0.0, 1.0, 0.25)
+        seed = st.number_input("Random Seed", min_value=0, value=42, step=1)
+
+    with col3:
+        fee_sd = st.slider("Fee Rate Uncertainty (σ)", 0.0, 0.5, 0.1)
+
+    assumptions = RiskAssumptions(growth_rate, growth_sd, revenue_sd, fee_sd, monthly_traffic, conversion_rate)
+    run_args = (platform_costs, monthly_revenue, projection_months, assumptions, n_paths, int(seed))
+    run_key = make_key(run_args)
+
+    # Seeded runs are deterministic, so results are shared across sessions
+    risk_cache = get_cache('risk_simulation', maxsize=16)
+    result = risk_cache.get(run_key)
+    if result is None and st.button("Run simulation", type="primary"):
+        progress = st.progress(0.0, text="Simulating...")
+        result = simulate_platform_costs(
+            platform_costs, monthly_revenue, projection_months,
+            assumptions=assumptions, n_paths=n_paths, seed=int(seed),
+            progress=lambda done, total: progress.progress(done / total, text=f"Simulating... {done}/{total} chunks")
+        )
+        progress.empty()
+        risk_cache.put(run_key, result)
+
+    if result is None:
+        st.info("Adjust the assumptions and run the simulation.")
+        return
+
+    platform_names = tuple(platform_costs)
+    col1, col2 = st.columns(2)
+
+    with col1:
+        band_platform = st.selectbox("Platform", platform_names)
+        i = platform_names.index(band_platform)
+        band_percentiles = {pct: values[i] for pct, values in result.percentiles.items()}
+        st.plotly_chart(build_risk_band_figure(band_platform, result.months, band_percentiles), use_container_width=True)
+
+    with col2:
+        st.plotly_chart(
+            build_break_even_probability_figure(platform_names, result.months, result.break_even_probability),
+            use_container_width=True
+        )
+
+with profile.section("ROI"):
+    render_roi_section(pipeline)
+
+# Sensitivity Explorer
+@st.fragment
+def render_sensitivity_section(platform_costs):
+    st.header("🧭 Sensitivity Explorer")
+
+    st.markdown("See how the cheapest option, the cost spread and break-even change across revenue and growth:")
+
+    col1, col2, col3, col4 = st.columns(4)
+
+    with col1:
+        revenue_range = st.slider("Revenue Range (USD)", 0, 500000, (0, 500000), step=1000, format="$%d")
+
+    with col2:
+        growth_range = st.slider("Growth Range (%)", 0, 50, (0, 50))
+
+    with col3:
+        resolution = st.select_slider("Grid Resolution", [50, 100, 250, 500, 1000], value=100)
+        horizon = st.slider("Horizon (months)", 3, 240, 36,
+                            help="Platforms are compared on their total cost over this period")
+
+    with col4:
+        break_even_platform = st.selectbox("Break-even For", ["Cheapest platform"] + list(platform_costs.keys()))
+
+    fig_cheapest, fig_spread, fig_break_even = build_sensitivity_figures(
+        platform_costs, horizon, revenue_range, growth_range, resolution, break_even_platform
+    )
 
-fig_projection.update_layout(
-    title='Cumulative Profit Projection by Platform',
-    xaxis_title='Months',
-    yaxis_title='Cumulative Profit (USD)',
-    height=500,
-    hovermode='x unified'
-)
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.plotly_chart(fig_cheapest, use_container_width=True)
+    with col2:
+        st.plotly_chart(fig_spread, use_container_width=True)
+    with col3:
+        st.plotly_chart(fig_break_even, use_container_width=True)
 
-# Add break-even line
-fig_projection.add_hline(y=0, line_dash="dash", line_color="red", annotation_text="Break-even")
+    tile_stats = get_cache('sensitivity_tiles').stats()
+    st.caption(f"Grid tile cache (all sessions): {tile_stats['misses']} tiles computed, {tile_stats['hits']} reused")
 
-st.plotly_chart(fig_projection, use_container_width=True)
+with profile.section("sensitivity"):
+    render_sensitivity_section(platform_costs)
 
 # Recommendations
 st.header("🎯 Recommendations")
 
-# Sort platforms by total monthly cost
-sorted_platforms = sorted(platform_costs.items(), key=lambda x: x[1]['total_monthly'])
-cheapest = sorted_platforms[0]
-most_expensive = sorted_platforms[-1]
+# Cheapest platform at this revenue, looked up in the precomputed crossover envelope
+cheapest_name = pipeline.get('cheapest_platform')
+cheapest = platform_row(results, cheapest_name)
 
 col1, col2 = st.columns(2)
 
 with col1:
     st.success(f"""
-    **💡 Most Cost-Effective: {cheapest[0]}**
+    **💡 Most Cost-Effective: {cheapest_name}**
     
-    Monthly Cost: ${cheapest[1]['total_monthly']:.0f}
-    Annual Cost: ${cheapest[1]['annual_cost']:,.0f}
+    Monthly Cost: ${cheapest['total_monthly']:.0f}
+    Annual Cost: ${cheapest['annual_cost']:,.0f}
     
     Best for: Budget-conscious businesses, startups
     """)
@@ -548,6 +512,10 @@ with col2:
         Support: Excellent documentation
         """)
 
+with st.expander("📉 Cheapest Platform by Revenue Range"):
+    pipeline.set(all_plans=st.checkbox("Consider every plan of every platform", value=False))
+    st.dataframe(pd.DataFrame(pipeline.get('crossover_table')), use_container_width=True, hide_index=True)
+
 # Final recommendations based on business type
 st.markdown("### 📋 Tailored Recommendations:")
 
@@ -575,6 +543,291 @@ else:  # Enterprise
     - **Adobe Commerce** for complex B2B requirements
     - **Shopify Plus** for rapid deployment with enterprise features
     """)
+profile.lap("recommendations")
+
+# Bulk quoting
+@st.fragment
+def render_bulk_section(catalog):
+    st.header("📁 Bulk Quoting")
+
+    st.markdown(
+        "Upload a CSV or Parquet file with one scenario per row: `monthly_revenue`, plus `business_size` or "
+        "`num_products`, and optionally `monthly_traffic`, `market_focus` and `business_type`."
+    )
+
+    uploaded = st.file_uploader("Scenario file", type=["csv", "parquet"])
+    col1, col2 = st.columns(2)
+    with col1:
+        bulk_plan_selection = st.radio("Plans", list(PLAN_SELECTIONS), key="bulk_plan_selection")
+    with col2:
+        output_format = st.radio("Output Format", ["csv", "parquet"], key="bulk_output_format")
+
+    if uploaded is not None and st.button("Quote all scenarios"):
+        # Results are streamed to a file chunk by chunk, not held in memory.  Each
+        # session writes into its own temporary directory, removed with the
+        # session, and a new run replaces the previous result.
+        if "bulk_dir" not in st.session_state:
+            st.session_state.bulk_dir = tempfile.TemporaryDirectory(prefix="ecommerce-bulk-")
+        previous = st.session_state.pop("bulk_result", None)
+        if previous is not None:
+            previous[0].unlink(missing_ok=True)
+        output = Path(st.session_state.bulk_dir.name) / f"quotes.{output_format}"
+        progress = st.empty()
+        try:
+            rows = quote_file(
+                uploaded, output, catalog=catalog, plan_selection=PLAN_SELECTIONS[bulk_plan_selection],
+                input_format="parquet" if uploaded.name.lower().endswith(".parquet") else "csv",
+                output_format=output_format, progress=lambda done: progress.caption(f"Quoted {done:,} rows..."),
+            )
+        except ValueError as error:
+            output.unlink(missing_ok=True)
+            st.error(f"Could not quote this file: {error}")
+            return
+        progress.caption(f"Quoted {rows:,} rows")
+        st.session_state.bulk_result = (output, f"{uploaded.name.rsplit('.', 1)[0]}_quotes.{output_format}")
+
+    if "bulk_result" in st.session_state:
+        path, file_name = st.session_state.bulk_result
+        with open(path, "rb") as result:
+            st.download_button("Download quotes", result, file_name=file_name)
+
+with profile.section("bulk quoting"):
+    render_bulk_section(catalog)
+
+# Scenario workspace
+# Named what-if scenarios, edited in a table and compared side by side.  The
+# workspace lives in the session and prices only scenarios added or edited
+# since the last run, all of them in one batch.
+WORKSPACE_COLUMNS = {
+    'name': st.column_config.TextColumn("Name", required=True),
+    'business_size': st.column_config.SelectboxColumn("Business Size", options=BUSINESS_SIZE_OPTIONS, required=True),
+    'monthly_revenue': st.column_config.NumberColumn("Monthly Revenue", min_value=0, format="$%d", required=True),
+    'num_products': st.column_config.NumberColumn("Products", min_value=1, step=1),
+    'monthly_traffic': st.column_config.NumberColumn("Monthly Traffic", min_value=0, step=1),
+    'plan_selection': st.column_config.SelectboxColumn("Plans", options=list(PLAN_SELECTIONS), required=True),
+    'growth_rate': st.column_config.NumberColumn("Growth (%)", min_value=0, max_value=50, required=True),
+    'projection_months': st.column_config.NumberColumn("Months", min_value=1, max_value=240, step=1, required=True),
+    'market_focus': st.column_config.TextColumn("Markets", help="Comma-separated; does not change costs"),
+}
+WORKSPACE_DTYPES = {
+    'name': object, 'business_size': object, 'monthly_revenue': 'float64', 'num_products': 'Int64',
+    'monthly_traffic': 'Int64', 'plan_selection': object, 'growth_rate': 'float64', 'projection_months': 'Int64',
+    'market_focus': object,
+}
+
+
+def workspace_row(scenario):
+    return {
+        'name': scenario.name,
+        'business_size': scenario.business_size,
+        'monthly_revenue': scenario.monthly_revenue,
+        'num_products': scenario.num_products,
+        'monthly_traffic': scenario.monthly_traffic,
+        'plan_selection': next(label for label, code in PLAN_SELECTIONS.items() if code == scenario.plan_selection),
+        'growth_rate': scenario.growth_rate,
+        'projection_months': scenario.projection_months,
+        'market_focus': ", ".join(scenario.market_focus),
+    }
+
+
+def workspace_scenarios(table):
+    """Scenarios from the edited table, and a note per row that could not be used."""
+    scenarios, problems, names = [], [], set()
+    for index, row in enumerate(table.to_dict("records"), 1):
+        optional = {key: None if pd.isna(row[key]) else int(row[key]) for key in ("num_products", "monthly_traffic")}
+        markets = "" if pd.isna(row['market_focus']) else row['market_focus']
+        try:
+            if any(pd.isna(row[key]) for key in WORKSPACE_DTYPES if key not in optional and key != 'market_focus'):
+                raise ValueError("fill in every required column")
+            if row['name'] in names:
+                raise ValueError(f"the name {row['name']!r} is already used")
+            scenario = Scenario(
+                name=row['name'], monthly_revenue=float(row['monthly_revenue']), business_size=row['business_size'],
+                plan_selection=PLAN_SELECTIONS[row['plan_selection']], growth_rate=float(row['growth_rate']),
+                projection_months=int(row['projection_months']),
+                market_focus=tuple(market.strip() for market in markets.split(",") if market.strip()),
+                **optional,
+            )
+        except ValueError as error:
+            problems.append(f"Row {index}: {error}")
+            continue
+        names.add(scenario.name)
+        scenarios.append(scenario)
+    return scenarios, problems
+
+
+@st.fragment
+def render_workspace_section(catalog, current):
+    st.header("🗂️ Scenario Workspace")
+
+    st.markdown(
+        "Save the current inputs as named scenarios, edit them in the table, and compare cost and break-even "
+        "per platform across all of them. Only scenarios added or edited since the last run are recomputed."
+    )
+
+    workspace = st.session_state.get("workspace")
+    if workspace is None:
+        workspace = st.session_state.workspace = ScenarioWorkspace()
+    if "workspace_table" not in st.session_state:
+        st.session_state.workspace_table = pd.DataFrame(columns=list(WORKSPACE_DTYPES)).astype(WORKSPACE_DTYPES)
+        st.session_state.workspace_editor = 0
+
+    col1, col2, col3 = st.columns([2, 1, 1])
+    with col1:
+        name = st.text_input("Scenario Name", value=f"Scenario {len(workspace) + 1}", key="workspace_name")
+    with col2:
+        save = st.button("Save current inputs", disabled=not name)
+    with col3:
+        add_to_report = st.button("Add all to report", disabled=not len(workspace))
+
+    # The table is edited in place; saving the current inputs adds or replaces
+    # a row, and restarts the editor from the result
+    edited = st.data_editor(
+        st.session_state.workspace_table, column_config=WORKSPACE_COLUMNS, num_rows="dynamic", hide_index=True,
+        use_container_width=True, key=f"workspace_editor_{st.session_state.workspace_editor}",
+    )
+    if save:
+        row = workspace_row(Scenario(name=name, **current))
+        kept = edited[edited['name'] != name]
+        st.session_state.workspace_table = pd.concat([kept, pd.DataFrame([row])], ignore_index=True).astype(
+            WORKSPACE_DTYPES)
+        st.session_state.workspace_editor += 1
+        st.rerun()
+
+    scenarios, problems = workspace_scenarios(edited)
+    for problem in problems:
+        st.warning(problem)
+    workspace.replace_all(scenarios)
+    if not len(workspace):
+        st.caption("No scenarios saved yet.")
+        return
+
+    results = workspace.evaluate(catalog)
+    st.caption(f"Recomputed {len(workspace.evaluated)} of {len(workspace)} scenario(s) on this run.")
+
+    if add_to_report:
+        report_scenarios = st.session_state.setdefault("report_scenarios", [])
+        for scenario in scenarios:
+            added = ReportScenario(
+                scenario.monthly_revenue, scenario.business_size, scenario.plan_selection, scenario.monthly_traffic,
+                scenario.num_products, scenario.growth_rate, scenario.projection_months, title=scenario.name,
+            )
+            if added not in report_scenarios:
+                report_scenarios.append(added)
+        # The report section is a fragment of its own: redraw the page to list them
+        st.rerun()
+
+    col1, col2 = st.columns(2)
+    with col1:
+        metric = st.selectbox("Metric", list(METRICS), format_func=METRICS.get, key="workspace_metric")
+    with col2:
+        baseline = st.selectbox("Deltas Against", list(workspace.scenarios), key="workspace_baseline")
+
+    names = list(results)
+    months = metric == 'break_even_month'
+    side_by_side, deltas = st.tabs(["Side by side", "Deltas"])
+    with side_by_side:
+        table = pd.DataFrame(workspace.comparison(catalog, metric), index=names, columns=catalog.platforms)
+        table["Cheapest Platform"] = [result.cheapest_platform for result in results.values()]
+        number = st.column_config.NumberColumn(format="%.0f" if months else "$%.0f")
+        st.dataframe(table, column_config=dict.fromkeys(catalog.platforms, number), use_container_width=True)
+    with deltas:
+        table = pd.DataFrame(workspace.deltas(catalog, metric, baseline), index=names, columns=catalog.platforms)
+        number = st.column_config.NumberColumn(format="%+.0f" if months else "$%+.0f")
+        st.dataframe(table, column_config=dict.fromkeys(catalog.platforms, number), use_container_width=True)
+        st.caption(f"Difference from {baseline}" + (" in months; blank where break-even is not reached." if months
+                                                    else "; positive means higher than the baseline."))
+
+with profile.section("scenario workspace"):
+    render_workspace_section(catalog, dict(
+        monthly_revenue=monthly_revenue, business_size=business_size,
+        plan_selection=PLAN_SELECTIONS[plan_selection], monthly_traffic=monthly_traffic, num_products=num_products,
+        growth_rate=st.session_state.get("roi_growth_rate", 10),
+        projection_months=st.session_state.get("roi_projection_months", 12),
+        market_focus=tuple(market_focus),
+    ))
+
+# Report export
+# Reports render on a background thread; the progress fragment polls the job
+# and redraws the page once when it finishes
+@st.fragment(run_every=1.0)
+def render_report_progress():
+    job = st.session_state.report_job
+    if job.done:
+        st.rerun()
+    st.progress(job.fraction, text=f"Rendering figures: {job.completed} of {job.total or '...'}")
+
+
+@st.fragment
+def render_report_section(catalog, monthly_revenue, business_size, plan_selection, monthly_traffic, num_products):
+    st.header("📄 Report Export")
+
+    st.markdown(
+        "Export the comparison table, cost charts and ROI projection as a self-contained report. "
+        "Add scenarios to compare several in one report; charts they share are rendered once."
+    )
+
+    # Growth and horizon come from the ROI section's sliders
+    scenario = ReportScenario(
+        monthly_revenue, business_size, plan_selection, monthly_traffic, num_products,
+        growth_rate=st.session_state.get("roi_growth_rate", 10),
+        projection_months=st.session_state.get("roi_projection_months", 12),
+    )
+    scenarios = st.session_state.setdefault("report_scenarios", [])
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        if st.button("Add current scenario", disabled=scenario in scenarios):
+            scenarios.append(scenario)
+    with col2:
+        if st.button("Clear scenarios", disabled=not scenarios):
+            scenarios.clear()
+    with col3:
+        formats = ["html", "pdf"] if pdf_available() else ["html"]
+        report_format = st.radio("Report Format", formats, key="report_format", horizontal=True,
+                                 help=None if pdf_available() else "PDF export needs the kaleido package")
+
+    for index, added in enumerate(scenarios, 1):
+        st.caption(f"{index}. {added.label}")
+
+    job = st.session_state.get("report_job")
+    running = job is not None and not job.done
+    label = f"Export report ({len(scenarios)} scenarios)" if scenarios else "Export report for current scenario"
+    if st.button(label, disabled=running):
+        st.session_state.report_job = job = start_report(scenarios or [scenario], report_format, catalog)
+        running = True
+
+    if running:
+        render_report_progress()
+    elif job is not None:
+        try:
+            report = job.result()
+        except (RuntimeError, ValueError) as error:
+            st.error(f"Could not export the report: {error}")
+        else:
+            st.caption(f"Rendered {len(job.scenarios)} scenario(s) in {job.finished - job.started:.1f}s")
+            st.download_button("Download report", report, file_name=job.file_name, mime=job.media_type)
+
+with profile.section("report export"):
+    render_report_section(catalog, monthly_revenue, business_size, PLAN_SELECTIONS[plan_selection],
+                          monthly_traffic, num_products)
+
+# Cache statistics
+with st.sidebar.expander("⚙️ Cache Statistics"):
+    stats = cache_stats()
+    st.dataframe(
+        pd.DataFrame.from_dict(stats, orient='index')[['hits', 'misses', 'hit_rate', 'size', 'maxsize', 'evictions']],
+        use_container_width=True
+    )
+    store = get_store()
+    if store is not None:
+        store_stats = store.stats()
+        st.caption(
+            f"Result store: {store_stats['rows']:,} results, {store_stats['bytes'] / 2**20:.1f} MB, "
+            f"{store_stats['hit_rate']:.0%} hit rate"
+        )
+    if st.button("Clear caches"):
+        clear_caches()
+profile.lap("cache statistics")
 
 # Footer
 st.markdown("---")
@@ -585,3 +838,45 @@ st.markdown("""
     <p>⚠️ Costs are estimates. Actual costs may vary based on specific requirements and negotiations.</p>
 </div>
 """, unsafe_allow_html=True)
+profile.lap("footer")
+
+# Profiling panel
+# Rendered last so it can report on everything above; its own cost is not timed.
+profile.finish()
+with st.sidebar.expander("🩺 Profiling"):
+    if st.toggle("Show section timings", key="show_profile"):
+        timings = pd.DataFrame(profile.timings + [("other", profile.untimed)], columns=["Section", "Seconds"])
+        st.dataframe(
+            timings.assign(Share=100 * timings["Seconds"] / profile.total),
+            column_config={
+                "Seconds": st.column_config.NumberColumn(format="%.4f"),
+                "Share": st.column_config.ProgressColumn(min_value=0, max_value=100, format="%.0f%%"),
+            },
+            hide_index=True,
+            use_container_width=True,
+        )
+        st.caption(f"Full rerun: {profile.total * 1000:.0f} ms. Fragment reruns are not included.")
+        st.caption(f"Pipeline nodes recomputed: {', '.join(pipeline.recomputed) or 'none'}.")
+
+    # The catalog, plan breakpoints and cached results are shared by every
+    # session of this process; only the session state below is per session
+    # (the pipeline's node values are those shared results, so not counted)
+    rss, peak_rss = resident_memory()
+    if rss is not None:
+        st.caption(f"Process memory: {rss / 2**20:.0f} MB resident (peak {peak_rss / 2**20:.0f} MB), "
+                   f"shared by all sessions.")
+    st.caption(f"This session's state: {deep_sizeof(st.session_state.to_dict(), exclude=pipeline.node_values()) / 1024:.1f} KB.")
+
+    if st.button("Profile next rerun"):
+        st.session_state.profile_next_rerun = True
+        st.rerun()
+    report = profile.cprofile_report()
+    if report is not None:
+        st.session_state.cprofile_report = report
+    if "cprofile_report" in st.session_state:
+        st.code(st.session_state.cprofile_report, language=None)
+
+    if st.toggle("Show Prometheus counters", key="show_prometheus"):
+        st.code(render_prometheus(cache_stats()), language=None)
+        if metrics_server is not None:
+            st.caption(f"Served for scraping at /metrics on port {metrics_server.server_address[1]}.")
@@ -0,0 +1,125 @@
+"""Pricing and cost calculations behind the ecommerce cost dashboard.
+
+The package is headless: it depends on NumPy only and never imports
+Streamlit, Plotly or pandas, so it can be used from scripts, batch jobs and
+services.  Plotly figure builders live in ``ecommerce_costs.figures`` and
+are imported explicitly by the UI.
+"""
+from .api import (
+    compute_crossovers,
+    compute_platform_costs,
+    compute_sensitivity_grid,
+    compute_usage_scaling,
+    get_compiled_catalog,
+    get_plan_optimizer,
+    project_profits,
+    rank_plans,
+    select_plans,
+    simulate_plan_upgrades,
+)
+from .cache import LRUCache, cache_stats, clear_caches, memoize
+from .catalog import catalog_version, get_platform_data, load_catalog
+from .engine import (
+    BUSINESS_SIZES,
+    COST_COMPONENTS,
+    CompiledCatalog,
+    PlatformCosts,
+    batch_platform_costs,
+    business_size_code,
+    calculate_platform_costs,
+    compile_catalog,
+    is_business_size,
+    product_size_code,
+    quote_all_platforms,
+)
+from .envelope import LowerEnvelope, catalog_cost_lines, catalog_revenue_limits, lower_envelope
+from .infrastructure import (
+    DEFAULT_WORKLOAD,
+    UsageTables,
+    Workload,
+    component_costs,
+    platform_component_costs,
+    usage_costs,
+    usage_drivers,
+)
+from .instrumentation import RerunProfile, configure_profile_log, render_prometheus, start_metrics_server
+from .montecarlo import MonteCarloResult, RiskAssumptions, simulate, simulate_platform_costs
+from .optimizer import PlanOptimizer, PlanRanking, build_plan_optimizer, optimal_platform_costs
+from .pipeline import Graph, PipelineState
+from .projection import Projection, project, project_platform_costs
+from .sensitivity import SensitivityGrid, evaluate_grid, evaluate_platform_costs_grid
+from .simulation import UpgradeSimulation, simulate_upgrades, upgrade_timeline
+from .store import ResultStore, get_store, persistent
+from .workspace import Scenario, ScenarioResult, ScenarioWorkspace, evaluate_scenarios
+
+__all__ = [
+    'BUSINESS_SIZES',
+    'COST_COMPONENTS',
+    'CompiledCatalog',
+    'DEFAULT_WORKLOAD',
+    'Graph',
+    'LRUCache',
+    'LowerEnvelope',
+    'MonteCarloResult',
+    'PipelineState',
+    'PlanOptimizer',
+    'PlanRanking',
+    'PlatformCosts',
+    'Projection',
+    'RerunProfile',
+    'ResultStore',
+    'RiskAssumptions',
+    'Scenario',
+    'ScenarioResult',
+    'ScenarioWorkspace',
+    'SensitivityGrid',
+    'UpgradeSimulation',
+    'UsageTables',
+    'Workload',
+    'batch_platform_costs',
+    'build_plan_optimizer',
+    'business_size_code',
+    'cache_stats',
+    'calculate_platform_costs',
+    'catalog_cost_lines',
+    'catalog_revenue_limits',
+    'catalog_version',
+    'clear_caches',
+    'compile_catalog',
+    'component_costs',
+    'compute_crossovers',
+    'compute_platform_costs',
+    'compute_sensitivity_grid',
+    'compute_usage_scaling',
+    'configure_profile_log',
+    'evaluate_grid',
+    'evaluate_platform_costs_grid',
+    'evaluate_scenarios',
+    'get_compiled_catalog',
+    'get_plan_optimizer',
+    'get_platform_data',
+    'get_store',
+    'is_business_size',
+    'load_catalog',
+    'lower_envelope',
+    'memoize',
+    'optimal_platform_costs',
+    'persistent',
+    'platform_component_costs',
+    'product_size_code',
+    'project',
+    'project_platform_costs',
+    'project_profits',
+    'quote_all_platforms',
+    'rank_plans',
+    'render_prometheus',
+    'select_plans',
+    'simulate',
+    'simulate_plan_upgrades',
+    'simulate_platform_costs',
+    'simulate_upgrades',
+    'start_metrics_server',
+    'upgrade_timeline',
+    'usage_costs',
+    'usage_drivers',
+]
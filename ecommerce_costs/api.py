@@ -0,0 +1,170 @@
+"""Memoized, typed entry points shared by the dashboard and batch jobs.
+
+Every function here is cached process-wide on its argument values (see
+``cache.memoize``), so repeated calls with the same inputs are lookups.
+Cost, projection and upgrade results are also kept in the persistent result
+store (see ``store.persistent``), so they survive restarts.  Results are
+shared: treat them as read-only.
+"""
+from typing import Literal
+
+import numpy as np
+
+from .cache import memoize
+from .catalog import load_catalog
+from .engine import CompiledCatalog, PlatformCosts, business_size_code, quote_all_platforms
+from .envelope import LowerEnvelope, catalog_cost_lines, catalog_revenue_limits, lower_envelope
+from .infrastructure import platform_component_costs, usage_drivers
+from .optimizer import PlanOptimizer, PlanRanking, build_plan_optimizer
+from .projection import Projection, project_platform_costs
+from .sensitivity import SensitivityGrid, evaluate_platform_costs_grid
+from .simulation import UpgradeSimulation, simulate_upgrades
+from .store import persistent
+
+PlanSelection = Literal['size', 'cheapest']
+PLAN_SELECTIONS = ('size', 'cheapest')
+
+
+def get_compiled_catalog() -> CompiledCatalog:
+    # Not memoized: the loader already caches, and re-checks the file for changes
+    return load_catalog()
+
+
+# Costs are keyed on the catalog content as well as the inputs, so a pricing
+# change invalidates them automatically
+@memoize(maxsize=256)
+@persistent
+def compute_platform_costs(catalog: CompiledCatalog, monthly_revenue: float, business_size: str,
+                           plan_selection: PlanSelection = 'size', monthly_traffic: int | None = None,
+                           num_products: int | None = None) -> dict[str, PlatformCosts]:
+    """Cost every platform, on its business-size plan or its cheapest plan.
+
+    With ``monthly_traffic`` or ``num_products``, self-hosted infrastructure
+    is priced by usage rather than flat.
+    """
+    plan = select_plans(catalog, business_size, monthly_revenue, plan_selection)
+    costs = quote_all_platforms(catalog, monthly_revenue, business_size, plan=plan,
+                                monthly_traffic=monthly_traffic, num_products=num_products)
+    if plan_selection == 'cheapest':
+        ranking = rank_plans(catalog, business_size, monthly_revenue)
+        for p, platform_costs in enumerate(costs.values()):
+            runner_up = int(ranking.runner_up_plan[p])
+            platform_costs['runner_up_plan'] = catalog.plan_name(p, runner_up) if runner_up >= 0 else None
+            platform_costs['runner_up_margin'] = float(ranking.margin[p])
+    return costs
+
+
+# Per-platform plan breakpoints, precomputed once per catalog and business size
+# and shared by every session; usage only shifts the cost lines
+@memoize(maxsize=16)
+def _base_plan_optimizer(catalog: CompiledCatalog, business_size: str) -> PlanOptimizer:
+    return build_plan_optimizer(catalog, business_size)
+
+
+def select_plans(catalog: CompiledCatalog, business_size, monthly_revenue,
+                 plan_selection: PlanSelection = 'size') -> np.ndarray:
+    """Each platform's plan index for one or many scenarios: shape (..., P).
+
+    ``business_size`` (labels or codes) broadcasts against
+    ``monthly_revenue``.  Plans are picked by business size or as the
+    cheapest at the revenue.  Usage-based infrastructure adds the same
+    amount to every plan of a platform, so it never changes the pick.  The
+    dashboard, bulk quoting, the service and the scenario workspace all
+    choose plans here.
+    """
+    revenue = np.asarray(monthly_revenue, dtype=np.float64)
+    size = business_size_code(business_size)
+    revenue, size = np.broadcast_arrays(revenue, size)
+    if plan_selection == 'size':
+        return catalog.size_plan[np.arange(len(catalog.platforms)), size[..., None]]
+    if plan_selection != 'cheapest':
+        raise ValueError(f"plan_selection must be one of {PLAN_SELECTIONS}, not {plan_selection!r}")
+    plan = np.empty(revenue.shape + (len(catalog.platforms),), dtype=np.intp)
+    for code in np.unique(size):
+        rows = size == code
+        plan[rows] = _base_plan_optimizer(catalog, int(code)).best_plan(revenue[rows])
+    return plan
+
+
+def rank_plans(catalog: CompiledCatalog, business_size, monthly_revenue) -> PlanRanking:
+    """Best plan, runner-up and margin per platform for one or many scenarios (see ``select_plans``).
+
+    The costs leave usage-based infrastructure out; the margins do not depend on it.
+    """
+    revenue = np.asarray(monthly_revenue, dtype=np.float64)
+    size = business_size_code(business_size)
+    revenue, size = np.broadcast_arrays(revenue, size)
+    shape = revenue.shape + (len(catalog.platforms),)
+    ranked = {'best_plan': np.empty(shape, dtype=np.intp), 'best_cost': np.empty(shape),
+              'runner_up_plan': np.empty(shape, dtype=np.intp), 'runner_up_cost': np.empty(shape),
+              'margin': np.empty(shape)}
+    for code in np.unique(size):
+        rows = size == code
+        ranking = _base_plan_optimizer(catalog, int(code)).rank(revenue[rows])
+        for name, values in ranked.items():
+            values[rows] = getattr(ranking, name)
+    return PlanRanking(**ranked)
+
+
+@memoize(maxsize=64)
+def get_plan_optimizer(catalog: CompiledCatalog, business_size: str, monthly_traffic: int | None = None,
+                       num_products: int | None = None) -> PlanOptimizer:
+    return _base_plan_optimizer(catalog, business_size).with_usage(monthly_traffic, num_products)
+
+
+# Lower envelope of the platform/plan cost lines: exact revenue crossover points
+@memoize(maxsize=32)
+def compute_crossovers(catalog: CompiledCatalog, business_size: str, all_plans: bool,
+                       monthly_traffic: int | None = None,
+                       num_products: int | None = None) -> tuple[LowerEnvelope, np.ndarray, np.ndarray]:
+    """Return the envelope plus each option's platform and plan index.
+
+    With ``all_plans`` each plan is only an option up to its revenue cap (see
+    ``catalog_revenue_limits``); business-size plans are priced at any revenue.
+    """
+    intercepts, slopes, platform, plan = catalog_cost_lines(catalog, business_size, all_plans,
+                                                            monthly_traffic, num_products)
+    limits = catalog_revenue_limits(catalog, platform, plan) if all_plans else None
+    return lower_envelope(intercepts, slopes, limits=limits), platform, plan
+
+
+# Capacity planning: metered infrastructure over a log-spaced traffic range
+@memoize(maxsize=32)
+def compute_usage_scaling(catalog: CompiledCatalog, num_products: int, traffic_range: tuple[float, float],
+                          resolution: int = 200) -> tuple[np.ndarray, np.ndarray]:
+    """Return the traffic grid (N,) and each platform's component costs (N, P, C).
+
+    Costs include the flat amount of each metered component.
+    """
+    traffic = np.geomspace(*traffic_range, resolution)
+    usage = platform_component_costs(catalog.usage, usage_drivers(traffic, num_products))
+    return traffic, usage + catalog.usage.included
+
+
+@memoize(maxsize=128)
+@persistent
+def project_profits(platform_costs: dict[str, PlatformCosts], monthly_revenue: float,
+                    growth_rate: float, projection_months: int) -> Projection:
+    return project_platform_costs(platform_costs, monthly_revenue, growth_rate, projection_months)
+
+
+@memoize(maxsize=128)
+@persistent
+def simulate_plan_upgrades(catalog: CompiledCatalog, business_size: str, platform_costs: dict[str, PlatformCosts],
+                           monthly_revenue: float, growth_rate: float, projection_months: int,
+                           migration_cost: float, monthly_traffic: int | None = None,
+                           num_products: int | None = None) -> UpgradeSimulation:
+    # Start every platform on the plan it is currently quoted on
+    start_plan = [catalog.plans[p].index(costs['plan_name']) for p, costs in enumerate(platform_costs.values())]
+    optimizer = get_plan_optimizer(catalog, business_size, monthly_traffic, num_products)
+    return simulate_upgrades(optimizer, monthly_revenue, growth_rate,
+                             projection_months, migration_cost=migration_cost, start_plan=start_plan)
+
+
+@memoize(maxsize=16)
+def compute_sensitivity_grid(platform_costs: dict[str, PlatformCosts], horizon: int,
+                             revenue_range: tuple[float, float], growth_range: tuple[float, float],
+                             resolution: int) -> SensitivityGrid:
+    return evaluate_platform_costs_grid(
+        platform_costs, horizon, revenue_range=revenue_range, growth_range=growth_range, resolution=resolution
+    )
@@ -0,0 +1,210 @@
+"""Bulk quoting of scenario files (CSV or Parquet).
+
+Each input row carries the sidebar inputs: ``monthly_revenue`` plus either
+``business_size`` or ``num_products`` (mapped to a size by product count),
+and optionally ``monthly_traffic``, ``market_focus`` and ``business_type``.
+``monthly_traffic`` and ``num_products``, when present, price self-hosted
+infrastructure by usage; the other columns are passed through.  The output repeats the input columns and adds,
+per platform, the plan, total monthly and annual cost, then the cheapest
+platform.
+
+The input is streamed in chunks of ``chunk_rows``; chunks are priced in one
+vectorized pass each on the shared process pool, serialized by the workers,
+and appended to the output in input order, so memory stays bounded by the
+chunks in flight whatever the file size.
+
+pandas and pyarrow are imported here, not by the package, so import this
+module explicitly.  Run it as ``python -m ecommerce_costs.bulk IN OUT``.
+"""
+import argparse
+import os
+import re
+import sys
+import time
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from .api import select_plans
+from .engine import (BUSINESS_SIZES, CompiledCatalog, batch_platform_costs, business_size_code, is_business_size,
+                     product_size_code)
+from .parallel import iter_ordered
+
+DEFAULT_CHUNK_ROWS = 100_000
+
+
+@dataclass(frozen=True)
+class _ChunkTask:
+    catalog: CompiledCatalog
+    frame: pd.DataFrame
+    plan_selection: str
+    output_format: str
+    header: bool
+    first_row: int
+
+
+def platform_slug(platform_name):
+    return re.sub(r'[^0-9a-z]+', '_', platform_name.lower()).strip('_')
+
+
+def _business_size(frame, first_row=0):
+    if 'business_size' in frame:
+        labels = frame['business_size'].to_numpy()
+        # Check the handful of distinct labels, not every row
+        uniques, inverse = np.unique(labels.astype(str), return_inverse=True)
+        known = np.array([is_business_size(label) for label in uniques], dtype=bool)
+        if not known.all():
+            unknown = (first_row + 1 + np.flatnonzero(~known[inverse])).tolist()
+            shown = ', '.join(map(str, unknown[:10])) + (', ...' if len(unknown) > 10 else '')
+            raise ValueError(f"unknown business_size on row{'s' if len(unknown) > 1 else ''} {shown}: "
+                             f"expected one of {', '.join(BUSINESS_SIZES)}")
+        return business_size_code(uniques)[inverse]
+    if 'num_products' in frame:
+        return product_size_code(frame['num_products'].to_numpy(dtype=np.float64))
+    raise ValueError("input needs a 'business_size' or a 'num_products' column")
+
+
+def _usage_column(frame, column):
+    if column not in frame:
+        return None
+    return frame[column].to_numpy(dtype=np.float64)[:, None]
+
+
+def quote_frame(catalog: CompiledCatalog, frame: pd.DataFrame, plan_selection: str = 'size',
+                first_row: int = 0) -> pd.DataFrame:
+    """Price every row of ``frame`` on every platform in one vectorized pass.
+
+    Rows with an unknown ``business_size`` raise ValueError, numbered from 1
+    after ``first_row``.
+    """
+    if 'monthly_revenue' not in frame:
+        raise ValueError("input needs a 'monthly_revenue' column")
+    revenue = frame['monthly_revenue'].to_numpy(dtype=np.float64)
+    size = _business_size(frame, first_row)
+    n_platforms = len(catalog.platforms)
+
+    costs = batch_platform_costs(
+        catalog, revenue[:, None], size[:, None], np.arange(n_platforms),
+        plan=select_plans(catalog, size, revenue, plan_selection),
+        monthly_traffic=_usage_column(frame, 'monthly_traffic'),
+        num_products=_usage_column(frame, 'num_products'),
+    )
+
+    # Money is reported to the cent
+    total_monthly = costs['total_monthly'].round(2)
+    annual_cost = costs['annual_cost'].round(2)
+
+    columns = {}
+    if 'business_size' not in frame:
+        columns['business_size'] = pd.Categorical.from_codes(size, BUSINESS_SIZES)
+    for p, platform_name in enumerate(catalog.platforms):
+        slug = platform_slug(platform_name)
+        columns[f'{slug}_plan'] = pd.Categorical.from_codes(costs['plan_index'][:, p], catalog.plans[p])
+        columns[f'{slug}_total_monthly'] = total_monthly[:, p]
+        columns[f'{slug}_annual_cost'] = annual_cost[:, p]
+    cheapest = np.argmin(costs['total_monthly'], axis=1)
+    columns['cheapest_platform'] = pd.Categorical.from_codes(cheapest, catalog.platforms)
+    columns['cheapest_total_monthly'] = np.take_along_axis(total_monthly, cheapest[:, None], 1)[:, 0]
+    columns['cheapest_annual_cost'] = np.take_along_axis(annual_cost, cheapest[:, None], 1)[:, 0]
+
+    result = pd.DataFrame(columns, index=frame.index)
+    return pd.concat([frame, result], axis=1)
+
+
+def _quote_chunk(task):
+    # Serialization runs in the worker too; Arrow's CSV writer is several
+    # times faster than DataFrame.to_csv
+    import pyarrow as pa
+    table = pa.Table.from_pandas(quote_frame(task.catalog, task.frame, task.plan_selection, task.first_row), preserve_index=False)
+    if task.output_format == 'parquet':
+        return table.num_rows, table
+    from pyarrow import csv
+    buffer = pa.BufferOutputStream()
+    csv.write_csv(table, buffer, csv.WriteOptions(include_header=task.header))
+    return table.num_rows, buffer.getvalue().to_pybytes()
+
+
+def _file_format(path_or_buffer, explicit):
+    if explicit:
+        return explicit
+    name = str(getattr(path_or_buffer, 'name', path_or_buffer)).lower()
+    return 'parquet' if name.endswith(('.parquet', '.pq')) else 'csv'
+
+
+def iter_chunks(source, chunk_rows=DEFAULT_CHUNK_ROWS, input_format=None):
+    """Stream ``source`` (a path or a binary file object) as DataFrames."""
+    if _file_format(source, input_format) == 'parquet':
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(source).iter_batches(batch_size=chunk_rows):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(source, chunksize=chunk_rows)
+
+
+def _chunk_tasks(catalog, chunks, plan_selection, output_format):
+    first_row = 0
+    for index, frame in enumerate(chunks):
+        yield _ChunkTask(catalog, frame, plan_selection, output_format, header=index == 0, first_row=first_row)
+        first_row += len(frame)
+
+
+def quote_file(source, destination, catalog: CompiledCatalog | None = None, plan_selection: str = 'size',
+               chunk_rows: int = DEFAULT_CHUNK_ROWS, workers: int | None = None, input_format: str | None = None,
+               output_format: str | None = None, progress=None) -> int:
+    """Quote every row of ``source`` into ``destination``; return the row count.
+
+    ``source`` and ``destination`` are paths or binary file objects; formats
+    are inferred from the file names unless given.  ``progress(rows)`` is
+    called after each chunk is written.
+    """
+    if catalog is None:
+        from .api import get_compiled_catalog
+        catalog = get_compiled_catalog()
+    output_format = _file_format(destination, output_format)
+    tasks = _chunk_tasks(catalog, iter_chunks(source, chunk_rows, input_format), plan_selection, output_format)
+
+    rows = 0
+    writer = None
+    sink = open(destination, 'wb') if isinstance(destination, (str, os.PathLike)) else destination
+    try:
+        for n, chunk in iter_ordered(_quote_chunk, tasks, workers):
+            if output_format == 'parquet':
+                if writer is None:
+                    import pyarrow.parquet as pq
+                    writer = pq.ParquetWriter(sink, chunk.schema)
+                writer.write_table(chunk.cast(writer.schema))
+            else:
+                sink.write(chunk)
+            rows += n
+            if progress is not None:
+                progress(rows)
+    finally:
+        if writer is not None:
+            writer.close()
+        if sink is not destination:
+            sink.close()
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m ecommerce_costs.bulk',
+        description='Quote every scenario of a CSV or Parquet file on every platform.',
+    )
+    parser.add_argument('input', help='input .csv or .parquet file')
+    parser.add_argument('output', help='output .csv or .parquet file')
+    parser.add_argument('--plan-selection', choices=('size', 'cheapest'), default='size',
+                        help='price each platform on its business-size plan or its cheapest plan')
+    parser.add_argument('--chunk-rows', type=int, default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: all cores)')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    rows = quote_file(args.input, args.output, plan_selection=args.plan_selection,
+                      chunk_rows=args.chunk_rows, workers=args.workers)
+    print(f"Quoted {rows:,} rows in {time.perf_counter() - start:.1f}s -> {args.output}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
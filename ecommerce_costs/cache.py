@@ -0,0 +1,223 @@
+"""Process-wide memoization for the Streamlit rerun loop.
+
+Streamlit re-executes the dashboard script on every widget change, and each
+run defines its functions afresh.  ``memoize`` therefore keys its caches by
+the function's qualified name in a module-level registry, so every rerun and
+every browser session served by this process shares the same bounded LRU
+cache.  Cached values are shared objects: callers must treat them as
+read-only.  When several sessions miss the same key at once, the value is
+computed once and the other callers wait for it.
+"""
+import dataclasses
+import hashlib
+import inspect
+import threading
+from collections import OrderedDict
+from functools import wraps
+
+import numpy as np
+
+_MISSING = object()
+_ATOMIC = frozenset({int, float, str, bool, bytes, type(None)})
+
+
+class LRUCache:
+    """Thread-safe, size-bounded LRU mapping with hit/miss counters."""
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._inflight = {}       # key -> Event set once its first caller is done
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.coalesced = 0
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._data
+
+    def get(self, key, default=None):
+        with self._lock:
+            value = self._data.get(key, _MISSING)
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            self._evict()
+
+    def resize(self, maxsize):
+        """Change the size bound, evicting least recently used entries beyond it."""
+        with self._lock:
+            self.maxsize = maxsize
+            self._evict()
+
+    def _evict(self):
+        # Callers hold the lock
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def compute_once(self, key, compute):
+        """Compute and cache a missing value; concurrent callers for ``key`` share one computation."""
+        with self._lock:
+            value = self._data.get(key, _MISSING)
+            if value is not _MISSING:
+                return value
+            event = self._inflight.get(key)
+            if event is None:
+                event = self._inflight[key] = threading.Event()
+                owner = True
+            else:
+                owner = False
+                self.coalesced += 1
+
+        if not owner:
+            event.wait()
+            with self._lock:
+                value = self._data.get(key, _MISSING)
+            # The first caller failed, or the value was evicted already: compute it here
+            return compute() if value is _MISSING else value
+
+        try:
+            value = compute()
+            self.put(key, value)
+            return value
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            event.set()
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        # One consistent snapshot: counters only ever change under the lock
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'coalesced': self.coalesced,
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+            }
+
+
+_registry = {}
+_registry_lock = threading.Lock()
+
+
+def get_cache(name: str, maxsize: int = 128) -> LRUCache:
+    """Return the named process-wide cache, creating it on first use.
+
+    A different ``maxsize`` resizes an existing cache (see ``LRUCache.resize``).
+    """
+    with _registry_lock:
+        cache = _registry.get(name)
+        if cache is None:
+            cache = _registry[name] = LRUCache(maxsize)
+        elif cache.maxsize != maxsize:
+            cache.resize(maxsize)
+        return cache
+
+
+def make_key(value):
+    """Build a hashable cache key from (possibly nested, unhashable) inputs."""
+    if type(value) in _ATOMIC:
+        return value
+    if isinstance(value, np.ndarray):
+        return ('ndarray', value.dtype.str, value.shape, value.tobytes())
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, dict):
+        return ('dict', tuple((make_key(k), make_key(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return (type(value).__name__, tuple(make_key(v) for v in value))
+    if isinstance(value, (set, frozenset)):
+        return ('set', tuple(sorted(make_key(v) for v in value)))
+    fingerprint = getattr(value, 'fingerprint', None)
+    if fingerprint is not None:
+        return (type(value).__name__, fingerprint)
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return (type(value).__name__,
+                tuple(make_key(getattr(value, f.name)) for f in dataclasses.fields(value)))
+    hash(value)  # fail loudly on unsupported inputs rather than mis-keying
+    return value
+
+
+def _update_digest(digest, code):
+    digest.update(code.co_code)
+    for const in code.co_consts:
+        # Nested code objects (comprehensions, lambdas) repr with their address
+        if hasattr(const, 'co_code'):
+            _update_digest(digest, const)
+        else:
+            digest.update(repr(const).encode())
+
+
+def _code_digest(func):
+    # Digest the innermost function, not a decorator's wrapper
+    code = getattr(inspect.unwrap(func), '__code__', None)
+    if code is None:
+        return None
+    digest = hashlib.sha1()
+    _update_digest(digest, code)
+    return digest.hexdigest()
+
+
+def memoize(maxsize: int = 128, name: str | None = None):
+    """Cache ``func`` results by the value of its arguments.
+
+    The cache lives in the process-wide registry under ``name`` (default: the
+    function's qualified name).  Redefining a function with a different body
+    -- e.g. after editing the dashboard script -- drops its stale entries.
+    """
+    def decorator(func):
+        cache_name = name or f"{func.__module__}.{func.__qualname__}"
+        cache = get_cache(cache_name, maxsize)
+        digest = _code_digest(func)
+        if getattr(cache, 'digest', digest) != digest:
+            cache.clear()
+        cache.digest = digest
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            key = make_key((args, tuple(sorted(kwargs.items()))))
+            value = cache.get(key, _MISSING)
+            if value is _MISSING:
+                value = cache.compute_once(key, lambda: func(*args, **kwargs))
+            return value
+
+        wrapper.cache = cache
+        wrapper.cache_name = cache_name
+        return wrapper
+    return decorator
+
+
+def cache_stats() -> dict[str, dict]:
+    """Return ``{cache_name: stats}`` for every registered cache."""
+    with _registry_lock:
+        return {name: cache.stats() for name, cache in _registry.items()}
+
+
+def clear_caches() -> None:
+    """Drop every cached value (counters are kept)."""
+    with _registry_lock:
+        for cache in _registry.values():
+            cache.clear()
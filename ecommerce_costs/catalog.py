@@ -0,0 +1,97 @@
+"""Platform pricing catalog, loaded from an external TOML or JSON file.
+
+The catalog ships as ``data/pricing.toml``; ``ECOMMERCE_PRICING_PATH``
+points at another file.  A loaded catalog is versioned by the SHA-256 of the
+file content and compiled once into array tables.  Each lookup only stats
+the file: it is re-read when its mtime changes, and recompiled only if the
+content actually differs, so pricing updates need no code deploy.  Stored
+results of the version a change replaces are deleted from the result store.
+"""
+import hashlib
+import json
+import os
+import threading
+import tomllib
+from dataclasses import dataclass, replace
+from pathlib import Path
+
+from .engine import CompiledCatalog, compile_catalog
+
+PRICING_PATH_ENV = 'ECOMMERCE_PRICING_PATH'
+DEFAULT_PRICING_PATH = Path(__file__).parent / 'data' / 'pricing.toml'
+
+
+@dataclass(frozen=True)
+class _LoadedCatalog:
+    path: Path
+    mtime_ns: int
+    version: str
+    platform_data: dict
+    compiled: CompiledCatalog
+
+
+_loaded: dict[Path, _LoadedCatalog] = {}
+_lock = threading.Lock()
+
+
+def pricing_path() -> Path:
+    return Path(os.environ.get(PRICING_PATH_ENV) or DEFAULT_PRICING_PATH)
+
+
+def parse_pricing(content: bytes, suffix: str) -> dict:
+    """Parse pricing file content; ``suffix`` selects JSON or TOML."""
+    if suffix.lower() == '.json':
+        return json.loads(content)
+    return tomllib.loads(content.decode())
+
+
+def _load(path=None) -> _LoadedCatalog:
+    path = Path(path) if path is not None else pricing_path()
+    mtime_ns = path.stat().st_mtime_ns
+    loaded = _loaded.get(path)
+    if loaded is not None and loaded.mtime_ns == mtime_ns:
+        return loaded
+
+    with _lock:
+        loaded = _loaded.get(path)
+        if loaded is not None and loaded.mtime_ns == mtime_ns:
+            return loaded
+        content = path.read_bytes()
+        version = hashlib.sha256(content).hexdigest()[:16]
+        if loaded is not None and loaded.version == version:
+            # Touched but unchanged: keep the compiled tables and every cache keyed on them
+            loaded = replace(loaded, mtime_ns=mtime_ns)
+        else:
+            platform_data = parse_pricing(content, path.suffix)
+            compiled = replace(compile_catalog(platform_data), version=version)
+            superseded = loaded
+            loaded = _LoadedCatalog(path, mtime_ns, version, platform_data, compiled)
+            if superseded is not None and all(other.version != superseded.version
+                                              for other_path, other in _loaded.items() if other_path != path):
+                _drop_stored_results(superseded.version)
+        _loaded[path] = loaded
+        return loaded
+
+
+def _drop_stored_results(version):
+    from .store import get_store
+    store = get_store()
+    if store is not None:
+        store.drop_version(version)
+
+
+def load_catalog(path=None) -> CompiledCatalog:
+    """Compiled catalog from ``path`` (default: ``pricing_path()``), reloaded on change."""
+    return _load(path).compiled
+
+
+def get_platform_data(path=None) -> dict:
+    """Return the nested pricing dict, keyed by platform name.
+
+    The dict is shared between callers; treat it as read-only.
+    """
+    return _load(path).platform_data
+
+
+def catalog_version(path=None) -> str:
+    return _load(path).version
@@ -0,0 +1,330 @@
+"""Vectorized cost engine.
+
+The nested catalog returned by ``get_platform_data()`` is compiled once into
+dense (platform x plan) tables.  Any number of scenarios can then be priced
+with plain array indexing instead of one Python call per scenario.
+
+When a scenario's ``monthly_traffic`` or ``num_products`` is given, the
+metered infrastructure of self-hosted platforms is priced on top of the flat
+additional costs (see ``infrastructure``); without them every platform is
+priced flat, as before.
+"""
+import copy
+import hashlib
+from dataclasses import dataclass, fields
+from functools import cached_property
+from typing import NotRequired, TypedDict
+
+import numpy as np
+
+from .infrastructure import UsageTables, compile_usage, usage_costs, usage_drivers
+
+BUSINESS_SIZES = ("Startup", "Small", "Medium", "Enterprise")
+STARTUP, SMALL, MEDIUM, ENTERPRISE = range(len(BUSINESS_SIZES))
+# Upper product count of each business size but the last (see the sidebar labels)
+PRODUCT_SIZE_LIMITS = (100, 1_000, 10_000)
+
+COST_COMPONENTS = (
+    'monthly_platform',
+    'monthly_additional',
+    'monthly_transaction_fees',
+    'total_monthly',
+    'annual_cost',
+)
+_RESULT_KEYS = ('monthly_platform', 'monthly_additional', 'monthly_usage', 'monthly_transaction_fees',
+                'total_monthly', 'annual_cost', 'one_time_costs', 'transaction_rate')
+
+
+class PlatformCosts(TypedDict):
+    """Monthly/annual cost breakdown of one platform for one scenario."""
+    plan_name: str
+    monthly_platform: float
+    monthly_additional: float
+    monthly_usage: float          # usage-priced infrastructure, included in monthly_additional
+    monthly_transaction_fees: float
+    total_monthly: float
+    annual_cost: float
+    one_time_costs: float
+    transaction_rate: float
+    runner_up_plan: NotRequired[str | None]      # set by the plan optimizer
+    runner_up_margin: NotRequired[float]
+
+
+@dataclass(frozen=True)
+class CompiledCatalog:
+    """Array-backed view of the pricing catalog.
+
+    Plans are padded to the widest platform; padded cells hold NaN so they can
+    never be mistaken for a real price.  The arrays are read-only: one
+    compiled catalog is shared by every session and thread of the process.
+    """
+    platforms: tuple[str, ...]
+    plans: tuple[tuple[str, ...], ...]
+    n_plans: np.ndarray             # (P,) number of real plans per platform
+    plan_monthly: np.ndarray        # (P, K) plan subscription fee
+    transaction_rate: np.ndarray    # (P, K) all-in transaction rate for Qatar
+    monthly_additional: np.ndarray  # (P, S) additional monthly services per business size
+    size_plan: np.ndarray           # (P, S) default plan index per business size
+    one_time: np.ndarray            # (P,) one-time setup costs
+    revenue_limit: np.ndarray       # (P, K) trailing-12-month sales cap per plan, inf if none
+    usage: UsageTables              # metered infrastructure of self-hosted platforms
+    version: str = ''               # content hash of the pricing file it was loaded from
+
+    @cached_property
+    def fingerprint(self) -> str:
+        """Content hash used to key caches on the catalog they were computed from."""
+        digest = hashlib.sha1(repr((self.platforms, self.plans, self.usage.components)).encode())
+        for table in (self, self.usage):
+            for field in fields(table):
+                value = getattr(table, field.name)
+                if isinstance(value, np.ndarray):
+                    digest.update(value.tobytes())
+        return digest.hexdigest()
+
+    def platform_index(self, names) -> np.ndarray:
+        lookup = {name: i for i, name in enumerate(self.platforms)}
+        return np.array([lookup[name] for name in np.atleast_1d(names)], dtype=np.intp).reshape(np.shape(names))
+
+    def plan_name(self, platform: int, plan: int) -> str:
+        return self.plans[platform][plan]
+
+
+def business_size_code(business_size) -> np.ndarray:
+    """Map sidebar business-size labels to integer codes (0=Startup ... 3=Enterprise)."""
+    if isinstance(business_size, str):
+        return np.intp(_size_code(business_size))
+    labels = np.asarray(business_size)
+    if labels.dtype.kind in 'iu':
+        return labels.astype(np.intp)
+    # Only a handful of distinct labels ever occur, so classify the uniques
+    uniques, inverse = np.unique(labels.astype(str), return_inverse=True)
+    codes = np.array([_size_code(label) for label in uniques], dtype=np.intp)
+    return codes[inverse].reshape(labels.shape)
+
+
+def is_business_size(label) -> bool:
+    """Whether ``label`` names a business size: it starts with one of ``BUSINESS_SIZES``.
+
+    ``business_size_code`` reads anything else as Enterprise, so check input
+    from outside the dashboard with this first.
+    """
+    return isinstance(label, str) and label.startswith(BUSINESS_SIZES)
+
+
+def product_size_code(num_products) -> np.ndarray:
+    """Map product counts to business-size codes (100 products is still a Startup)."""
+    return np.searchsorted(PRODUCT_SIZE_LIMITS, np.asarray(num_products, dtype=np.float64), side='left')
+
+
+def _size_code(label):
+    for code, prefix in enumerate(BUSINESS_SIZES[:-1]):
+        if label.startswith(prefix):
+            return code
+    return ENTERPRISE
+
+
+def _default_plan(n_plans, size_code):
+    # Determine appropriate plan based on business size
+    if size_code == STARTUP:
+        return 0  # First plan
+    if size_code == SMALL:
+        return min(1, n_plans - 1)  # Second plan or last
+    if size_code == MEDIUM:
+        return min(2, n_plans - 1)  # Third plan or last
+    return n_plans - 1  # Last plan
+
+
+def _qatar_rules(platform_name, plan, additional, size_code):
+    """Return (transaction rate, monthly additional, one-time) for one plan."""
+    base_transaction_fee = plan['transaction_fee']
+
+    # Additional fees specific to Qatar
+    if platform_name == 'Shopify':
+        # No Shopify Payments in Qatar, must use third-party
+        total_transaction_rate = base_transaction_fee + additional.get('third_party_gateway', 0) + additional.get('international_fee', 0)
+        monthly_additional = additional['apps_basic'] if size_code == STARTUP else additional['apps_advanced']
+        one_time = additional['theme']
+    elif platform_name == 'WooCommerce':
+        total_transaction_rate = additional['payment_gateway']  # Dibsy for Qatar
+        monthly_additional = additional['hosting'] + additional['plugins'] + additional['security'] + additional['ssl'] + additional['maintenance']
+        one_time = 0
+    elif platform_name == 'Custom Next.js':
+        total_transaction_rate = additional['stripe_fee'] + additional['international_fee']
+        monthly_additional = additional['database'] + additional['cdn'] + additional['monitoring'] + additional['email_service']
+        one_time = additional['development']
+    else:
+        total_transaction_rate = base_transaction_fee + additional.get('international_fee', 0)
+        monthly_additional = additional.get('apps', 0)
+        one_time = additional.get('theme', 0)
+
+    return total_transaction_rate, monthly_additional, one_time
+
+
+def compile_catalog(platforms_data: dict) -> CompiledCatalog:
+    """Compile the nested pricing dict into a :class:`CompiledCatalog`."""
+    platforms = tuple(platforms_data)
+    plans = tuple(tuple(data['plans']) for data in platforms_data.values())
+    n_sizes = len(BUSINESS_SIZES)
+    n_platforms = len(platforms)
+    width = max(len(p) for p in plans)
+
+    n_plans = np.array([len(p) for p in plans], dtype=np.intp)
+    plan_monthly = np.full((n_platforms, width), np.nan)
+    transaction_rate = np.full((n_platforms, width), np.nan)
+    monthly_additional = np.zeros((n_platforms, n_sizes))
+    size_plan = np.zeros((n_platforms, n_sizes), dtype=np.intp)
+    one_time = np.zeros(n_platforms)
+    revenue_limit = np.full((n_platforms, width), np.inf)
+
+    # The platform-specific rules run once per (platform, plan, size) here
+    # rather than once per scenario in the hot path.
+    for p, (platform_name, data) in enumerate(platforms_data.items()):
+        additional = data['additional_costs']
+        for k, plan in enumerate(data['plans'].values()):
+            plan_monthly[p, k] = plan['monthly']
+            revenue_limit[p, k] = plan.get('annual_revenue_limit', np.inf)
+            transaction_rate[p, k], _, one_time[p] = _qatar_rules(platform_name, plan, additional, STARTUP)
+        first_plan = next(iter(data['plans'].values()))
+        for s in range(n_sizes):
+            size_plan[p, s] = _default_plan(n_plans[p], s)
+            monthly_additional[p, s] = _qatar_rules(platform_name, first_plan, additional, s)[1]
+
+    catalog = CompiledCatalog(
+        platforms=platforms,
+        plans=plans,
+        n_plans=n_plans,
+        plan_monthly=plan_monthly,
+        transaction_rate=transaction_rate,
+        monthly_additional=monthly_additional,
+        size_plan=size_plan,
+        one_time=one_time,
+        revenue_limit=revenue_limit,
+        usage=compile_usage(platforms_data),
+    )
+    for table in (catalog, catalog.usage):
+        for field in fields(table):
+            value = getattr(table, field.name)
+            if isinstance(value, np.ndarray):
+                value.flags.writeable = False
+    return catalog
+
+
+def _metered(monthly_traffic, num_products):
+    return monthly_traffic is not None or num_products is not None
+
+
+def batch_platform_costs(catalog: CompiledCatalog, monthly_revenue, business_size, platform,
+                         plan=None, monthly_traffic=None, num_products=None) -> dict[str, np.ndarray]:
+    """Price many scenarios in one vectorized pass.
+
+    ``monthly_revenue``, ``business_size`` (labels or codes), ``platform``
+    (integer indices into ``catalog.platforms``) and the optional ``plan``
+    override, ``monthly_traffic`` and ``num_products`` broadcast against each
+    other.  A negative ``plan`` falls back to the business-size default.
+    Usage-based infrastructure is priced when ``monthly_traffic`` or
+    ``num_products`` is given (the other one then counts as zero).  Returns a
+    dict of arrays keyed like the result of ``calculate_platform_costs`` plus
+    ``plan_index``.
+    """
+    revenue = np.asarray(monthly_revenue, dtype=np.float64)
+    size = business_size_code(business_size)
+    platform = np.asarray(platform, dtype=np.intp)
+    # Usage drivers are per scenario, not per platform: derive them before
+    # broadcasting (only their shape takes part)
+    drivers = None
+    if _metered(monthly_traffic, num_products):
+        drivers = usage_drivers(monthly_traffic if monthly_traffic is not None else 0,
+                                num_products if num_products is not None else 0)
+    usage = () if drivers is None else (drivers[..., 0],)
+    if plan is None:
+        shape = np.broadcast(revenue, size, platform, *usage).shape
+        plan_index = catalog.size_plan[platform, size]
+    else:
+        plan = np.asarray(plan, dtype=np.intp)
+        shape = np.broadcast(revenue, size, platform, plan, *usage).shape
+        plan_index = np.where(plan < 0, catalog.size_plan[platform, size], plan)
+
+    monthly_platform = catalog.plan_monthly[platform, plan_index]
+    monthly_additional = catalog.monthly_additional[platform, size]
+    if drivers is not None:
+        monthly_usage = usage_costs(catalog.usage, platform, drivers)
+        monthly_additional = monthly_additional + monthly_usage
+    else:
+        monthly_usage = np.zeros(shape)
+    transaction_rate = catalog.transaction_rate[platform, plan_index]
+    one_time = catalog.one_time[platform]
+
+    monthly_transaction_fees = revenue * transaction_rate
+    total_monthly = monthly_platform + monthly_additional + monthly_transaction_fees
+    annual_cost = total_monthly * 12 + one_time
+
+    # Inputs broadcast inside the arithmetic; give every result the full
+    # shape, as views, only where it lacks some of it (np.broadcast_arrays
+    # alone would dominate a single-scenario quote)
+    plan_index, monthly_platform, monthly_additional, monthly_usage, monthly_transaction_fees, total_monthly, \
+        annual_cost, one_time, transaction_rate = (
+            values if values.shape == shape else np.broadcast_to(values, shape)
+            for values in (plan_index, monthly_platform, monthly_additional, monthly_usage,
+                           monthly_transaction_fees, total_monthly, annual_cost, one_time, transaction_rate)
+        )
+
+    return {
+        'plan_index': plan_index,
+        'monthly_platform': monthly_platform,
+        'monthly_additional': monthly_additional,
+        'monthly_usage': monthly_usage,
+        'monthly_transaction_fees': monthly_transaction_fees,
+        'total_monthly': total_monthly,
+        'annual_cost': annual_cost,
+        'one_time_costs': one_time,
+        'transaction_rate': transaction_rate,
+    }
+
+
+def quote_all_platforms(catalog: CompiledCatalog, monthly_revenue: float, business_size,
+                        plan=None, monthly_traffic=None, num_products=None) -> dict[str, PlatformCosts]:
+    """Cost every platform in the catalog for a single scenario.
+
+    Returns ``{platform_name: costs}`` in catalog order, where ``costs`` has
+    the same keys as ``calculate_platform_costs``.
+    """
+    platform = np.arange(len(catalog.platforms))
+    batch = batch_platform_costs(catalog, monthly_revenue, business_size, platform, plan,
+                                 monthly_traffic, num_products)
+    # One tolist() per column is much cheaper than one .item() per cell
+    columns = [batch[key].tolist() for key in _RESULT_KEYS]
+    plan_index = batch['plan_index'].tolist()
+    return {
+        name: {'plan_name': catalog.plan_name(p, plan_index[p]), **dict(zip(_RESULT_KEYS, row))}
+        for p, (name, *row) in enumerate(zip(catalog.platforms, *columns))
+    }
+
+
+def calculate_platform_costs(platform_name: str, platform_data: dict, monthly_revenue: float,
+                             business_size: str, monthly_traffic=None, num_products=None) -> PlatformCosts:
+    """Cost a single platform for a single scenario.
+
+    A thin wrapper over ``quote_all_platforms``: the platform is compiled
+    into a one-platform catalog (memoized on its content) and priced by the
+    batch engine.
+    """
+    catalog = _compile_platform(platform_name, platform_data)
+    return quote_all_platforms(catalog, monthly_revenue, business_size,
+                               monthly_traffic=monthly_traffic, num_products=num_products)[platform_name]
+
+
+_platform_catalogs = {}   # id(platform_data) -> (name, snapshot, catalog)
+
+
+def _compile_platform(platform_name, platform_data):
+    # Callers pass the same dict over and over; an equality check against a
+    # snapshot is far cheaper than hashing its content, and still notices
+    # in-place edits
+    cached = _platform_catalogs.get(id(platform_data))
+    if cached is not None and cached[0] == platform_name and cached[1] == platform_data:
+        return cached[2]
+    catalog = compile_catalog({platform_name: platform_data})
+    if len(_platform_catalogs) >= 64:
+        _platform_catalogs.clear()
+    _platform_catalogs[id(platform_data)] = (platform_name, copy.deepcopy(platform_data), catalog)
+    return catalog
@@ -0,0 +1,140 @@
+"""Exact platform crossover points via the lower envelope of cost lines.
+
+For a fixed plan, ``total_monthly = intercept + transaction_rate * revenue``.
+The cheapest option at each revenue is therefore the lower envelope of a
+set of lines, which is built in O(n log n) with the convex-hull trick.  The
+resulting breakpoints are sorted, so "cheapest at revenue X" is a binary
+search (``np.searchsorted``), vectorized over any number of revenues.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+from .engine import batch_platform_costs
+
+
+@dataclass(frozen=True)
+class LowerEnvelope:
+    intercepts: np.ndarray    # (n,) cost at zero revenue, for every option
+    slopes: np.ndarray        # (n,) all-in transaction rate, for every option
+    breakpoints: np.ndarray   # (h - 1,) ascending revenues where the cheapest option changes
+    options: np.ndarray       # (h,) option cheapest on each interval between breakpoints
+    x_min: float = 0.0        # start of the revenue domain
+
+    def cheapest_at(self, revenue) -> np.ndarray:
+        """Index of the cheapest option at ``revenue`` (scalar or array)."""
+        return self.options[np.searchsorted(self.breakpoints, revenue, side='right')]
+
+    def cost_at(self, revenue) -> np.ndarray:
+        option = self.cheapest_at(revenue)
+        return self.intercepts[option] + self.slopes[option] * np.asarray(revenue, dtype=np.float64)
+
+    def intervals(self) -> list[tuple[float, float, int]]:
+        """``[(start, end, option), ...]`` covering [x_min, inf)."""
+        starts = np.concatenate([[self.x_min], self.breakpoints])
+        ends = np.concatenate([self.breakpoints, [np.inf]])
+        return [(float(a), float(b), int(o)) for a, b, o in zip(starts, ends, self.options)]
+
+
+def lower_envelope(intercepts, slopes, x_min: float = 0.0, limits=None) -> LowerEnvelope:
+    """Build the lower envelope of ``intercepts + slopes * x`` for ``x >= x_min``.
+
+    Among identical lines the lowest index wins.  ``limits`` optionally caps
+    the revenue up to which each option is available (inclusive); the
+    envelope is then built per stretch between caps, from the options still
+    available there.  Options with the highest limit stay available past it,
+    so some option always is.
+    """
+    intercepts = np.asarray(intercepts, dtype=np.float64)
+    slopes = np.asarray(slopes, dtype=np.float64)
+    if limits is None:
+        breakpoints, options = _hull(intercepts, slopes, x_min)
+    else:
+        breakpoints, options = _capped_hull(intercepts, slopes, np.asarray(limits, dtype=np.float64), x_min)
+    return LowerEnvelope(
+        intercepts=intercepts,
+        slopes=slopes,
+        breakpoints=breakpoints,
+        options=options,
+        x_min=float(x_min),
+    )
+
+
+def _hull(intercepts, slopes, x_min):
+    # Steepest first: as x grows, flatter lines take over
+    order = np.lexsort((np.arange(len(slopes)), intercepts, -slopes))
+    hull = []
+    for i in order:
+        if hull and slopes[hull[-1]] == slopes[i]:
+            continue  # same slope, higher (or equal, later) intercept: never cheaper
+        while len(hull) >= 2:
+            a, b = hull[-2], hull[-1]
+            # b is redundant if a and i cross no later than a and b
+            if (intercepts[i] - intercepts[a]) * (slopes[a] - slopes[b]) <= \
+                    (intercepts[b] - intercepts[a]) * (slopes[a] - slopes[i]):
+                hull.pop()
+            else:
+                break
+        hull.append(i)
+
+    hull = np.array(hull, dtype=np.intp)
+    breakpoints = (intercepts[hull[1:]] - intercepts[hull[:-1]]) / (slopes[hull[:-1]] - slopes[hull[1:]])
+
+    # Drop segments that end before the domain starts
+    first = np.searchsorted(breakpoints, x_min, side='right')
+    return breakpoints[first:], hull[first:]
+
+
+def _capped_hull(intercepts, slopes, limits, x_min):
+    top = limits.max()
+    caps = np.unique(limits[(limits > x_min) & (limits < top)])
+    breakpoints, options = [], []
+    start = x_min
+    for end in (*caps, np.inf):
+        available = np.flatnonzero(limits >= min(end, top))
+        local_breakpoints, local_options = _hull(intercepts[available], slopes[available], start)
+        inside = int(np.count_nonzero(local_breakpoints < end))
+        if options:
+            # A plan is still available at exactly its cap
+            breakpoints.append(np.nextafter(start, np.inf))
+        breakpoints.extend(local_breakpoints[:inside])
+        options.extend(available[local_options[:inside + 1]])
+        start = end
+
+    breakpoints = np.array(breakpoints, dtype=np.float64)
+    options = np.array(options, dtype=np.intp)
+    # Merge stretches where the same option stays cheapest across a cap
+    changes = options[1:] != options[:-1]
+    return breakpoints[changes], options[np.concatenate([[True], changes])]
+
+
+def catalog_cost_lines(catalog, business_size, all_plans: bool = True,
+                       monthly_traffic=None, num_products=None) -> tuple[np.ndarray, ...]:
+    """Cost lines for every plan of every platform (or each platform's default plan).
+
+    Usage-based infrastructure for ``monthly_traffic`` and ``num_products``
+    (see ``batch_platform_costs``) does not depend on revenue, so it only
+    raises the intercepts.  Returns ``(intercepts, slopes, platform_index,
+    plan_index)``.
+    """
+    if all_plans:
+        platform = np.repeat(np.arange(len(catalog.platforms)), catalog.n_plans)
+        plan = np.concatenate([np.arange(n) for n in catalog.n_plans])
+    else:
+        platform = np.arange(len(catalog.platforms))
+        plan = -np.ones_like(platform)
+    at_zero = batch_platform_costs(catalog, 0.0, business_size, platform, plan, monthly_traffic, num_products)
+    return at_zero['total_monthly'], at_zero['transaction_rate'], platform, at_zero['plan_index']
+
+
+def catalog_revenue_limits(catalog, platform, plan) -> np.ndarray:
+    """Monthly revenue up to which each (platform, plan) option is available.
+
+    A plan's ``annual_revenue_limit`` caps it at a twelfth of that.  Each
+    platform's highest-capped plans stay available past their cap, so every
+    platform always has a plan.
+    """
+    limits = catalog.revenue_limit / 12
+    real = np.arange(limits.shape[1]) < catalog.n_plans[:, None]
+    top = np.where(real, limits, -np.inf).max(axis=1, keepdims=True)
+    return np.where(limits >= top, np.inf, limits)[platform, plan]
@@ -0,0 +1,229 @@
+"""Plotly figure builders for the dashboard and exported reports.
+
+Figures are memoized on their inputs, so an unchanged chart is reused across
+reruns and sessions; treat returned figures as read-only.  Plotly is only
+imported when a figure is first built, keeping the rest of the package
+importable without it.
+"""
+from .api import compute_sensitivity_grid, compute_usage_scaling
+from .cache import memoize
+from .frame import platform_row, results_frame
+
+
+def _px():
+    import plotly.express as px
+    return px
+
+
+def _go():
+    import plotly.graph_objects as go
+    return go
+
+
+@memoize(maxsize=64)
+def build_total_cost_figure(platform_costs, cost_key, title, axis_label, color_scale):
+    # Built with graph_objects: the plotly.express equivalent is several times slower
+    go = _go()
+    frame = results_frame(platform_costs)
+    costs = frame[cost_key]
+    fig = go.Figure(go.Bar(
+        x=frame['platform'],
+        y=costs,
+        marker=dict(color=costs, coloraxis='coloraxis'),
+        hovertemplate=f'Platform=%{{x}}<br>{axis_label}=%{{y}}<extra></extra>',
+    ))
+    fig.update_layout(
+        title=title,
+        xaxis_title='Platform',
+        yaxis_title=axis_label,
+        coloraxis=dict(colorscale=color_scale, colorbar=dict(title=dict(text=axis_label))),
+        showlegend=False,
+        height=400
+    )
+    return fig
+
+
+@memoize(maxsize=64)
+def build_breakdown_figure(platform_costs):
+    go = _go()
+    frame = results_frame(platform_costs)
+    platforms = frame['platform']
+
+    fig = go.Figure(data=[
+        go.Bar(name='Platform Fees', x=platforms, y=frame['monthly_platform']),
+        go.Bar(name='Additional Services', x=platforms, y=frame['monthly_additional']),
+        go.Bar(name='Transaction Fees', x=platforms, y=frame['monthly_transaction_fees'])
+    ])
+
+    fig.update_layout(
+        barmode='stack',
+        title='Monthly Cost Breakdown by Component',
+        xaxis_title='Platform',
+        yaxis_title='Cost (USD)',
+        height=500
+    )
+    return fig
+
+
+@memoize(maxsize=256)
+def build_pie_figure(platform_costs, platform_name):
+    px = _px()
+    row = platform_row(results_frame(platform_costs), platform_name)
+    # Cost components pie chart
+    labels = ['Platform Fee', 'Additional Services', 'Transaction Fees']
+    values = [row['monthly_platform'], row['monthly_additional'], row['monthly_transaction_fees']]
+
+    fig = px.pie(
+        values=values,
+        names=labels,
+        title=f"{platform_name} Cost Breakdown"
+    )
+    fig.update_layout(height=300)
+    return fig
+
+
+@memoize(maxsize=64)
+def build_projection_figure(platform_names, projection):
+    go = _go()
+    fig = go.Figure()
+
+    # Markers only help on short horizons; multi-year projections stay readable as lines
+    mode = 'lines+markers' if len(projection.months) <= 36 else 'lines'
+    for platform_name, platform_profits in zip(platform_names, projection.cumulative_profit):
+        fig.add_trace(go.Scatter(
+            x=projection.months,
+            y=platform_profits,
+            mode=mode,
+            name=platform_name,
+            line=dict(width=3)
+        ))
+
+    fig.update_layout(
+        title='Cumulative Profit Projection by Platform',
+        xaxis_title='Months',
+        yaxis_title='Cumulative Profit (USD)',
+        height=500,
+        hovermode='x unified'
+    )
+
+    # Add break-even line
+    fig.add_hline(y=0, line_dash="dash", line_color="red", annotation_text="Break-even")
+    return fig
+
+
+@memoize(maxsize=32)
+def build_usage_scaling_figure(catalog, num_products, monthly_traffic, traffic_range=(100, 10_000_000)):
+    go = _go()
+    traffic, costs = compute_usage_scaling(catalog, num_products, traffic_range)
+    usage = catalog.usage
+    fig = go.Figure()
+
+    # One solid total per self-hosted platform, its metered components dotted
+    for p, platform_name in enumerate(catalog.platforms):
+        metered = [c for c in range(len(usage.components)) if usage.included[p, c] or costs[:, p, c].any()]
+        if not metered:
+            continue
+        fig.add_trace(go.Scatter(x=traffic, y=costs[:, p].sum(axis=1), mode='lines', name=platform_name,
+                                 legendgroup=platform_name, line=dict(width=3)))
+        for c in metered:
+            fig.add_trace(go.Scatter(x=traffic, y=costs[:, p, c], mode='lines', legendgroup=platform_name,
+                                     name=f'{platform_name} {usage.components[c]}', line=dict(dash='dot')))
+
+    fig.update_layout(
+        title=f'Infrastructure Cost by Monthly Traffic ({num_products:,} products)',
+        xaxis_title='Monthly Visits',
+        xaxis_type='log',
+        yaxis_title='Monthly Cost (USD)',
+        height=450,
+        hovermode='x unified'
+    )
+    fig.add_vline(x=monthly_traffic, line_dash="dash", line_color="gray", annotation_text="Current traffic")
+    return fig
+
+
+@memoize(maxsize=32)
+def build_risk_band_figure(platform_name, months, percentiles):
+    go = _go()
+    fig = go.Figure()
+
+    # Outer (P5-P95) and inner (P25-P75) bands, drawn as filled areas
+    for low, high, opacity in ((5, 95, 0.15), (25, 75, 0.3)):
+        fig.add_trace(go.Scatter(x=months, y=percentiles[high], mode='lines', line=dict(width=0),
+                                 showlegend=False, hoverinfo='skip'))
+        fig.add_trace(go.Scatter(x=months, y=percentiles[low], mode='lines', line=dict(width=0),
+                                 fill='tonexty', fillcolor=f'rgba(31, 119, 180, {opacity})',
+                                 name=f'P{low}-P{high}'))
+    fig.add_trace(go.Scatter(x=months, y=percentiles[50], mode='lines', name='Median',
+                             line=dict(width=3, color='#1f77b4')))
+
+    fig.update_layout(
+        title=f'{platform_name} Cumulative Profit Percentile Bands',
+        xaxis_title='Months',
+        yaxis_title='Cumulative Profit (USD)',
+        height=450,
+        hovermode='x unified'
+    )
+    fig.add_hline(y=0, line_dash="dash", line_color="red", annotation_text="Break-even")
+    return fig
+
+
+@memoize(maxsize=32)
+def build_break_even_probability_figure(platform_names, months, break_even_probability):
+    go = _go()
+    fig = go.Figure()
+
+    for platform_name, probability in zip(platform_names, break_even_probability):
+        fig.add_trace(go.Scatter(x=months, y=probability, mode='lines', name=platform_name, line=dict(width=3)))
+
+    fig.update_layout(
+        title='Probability of Breaking Even by Month',
+        xaxis_title='Months',
+        yaxis_title='Probability',
+        yaxis_tickformat='.0%',
+        height=450,
+        hovermode='x unified'
+    )
+    return fig
+
+
+@memoize(maxsize=16)
+def build_sensitivity_figures(platform_costs, horizon, revenue_range, growth_range, resolution, break_even_platform):
+    px = _px()
+    go = _go()
+    grid = compute_sensitivity_grid(platform_costs, horizon, revenue_range, growth_range, resolution)
+    platform_names = list(platform_costs.keys())
+    axes = dict(x=grid.revenues, y=grid.growth_rates)
+    layout = dict(xaxis_title='Monthly Revenue (USD)', yaxis_title='Monthly Growth Rate (%)', height=450)
+
+    # Discrete colorscale: one flat band per platform index
+    n = len(platform_names)
+    colors = px.colors.qualitative.Plotly
+    colorscale = []
+    for i in range(n):
+        colorscale += [[i / n, colors[i % len(colors)]], [(i + 1) / n, colors[i % len(colors)]]]
+    fig_cheapest = go.Figure(go.Heatmap(
+        z=grid.cheapest, zmin=-0.5, zmax=n - 0.5, colorscale=colorscale,
+        # No per-cell platform names: the colorbar names them, and at full
+        # resolution the names alone would add megabytes of figure JSON
+        hovertemplate='Revenue $%{x:,.0f}<br>Growth %{y}%<extra></extra>',
+        colorbar=dict(tickvals=list(range(n)), ticktext=platform_names), **axes
+    ))
+    fig_cheapest.update_layout(title=f'Cheapest Platform over {horizon} Months', **layout)
+
+    fig_spread = go.Figure(go.Heatmap(
+        z=grid.spread, colorscale='viridis', colorbar=dict(title='USD'),
+        hovertemplate='Revenue $%{x:,.0f}<br>Growth %{y}%<br>Spread $%{z:,.0f}<extra></extra>', **axes
+    ))
+    fig_spread.update_layout(title=f'{horizon}-Month Cost Spread (Most - Least Expensive)', **layout)
+
+    if break_even_platform in platform_names:
+        break_even = grid.break_even[platform_names.index(break_even_platform)]
+    else:
+        break_even = grid.cheapest_break_even()
+    fig_break_even = go.Figure(go.Heatmap(
+        z=break_even, colorscale='plasma_r', zmin=1, zmax=horizon, colorbar=dict(title='Month'),
+        hovertemplate='Revenue $%{x:,.0f}<br>Growth %{y}%<br>Month %{z}<extra></extra>', **axes
+    ))
+    fig_break_even.update_layout(title=f'Break-even Month ({break_even_platform})', **layout)
+
+    return fig_cheapest, fig_spread, fig_break_even
@@ -0,0 +1,52 @@
+"""Columnar results frame shared by the comparison table and the charts.
+
+``results_frame`` turns one ``{platform: costs}`` result into a DataFrame
+with one row per platform: categorical ``platform`` and ``plan`` columns
+and float32 cost columns.  It is built once per result (memoized) and holds
+raw numbers only; formatting is left to the display layer.  Consumers that
+are memoized themselves key on the ``platform_costs`` dict and fetch the
+frame from here, which is cheaper than hashing a DataFrame.
+
+pandas is imported here, not by the package, so import this module
+explicitly.
+"""
+import numpy as np
+import pandas as pd
+
+from .cache import memoize
+
+COST_COLUMNS = (
+    'monthly_platform',
+    'monthly_additional',
+    'monthly_usage',
+    'monthly_transaction_fees',
+    'total_monthly',
+    'annual_cost',
+    'one_time_costs',
+)
+
+
+@memoize(maxsize=256)
+def results_frame(platform_costs: dict) -> pd.DataFrame:
+    """One row per platform, in catalog order; treat the result as read-only."""
+    costs = list(platform_costs.values())
+    platforms = list(platform_costs)
+    columns = {
+        'platform': pd.Categorical(platforms, categories=platforms),
+        'plan': pd.Categorical([c['plan_name'] for c in costs]),
+    }
+    for column in COST_COLUMNS:
+        columns[column] = np.array([c[column] for c in costs], dtype=np.float32)
+    columns['transaction_rate'] = np.array([c['transaction_rate'] for c in costs], dtype=np.float32)
+    if costs and 'runner_up_plan' in costs[0]:
+        columns['runner_up_plan'] = pd.Categorical([c['runner_up_plan'] for c in costs])
+        # No runner-up leaves an infinite margin; show it as missing
+        margin = np.array([c['runner_up_margin'] for c in costs], dtype=np.float32)
+        columns['runner_up_margin'] = np.where(np.isfinite(margin), margin, np.nan).astype(np.float32)
+
+    return pd.DataFrame(columns)
+
+
+def platform_row(frame: pd.DataFrame, platform_name: str) -> pd.Series:
+    """The results row of one platform."""
+    return frame.iloc[frame['platform'].cat.categories.get_loc(platform_name)]
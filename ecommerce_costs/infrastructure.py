@@ -0,0 +1,214 @@
+"""Usage-based infrastructure pricing for the self-hosted platforms.
+
+A flat ``hosting``, ``database`` or ``cdn`` fee only holds for a small site.
+Here a scenario's ``monthly_traffic`` and ``num_products`` are turned into
+usage drivers (bandwidth, requests, storage, database queries, server
+instances) under a ``Workload`` of per-visit and per-product assumptions.
+Platforms that self-host meter them in the pricing catalog::
+
+    [WooCommerce.usage.hosting]
+    instances = [[1, 0], [inf, 40]]        # [[up to, USD per unit], ...]
+
+Each meter prices one driver of one additional-cost component in tiers,
+marginally (like tax brackets); the last tier must be open-ended.  Meters
+price usage *above* what the component's flat amount includes, so a zero
+first tier keeps small sites on the flat price.
+
+Meters are compiled into dense (platform x meter x tier) tables.  Tiered
+cost is piecewise linear in usage, so each meter is one ``np.interp`` over
+all scenarios; the Python loop runs over the handful of meters only.
+"""
+from dataclasses import dataclass
+from functools import cached_property
+
+import numpy as np
+
+DRIVERS = (
+    'bandwidth_gb',    # data served per month
+    'requests_m',      # HTTP requests per month, millions
+    'storage_gb',      # media and site files
+    'db_storage_gb',   # catalog data in the database
+    'db_queries_m',    # database queries per month, millions
+    'instances',       # application servers needed at peak load
+)
+SECONDS_PER_MONTH = 30.44 * 24 * 3600
+
+
+@dataclass(frozen=True)
+class Workload:
+    """Per-visit and per-product assumptions behind the usage drivers."""
+    pages_per_visit: float = 4.0
+    page_weight_mb: float = 2.0            # transferred per page view, assets included
+    requests_per_page: float = 30.0
+    queries_per_page: float = 25.0
+    peak_to_average: float = 10.0          # sale-day peak traffic over the monthly average
+    pages_per_second_per_instance: float = 5.0
+    base_storage_gb: float = 5.0           # code, theme and uploads besides product media
+    media_mb_per_product: float = 2.0
+    db_base_gb: float = 1.0
+    db_kb_per_product: float = 50.0
+
+
+DEFAULT_WORKLOAD = Workload()
+
+
+def usage_drivers(monthly_traffic, num_products, workload: Workload = DEFAULT_WORKLOAD) -> np.ndarray:
+    """Usage drivers for each scenario: shape (..., len(DRIVERS)).
+
+    ``monthly_traffic`` (visits) and ``num_products`` broadcast against each
+    other.
+    """
+    traffic = np.asarray(monthly_traffic, dtype=np.float64)
+    products = np.asarray(num_products, dtype=np.float64)
+    traffic, products = np.broadcast_arrays(traffic, products)
+
+    page_views = traffic * workload.pages_per_visit
+    peak_pages_per_second = page_views / SECONDS_PER_MONTH * workload.peak_to_average
+    return np.stack([
+        page_views * workload.page_weight_mb / 1024,
+        page_views * workload.requests_per_page / 1e6,
+        workload.base_storage_gb + products * workload.media_mb_per_product / 1024,
+        workload.db_base_gb + products * workload.db_kb_per_product / 1024**2,
+        page_views * workload.queries_per_page / 1e6,
+        np.maximum(1, np.ceil(peak_pages_per_second / workload.pages_per_second_per_instance)),
+    ], axis=-1)
+
+
+@dataclass(frozen=True)
+class UsageTables:
+    """Compiled usage meters; padded meters and tiers price nothing."""
+    components: tuple[str, ...]   # component names, indexed by ``component``
+    included: np.ndarray          # (P, C) flat monthly amount of each metered component
+    component: np.ndarray         # (P, M) component index of each meter
+    driver: np.ndarray            # (P, M) index into DRIVERS
+    tier_start: np.ndarray        # (P, M, T) usage at which each tier starts
+    tier_width: np.ndarray        # (P, M, T) usage covered by each tier, inf for the last
+    tier_price: np.ndarray        # (P, M, T) USD per unit within the tier
+
+    @cached_property
+    def meters(self) -> tuple:
+        """The meters that charge anything, ready to evaluate."""
+        return _active_meters(self)
+
+
+def _parse_tiers(platform_name, component, driver, tiers):
+    where = f"{platform_name}.usage.{component}.{driver}"
+    if driver not in DRIVERS:
+        raise ValueError(f"{where}: unknown driver (expected one of {', '.join(DRIVERS)})")
+    bounds = np.array([float(upper) for upper, _ in tiers])
+    prices = np.array([float(price) for _, price in tiers])
+    if not len(bounds) or bounds[-1] != np.inf:
+        raise ValueError(f"{where}: the last tier must be open-ended (up to inf)")
+    if np.any(np.diff(bounds) <= 0) or bounds[0] <= 0:
+        raise ValueError(f"{where}: tier bounds must be positive and increasing")
+    starts = np.concatenate([[0.0], bounds[:-1]])
+    return starts, bounds - starts, prices
+
+
+def compile_usage(platforms_data: dict) -> UsageTables:
+    """Compile every platform's ``usage`` meters into dense tables."""
+    components = []
+    meters = []   # per platform: [(component, driver, starts, widths, prices)]
+    for platform_name, data in platforms_data.items():
+        platform_meters = []
+        for component, drivers in data.get('usage', {}).items():
+            if component not in data['additional_costs']:
+                raise ValueError(f"{platform_name}.usage.{component}: no such additional cost to meter")
+            if component not in components:
+                components.append(component)
+            for driver, tiers in drivers.items():
+                starts, widths, prices = _parse_tiers(platform_name, component, driver, tiers)
+                platform_meters.append((components.index(component), DRIVERS.index(driver), starts, widths, prices))
+        meters.append(platform_meters)
+
+    n_meters = max((len(m) for m in meters), default=0)
+    n_tiers = max((len(meter[2]) for m in meters for meter in m), default=0)
+    shape = (len(meters), n_meters, n_tiers)
+    component = np.zeros(shape[:2], dtype=np.intp)
+    driver = np.zeros(shape[:2], dtype=np.intp)
+    tier_start = np.zeros(shape)
+    tier_width = np.zeros(shape)
+    tier_price = np.zeros(shape)
+    for p, platform_meters in enumerate(meters):
+        for m, (c, d, starts, widths, prices) in enumerate(platform_meters):
+            component[p, m], driver[p, m] = c, d
+            tier_start[p, m, :len(starts)] = starts
+            tier_width[p, m, :len(widths)] = widths
+            tier_price[p, m, :len(prices)] = prices
+    included = np.array([[data['additional_costs'].get(name, 0) if name in data.get('usage', {}) else 0
+                          for name in components] for data in platforms_data.values()], dtype=np.float64)
+    return UsageTables(tuple(components), included.reshape(len(meters), len(components)),
+                       component, driver, tier_start, tier_width, tier_price)
+
+
+@dataclass(frozen=True)
+class _Meter:
+    platform: int
+    component: int
+    driver: int
+    start: np.ndarray        # tier starts
+    cumulative: np.ndarray   # cost of all usage up to each tier start
+    last_start: float
+    last_price: float
+
+
+def _active_meters(tables):
+    # Tiered cost is piecewise linear in the quantity: interpolate the
+    # cumulative cost at the tier starts, then extend the open-ended last
+    # tier.  Padding and meters that charge nothing are dropped up front
+    meters = []
+    n_platforms, n_meters = tables.driver.shape
+    for p in range(n_platforms):
+        for m in range(n_meters):
+            price = tables.tier_price[p, m]
+            if not price.any():
+                continue
+            n = np.count_nonzero(tables.tier_width[p, m])
+            start, width, price = tables.tier_start[p, m, :n], tables.tier_width[p, m, :n], price[:n]
+            cumulative = np.concatenate([[0.0], np.cumsum(price[:-1] * width[:-1])])
+            meters.append(_Meter(p, int(tables.component[p, m]), int(tables.driver[p, m]),
+                                 start, cumulative, float(start[-1]), float(price[-1])))
+    return tuple(meters)
+
+
+def platform_component_costs(tables: UsageTables, drivers) -> np.ndarray:
+    """Monthly usage cost of every platform and component: shape (..., P, C).
+
+    ``drivers`` is the output of ``usage_drivers``.  Each meter is evaluated
+    once over all scenarios, whatever the number of platforms.
+    """
+    drivers = np.asarray(drivers, dtype=np.float64)
+    costs = np.zeros(drivers.shape[:-1] + (tables.driver.shape[0], len(tables.components)))
+    for meter in tables.meters:
+        quantity = drivers[..., meter.driver]
+        costs[..., meter.platform, meter.component] += (
+            np.interp(quantity, meter.start, meter.cumulative)
+            + np.maximum(quantity - meter.last_start, 0) * meter.last_price
+        )
+    return costs
+
+
+def _select_platform(per_platform, platform):
+    # per_platform: (..., P); pick ``platform`` (broadcasting against ...)
+    platform = np.asarray(platform, dtype=np.intp)
+    shape = np.broadcast_shapes(platform.shape, per_platform.shape[:-1])
+    return np.take_along_axis(
+        np.broadcast_to(per_platform, shape + per_platform.shape[-1:]),
+        np.broadcast_to(platform, shape)[..., None],
+        axis=-1,
+    )[..., 0]
+
+
+def usage_costs(tables: UsageTables, platform, drivers) -> np.ndarray:
+    """Total monthly usage cost of ``platform`` in each scenario.
+
+    ``platform`` indexes the catalog's platforms and broadcasts against the
+    leading dimensions of ``drivers``.
+    """
+    return _select_platform(platform_component_costs(tables, drivers).sum(axis=-1), platform)
+
+
+def component_costs(tables: UsageTables, platform, drivers) -> dict[str, np.ndarray]:
+    """Monthly usage cost of ``platform`` split by metered component."""
+    costs = platform_component_costs(tables, drivers)
+    return {name: _select_platform(costs[..., c], platform) for c, name in enumerate(tables.components)}
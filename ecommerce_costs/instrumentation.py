@@ -0,0 +1,305 @@
+"""Section timing, counters and optional cProfile capture for dashboard reruns.
+
+A ``RerunProfile`` times named sections of one script run, either as a
+block or, for straight-line script code, as the time since the previous
+section ended::
+
+    profile = RerunProfile()
+    with profile.section('ROI'):
+        render_roi_section()
+    ...                                # comparison table code
+    profile.lap('comparison table')
+    profile.finish()
+
+``finish`` adds the timings to process-wide counters (exported in the
+Prometheus text format by ``render_prometheus``) and logs one structured
+JSON record on the ``ecommerce_costs.profile`` logger.  With
+``cprofile=True`` the whole run is also captured by cProfile.
+
+Both are opt-in, per process, through the environment:
+
+* ``ECOMMERCE_PROFILE_LOG``: ``on`` writes the JSON records to stderr, a
+  path appends them to that file (see ``configure_profile_log``).  Unset,
+  the logger has no handler of its own, so records only go wherever the
+  application's logging configuration sends ``ecommerce_costs.profile``.
+* ``ECOMMERCE_METRICS_PORT``: serve the counters at ``/metrics`` on this
+  port from a background thread (see ``start_metrics_server``), so the
+  dashboard can be scraped like the quoting service.
+
+``resident_memory`` and ``deep_sizeof`` measure the process and what one
+session keeps for itself, next to the state every session shares.
+"""
+import cProfile
+import dataclasses
+import io
+import json
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+logger = logging.getLogger('ecommerce_costs.profile')
+
+PROFILE_LOG_ENV = 'ECOMMERCE_PROFILE_LOG'
+METRICS_PORT_ENV = 'ECOMMERCE_METRICS_PORT'
+
+
+class Metrics:
+    """Thread-safe process-wide counters, labelled by section."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reruns = 0
+        self.rerun_seconds = 0.0
+        self.section_calls = {}
+        self.section_seconds = {}
+
+    def record(self, timings, total):
+        with self._lock:
+            self.reruns += 1
+            self.rerun_seconds += total
+            for name, seconds in timings:
+                self.section_calls[name] = self.section_calls.get(name, 0) + 1
+                self.section_seconds[name] = self.section_seconds.get(name, 0.0) + seconds
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'reruns': self.reruns,
+                'rerun_seconds': self.rerun_seconds,
+                'section_calls': dict(self.section_calls),
+                'section_seconds': dict(self.section_seconds),
+            }
+
+    def reset(self):
+        with self._lock:
+            self.reruns = 0
+            self.rerun_seconds = 0.0
+            self.section_calls.clear()
+            self.section_seconds.clear()
+
+
+metrics = Metrics()
+
+
+def resident_memory() -> tuple[int | None, int | None]:
+    """Current and peak resident set size of this process in bytes (None if unknown)."""
+    current = peak = None
+    try:
+        with open('/proc/self/statm') as statm:
+            current = int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+    except ImportError:   # Windows
+        return current, peak
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return current, peak if sys.platform == 'darwin' else peak * 1024
+
+
+def deep_sizeof(value, _seen=None, exclude=()) -> int:
+    """Approximate bytes held by ``value`` and everything it references.
+
+    Objects reachable twice are counted once; NumPy arrays count their data
+    buffer (views count their base).  Objects in ``exclude`` are not counted,
+    nor is anything reachable only through them.
+    """
+    seen = {id(item) for item in exclude} if _seen is None else _seen
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    size = sys.getsizeof(value)
+    if isinstance(value, np.ndarray):
+        return size + (value.nbytes if value.base is None else deep_sizeof(value.base, seen))
+    if isinstance(value, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, seen) for item in value)
+    elif dataclasses.is_dataclass(value) and not isinstance(value, type):
+        size += sum(deep_sizeof(getattr(value, f.name), seen) for f in dataclasses.fields(value))
+    elif hasattr(value, '__dict__') and not isinstance(value, type):
+        size += deep_sizeof(vars(value), seen)
+    return size
+
+
+def _label(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"')
+
+
+def render_prometheus(extra=None) -> str:
+    """Counters in the Prometheus text exposition format.
+
+    ``extra`` maps ``{cache_name: stats}`` (see ``cache.cache_stats``) and
+    adds cache hit/miss counters.
+    """
+    snapshot = metrics.snapshot()
+    lines = [
+        '# HELP ecommerce_reruns_total Dashboard script runs.',
+        '# TYPE ecommerce_reruns_total counter',
+        f"ecommerce_reruns_total {snapshot['reruns']}",
+        '# HELP ecommerce_rerun_seconds_total Wall time spent in dashboard script runs.',
+        '# TYPE ecommerce_rerun_seconds_total counter',
+        f"ecommerce_rerun_seconds_total {snapshot['rerun_seconds']:.6f}",
+        '# HELP ecommerce_section_seconds_total Wall time spent per dashboard section.',
+        '# TYPE ecommerce_section_seconds_total counter',
+    ]
+    for name, seconds in snapshot['section_seconds'].items():
+        lines.append(f'ecommerce_section_seconds_total{{section="{_label(name)}"}} {seconds:.6f}')
+    lines += [
+        '# HELP ecommerce_section_runs_total Times each dashboard section ran.',
+        '# TYPE ecommerce_section_runs_total counter',
+    ]
+    for name, calls in snapshot['section_calls'].items():
+        lines.append(f'ecommerce_section_runs_total{{section="{_label(name)}"}} {calls}')
+    rss, _ = resident_memory()
+    if rss is not None:
+        lines += [
+            '# HELP ecommerce_process_resident_bytes Resident memory of the serving process.',
+            '# TYPE ecommerce_process_resident_bytes gauge',
+            f'ecommerce_process_resident_bytes {rss}',
+        ]
+    if extra:
+        for metric in ('hits', 'misses'):
+            lines += [
+                f'# HELP ecommerce_cache_{metric}_total Cache {metric} per cache.',
+                f'# TYPE ecommerce_cache_{metric}_total counter',
+            ]
+            for name, stats in extra.items():
+                lines.append(f'ecommerce_cache_{metric}_total{{cache="{_label(name)}"}} {stats[metric]}')
+    return '\n'.join(lines) + '\n'
+
+
+_setup_lock = threading.Lock()
+_log_handler = None
+_metrics_server = None
+
+
+def configure_profile_log(destination: str | None = None) -> logging.Handler | None:
+    """Send rerun records to stderr (``on``) or append them to a file path.
+
+    ``destination`` defaults to ``ECOMMERCE_PROFILE_LOG``; unset or ``off``
+    leaves the logger alone.  The handler is attached once per process and
+    returned on later calls.
+    """
+    global _log_handler
+    if destination is None:
+        destination = os.environ.get(PROFILE_LOG_ENV, '')
+    with _setup_lock:
+        if _log_handler is None and destination.lower() not in ('', 'off'):
+            if destination.lower() == 'on':
+                _log_handler = logging.StreamHandler()
+            else:
+                _log_handler = logging.FileHandler(destination)
+            # Each record is one JSON object per line, as is
+            _log_handler.setFormatter(logging.Formatter('%(message)s'))
+            logger.addHandler(_log_handler)
+            logger.setLevel(logging.INFO)
+        return _log_handler
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?', 1)[0] != '/metrics':
+            self.send_error(404)
+            return
+        from .cache import cache_stats
+        body = render_prometheus(cache_stats()).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass   # scrapes every few seconds would flood stderr
+
+
+def start_metrics_server(port: int | None = None, host: str = '') -> ThreadingHTTPServer | None:
+    """Serve ``render_prometheus`` at ``/metrics`` from a daemon thread.
+
+    ``port`` defaults to ``ECOMMERCE_METRICS_PORT``; without one nothing is
+    started.  The server is started once per process (later calls return
+    it), and a port already in use is logged rather than raised, so every
+    rerun of the dashboard can call this.
+    """
+    global _metrics_server
+    if port is None:
+        port = os.environ.get(METRICS_PORT_ENV, '')
+        if not port:
+            return None
+        port = int(port)
+    with _setup_lock:
+        if _metrics_server is None:
+            try:
+                _metrics_server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            except OSError as exc:
+                logger.warning("metrics server not started on port %s: %s", port, exc)
+                return None
+            _metrics_server.daemon_threads = True
+            threading.Thread(target=_metrics_server.serve_forever, name='metrics-server', daemon=True).start()
+        return _metrics_server
+
+
+class RerunProfile:
+    """Wall-clock timings of the named sections of one rerun."""
+
+    def __init__(self, cprofile=False):
+        self.timings = []        # [(section, seconds)] in execution order
+        self.total = None
+        self._start = self._mark = time.perf_counter()
+        self._profiler = None
+        if cprofile:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+
+    @contextmanager
+    def section(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._mark = time.perf_counter()
+            self.timings.append((name, self._mark - start))
+
+    def lap(self, name):
+        """Record the time since the previous section or lap ended as ``name``."""
+        now = time.perf_counter()
+        self.timings.append((name, now - self._mark))
+        self._mark = now
+
+    def finish(self):
+        """Stop timing, update the counters and log the run (idempotent)."""
+        if self.total is not None:
+            return self
+        if self._profiler is not None:
+            self._profiler.disable()
+        self.total = time.perf_counter() - self._start
+        metrics.record(self.timings, self.total)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(json.dumps({
+                'event': 'rerun',
+                'total_ms': round(self.total * 1000, 3),
+                'sections_ms': {name: round(seconds * 1000, 3) for name, seconds in self.timings},
+            }))
+        return self
+
+    @property
+    def untimed(self):
+        """Time spent outside every section (widgets, page setup, ...)."""
+        return self.total - sum(seconds for _, seconds in self.timings)
+
+    def cprofile_report(self, limit=30, sort='cumulative'):
+        """Top ``limit`` functions of the captured cProfile run, or None."""
+        if self._profiler is None:
+            return None
+        out = io.StringIO()
+        pstats.Stats(self._profiler, stream=out).sort_stats(sort).print_stats(limit)
+        return out.getvalue()
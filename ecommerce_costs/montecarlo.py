@@ -0,0 +1,183 @@
+"""Monte Carlo risk simulation for growth, revenue and fee uncertainty.
+
+Each path samples
+
+* a starting monthly revenue (log-normal around ``monthly_revenue``),
+* a monthly growth rate for every month (normal around ``growth_mean``),
+* order-count noise: with ``monthly_traffic`` visits converting at
+  ``conversion_rate`` percent, realised monthly orders are Poisson, so small
+  stores see proportionally noisier revenue than large ones,
+* a fee-rate multiplier (log-normal) applied to every platform's
+  transaction rate, charged on the simulated revenue of each month.
+
+Fees follow each month's revenue, so with every source of noise switched
+off a path is ``projection.project`` with ``transaction_rate`` given, not
+the dashboard's projection, which keeps the fees on the starting revenue.
+
+Paths are drawn in blocks of ``SEED_BLOCK``, each from its own child of one
+``SeedSequence``, and evaluated in chunks of whole blocks sized to a memory
+budget.  Chunk results are combined in chunk order, so a fixed seed gives
+the same paths whatever the number of workers or the chunk size (means
+then agree to rounding).  Means and break-even probabilities are exact;
+percentile bands are computed from a bounded, uniformly sampled subset of
+paths.
+"""
+import math
+from dataclasses import dataclass
+
+import numpy as np
+
+from .parallel import iter_completed
+
+PERCENTILES = (5, 25, 50, 75, 95)
+SEED_BLOCK = 1024   # paths drawn from one random stream
+
+
+@dataclass(frozen=True)
+class RiskAssumptions:
+    growth_mean: float = 10.0       # mean monthly growth, percent
+    growth_sd: float = 5.0          # month-to-month growth volatility, percent
+    revenue_sd: float = 0.25        # log-normal sigma of the starting revenue
+    fee_sd: float = 0.1             # log-normal sigma of the fee-rate multiplier
+    monthly_traffic: int = 10000
+    conversion_rate: float = 2.5    # percent of visits that order
+
+
+@dataclass(frozen=True)
+class MonteCarloResult:
+    months: np.ndarray                  # (M,)
+    n_paths: int
+    seed: object
+    mean_profit: np.ndarray             # (P, M) mean cumulative profit
+    percentiles: dict                   # {pct: (P, M)} cumulative profit bands
+    break_even_probability: np.ndarray  # (P, M) P(broken even by month m)
+
+
+@dataclass(frozen=True)
+class _Chunk:
+    fixed_monthly: np.ndarray
+    transaction_rate: np.ndarray
+    one_time: np.ndarray
+    monthly_revenue: float
+    assumptions: RiskAssumptions
+    projection_months: int
+    block_sizes: tuple[int, ...]
+    sample_fraction: float
+    seeds: tuple[np.random.SeedSequence, ...]   # one per block
+
+
+def _lognormal_factor(rng, sigma, size):
+    # Mean-preserving: E[factor] == 1
+    if sigma <= 0:
+        return np.ones(size)
+    return rng.lognormal(-sigma ** 2 / 2, sigma, size)
+
+
+def _draw_block(rng, a, monthly_revenue, n, n_months):
+    start = monthly_revenue * _lognormal_factor(rng, a.revenue_sd, n)
+    growth = rng.normal(a.growth_mean / 100, a.growth_sd / 100, (n, n_months))
+    revenue = start[:, None] * np.cumprod(1 + np.maximum(growth, -0.99), axis=1)
+
+    expected_orders = a.monthly_traffic * a.conversion_rate / 100
+    if expected_orders > 0:
+        revenue *= rng.poisson(expected_orders, (n, n_months)) / expected_orders
+    return revenue, _lognormal_factor(rng, a.fee_sd, n)
+
+
+def _simulate_chunk(chunk):
+    a = chunk.assumptions
+    n_months = chunk.projection_months
+    months = np.arange(1, n_months + 1)
+
+    blocks = [_draw_block(np.random.default_rng(seed), a, chunk.monthly_revenue, size, n_months)
+              for seed, size in zip(chunk.seeds, chunk.block_sizes)]
+    revenue = np.concatenate([block[0] for block in blocks])
+    fee_factor = np.concatenate([block[1] for block in blocks])
+    # The first paths of every block make up the percentile sample
+    starts = np.cumsum((0,) + chunk.block_sizes[:-1])
+    sample = np.concatenate([np.arange(start, start + math.ceil(size * chunk.sample_fraction))
+                             for start, size in zip(starts, chunk.block_sizes)])
+
+    cumulative_revenue = np.cumsum(revenue, axis=1)
+
+    # profit = revenue - (one-time + fixed * m + rate * revenue), all cumulative
+    kept = 1 - chunk.transaction_rate[None, :, None] * fee_factor[:, None, None]
+    profit = cumulative_revenue[:, None, :] * kept
+    profit -= chunk.fixed_monthly[:, None] * months + chunk.one_time[:, None]
+
+    reached = profit >= 0
+    first = np.where(reached.any(axis=2), np.argmax(reached, axis=2), n_months)
+    first_counts = np.stack([np.bincount(f, minlength=n_months + 1) for f in first.T])
+
+    return profit.sum(axis=0), first_counts, profit[sample].astype(np.float32)
+
+
+def default_chunk_size(n_platforms: int, projection_months: int, memory_budget: int = 64 * 2**20) -> int:
+    # A chunk holds a handful of (paths x platforms x months) float64 arrays
+    per_path = 4 * 8 * n_platforms * projection_months
+    return max(1, memory_budget // per_path)
+
+
+def simulate(fixed_monthly, transaction_rate, one_time, monthly_revenue, projection_months,
+             assumptions=RiskAssumptions(), n_paths=100_000, seed=None, chunk_size=None,
+             workers=None, max_sample_paths=20_000, progress=None) -> MonteCarloResult:
+    """Run the simulation for every platform and aggregate the chunks.
+
+    ``fixed_monthly`` (platform + additional fees), ``transaction_rate`` and
+    ``one_time`` are per-platform arrays.  ``chunk_size`` is rounded up to
+    whole blocks of ``SEED_BLOCK`` paths.  ``progress(done, total)`` is
+    called after each chunk completes.
+    """
+    fixed_monthly = np.asarray(fixed_monthly, dtype=np.float64)
+    transaction_rate = np.asarray(transaction_rate, dtype=np.float64)
+    one_time = np.asarray(one_time, dtype=np.float64)
+    n_platforms = len(fixed_monthly)
+
+    chunk_size = chunk_size or default_chunk_size(n_platforms, projection_months)
+    blocks_per_chunk = max(1, math.ceil(chunk_size / SEED_BLOCK))
+    n_blocks = math.ceil(n_paths / SEED_BLOCK)
+    seeds = np.random.SeedSequence(seed).spawn(n_blocks)
+    block_sizes = [min(SEED_BLOCK, n_paths - i * SEED_BLOCK) for i in range(n_blocks)]
+    sample_fraction = min(1.0, max_sample_paths / n_paths)
+
+    chunks = [
+        _Chunk(fixed_monthly, transaction_rate, one_time, float(monthly_revenue), assumptions, projection_months,
+               tuple(block_sizes[i:i + blocks_per_chunk]), sample_fraction, tuple(seeds[i:i + blocks_per_chunk]))
+        for i in range(0, n_blocks, blocks_per_chunk)
+    ]
+    n_chunks = len(chunks)
+
+    results = [None] * n_chunks
+    for done, (index, result) in enumerate(iter_completed(_simulate_chunk, chunks, workers), 1):
+        results[index] = result
+        if progress is not None:
+            progress(done, n_chunks)
+
+    # Combine in chunk order so the floating-point sums are reproducible
+    profit_sum = np.zeros((n_platforms, projection_months))
+    first_counts = np.zeros((n_platforms, projection_months + 1), dtype=np.int64)
+    for chunk_sum, chunk_counts, _ in results:
+        profit_sum += chunk_sum
+        first_counts += chunk_counts
+    sample = np.concatenate([r[2] for r in results])
+
+    return MonteCarloResult(
+        months=np.arange(1, projection_months + 1),
+        n_paths=n_paths,
+        seed=seed,
+        mean_profit=profit_sum / n_paths,
+        percentiles=dict(zip(PERCENTILES, np.percentile(sample, PERCENTILES, axis=0))),
+        break_even_probability=np.cumsum(first_counts[:, :-1], axis=1) / n_paths,
+    )
+
+
+def simulate_platform_costs(platform_costs: dict, monthly_revenue, projection_months: int,
+                            **kwargs) -> MonteCarloResult:
+    """Convenience wrapper taking the ``{platform: costs}`` dict used by the dashboard."""
+    costs = list(platform_costs.values())
+    return simulate(
+        [c['monthly_platform'] + c['monthly_additional'] for c in costs],
+        [c['transaction_rate'] for c in costs],
+        [c['one_time_costs'] for c in costs],
+        monthly_revenue, projection_months, **kwargs,
+    )
@@ -0,0 +1,118 @@
+"""Cost-minimizing plan selection across every plan of every platform.
+
+Within a platform only the plan fee and transaction rate change between
+plans, so each plan is a cost line in revenue.  Each platform's plan
+breakpoints are precomputed once as a lower envelope, so the best plan at a
+revenue is an O(log plans) lookup.  ``rank`` evaluates every plan in one
+batched pass when the runner-up and margin are needed too.
+
+Plans with an ``annual_revenue_limit`` (BigCommerce's sales caps) are only
+available up to a twelfth of it per month: the envelopes are cut at the
+caps and ``rank`` leaves capped-out plans aside.  Each platform's top plan
+stays available at any revenue.
+
+Usage-based infrastructure adds the same amount to every plan of a
+platform, so it never moves a breakpoint: ``with_usage`` shifts the cost
+lines and shares the envelopes, which are built once per catalog and
+business size whatever the traffic.
+"""
+from dataclasses import dataclass, replace
+
+import numpy as np
+
+from .engine import CompiledCatalog, business_size_code, quote_all_platforms
+from .envelope import LowerEnvelope, catalog_cost_lines, catalog_revenue_limits, lower_envelope
+from .infrastructure import usage_costs, usage_drivers
+
+
+@dataclass(frozen=True)
+class PlanRanking:
+    best_plan: np.ndarray        # (..., P) cheapest plan index per platform
+    best_cost: np.ndarray        # (..., P) its total_monthly
+    runner_up_plan: np.ndarray   # (..., P) second-cheapest plan, -1 if the platform has one plan
+    runner_up_cost: np.ndarray   # (..., P)
+    margin: np.ndarray           # (..., P) runner_up_cost - best_cost (inf if no runner-up)
+
+
+@dataclass(frozen=True)
+class PlanOptimizer:
+    catalog: CompiledCatalog
+    business_size: int
+    intercepts: np.ndarray   # (P, K) total_monthly at zero revenue, inf for padded plans
+    slopes: np.ndarray       # (P, K) transaction rate, 0 for padded plans
+    limits: np.ndarray       # (P, K) monthly revenue up to which each plan is available, inf if uncapped
+    envelopes: tuple[LowerEnvelope, ...]  # per-platform LowerEnvelope over that platform's plans
+    monthly_traffic: float | None = None  # usage the intercepts include (see batch_platform_costs)
+    num_products: float | None = None
+
+    def with_usage(self, monthly_traffic=None, num_products=None) -> 'PlanOptimizer':
+        """This optimizer with usage-based infrastructure in every plan's cost."""
+        if monthly_traffic is None and num_products is None:
+            return self
+        if self.monthly_traffic is not None or self.num_products is not None:
+            raise ValueError("optimizer already includes usage")
+        drivers = usage_drivers(monthly_traffic if monthly_traffic is not None else 0,
+                                num_products if num_products is not None else 0)
+        usage = usage_costs(self.catalog.usage, np.arange(len(self.catalog.platforms)), drivers)
+        intercepts = self.intercepts + usage[:, None]
+        intercepts.flags.writeable = False
+        return replace(self, intercepts=intercepts, monthly_traffic=monthly_traffic, num_products=num_products)
+
+    def best_plan(self, revenue) -> np.ndarray:
+        """Cheapest plan index per platform at ``revenue``: shape (..., P)."""
+        return np.stack([envelope.cheapest_at(revenue) for envelope in self.envelopes], axis=-1)
+
+    def rank(self, revenue) -> PlanRanking:
+        """Best plan, runner-up and margin per platform, from one batched evaluation."""
+        revenue = np.asarray(revenue, dtype=np.float64)[..., None, None]
+        costs = np.where(revenue <= self.limits, self.intercepts + self.slopes * revenue, np.inf)   # (..., P, K)
+        order = np.argsort(costs, axis=-1, kind='stable')[..., :2]
+        ranked = np.take_along_axis(costs, order, axis=-1)
+        has_runner_up = np.isfinite(ranked[..., 1])
+        return PlanRanking(
+            best_plan=order[..., 0],
+            best_cost=ranked[..., 0],
+            runner_up_plan=np.where(has_runner_up, order[..., 1], -1),
+            runner_up_cost=ranked[..., 1],
+            margin=ranked[..., 1] - ranked[..., 0],
+        )
+
+
+def build_plan_optimizer(catalog, business_size, monthly_traffic=None, num_products=None) -> PlanOptimizer:
+    """Precompute each platform's plan breakpoints for one business size (and usage)."""
+    size = int(business_size_code(business_size))
+    intercepts, slopes, platform, plan = catalog_cost_lines(catalog, size, all_plans=True)
+
+    shape = (len(catalog.platforms), catalog.plan_monthly.shape[1])
+    intercept_table = np.full(shape, np.inf)
+    slope_table = np.zeros(shape)
+    intercept_table[platform, plan] = intercepts
+    slope_table[platform, plan] = slopes
+
+    limit_table = catalog_revenue_limits(catalog, slice(None), slice(None))
+
+    envelopes = tuple(
+        lower_envelope(intercept_table[p, :n], slope_table[p, :n], limits=limit_table[p, :n])
+        for p, n in enumerate(catalog.n_plans)
+    )
+    for table in (intercept_table, slope_table, limit_table):
+        table.flags.writeable = False
+    return PlanOptimizer(catalog, size, intercept_table, slope_table, limit_table,
+                         envelopes).with_usage(monthly_traffic, num_products)
+
+
+def optimal_platform_costs(optimizer: PlanOptimizer, monthly_revenue: float) -> dict:
+    """Like ``quote_all_platforms`` but on each platform's cheapest plan.
+
+    Each platform's costs also carry ``runner_up_plan`` (None when there is
+    no alternative) and ``runner_up_margin``, the monthly saving over it.
+    """
+    catalog = optimizer.catalog
+    ranking = optimizer.rank(monthly_revenue)
+    costs = quote_all_platforms(catalog, monthly_revenue, optimizer.business_size, plan=optimizer.best_plan(monthly_revenue),
+                                monthly_traffic=optimizer.monthly_traffic, num_products=optimizer.num_products)
+    for p, platform_costs in enumerate(costs.values()):
+        runner_up = int(ranking.runner_up_plan[p])
+        platform_costs['runner_up_plan'] = catalog.plan_name(p, runner_up) if runner_up >= 0 else None
+        platform_costs['runner_up_margin'] = float(ranking.margin[p])
+    return costs
@@ -0,0 +1,89 @@
+"""Shared process pool for CPU-heavy batch work.
+
+One pool per process is created lazily and reused by every caller, so a
+simulation or grid evaluation does not pay worker start-up on each run.
+Workers are started with ``spawn``: forking a multi-threaded Streamlit
+server is not safe.
+"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+_executor = None
+_executor_workers = 0
+_lock = threading.Lock()
+
+
+def default_workers():
+    return os.cpu_count() or 1
+
+
+def get_executor(max_workers=None):
+    """Return the process-wide pool, growing it if more workers are requested."""
+    global _executor, _executor_workers
+    workers = max_workers or default_workers()
+    with _lock:
+        if _executor is None or workers > _executor_workers:
+            if _executor is not None:
+                _executor.shutdown(wait=False)
+            _executor = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('spawn'))
+            _executor_workers = workers
+        return _executor
+
+
+def shutdown_executor():
+    global _executor, _executor_workers
+    with _lock:
+        if _executor is not None:
+            _executor.shutdown()
+        _executor = None
+        _executor_workers = 0
+
+
+def iter_completed(func, tasks, workers=None):
+    """Yield ``(index, func(task))`` as tasks finish.
+
+    At most ``2 * workers`` tasks are in flight at once, and ``tasks`` may be
+    a lazy iterator that is only advanced as slots free up, so memory stays
+    bounded however many tasks there are.  ``workers=1`` (or a single task)
+    runs everything inline without touching the pool.
+    """
+    workers = workers or default_workers()
+    if hasattr(tasks, '__len__'):
+        workers = min(workers, len(tasks))
+    if workers <= 1:
+        for index, task in enumerate(tasks):
+            yield index, func(task)
+        return
+
+    executor = get_executor(workers)
+    pending = {}
+    queue = enumerate(tasks)
+    for index, task in queue:
+        pending[executor.submit(func, task)] = index
+        if len(pending) >= 2 * workers:
+            break
+    while pending:
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            index = pending.pop(future)
+            yield index, future.result()
+            next_task = next(queue, None)
+            if next_task is not None:
+                pending[executor.submit(func, next_task[1])] = next_task[0]
+
+
+def iter_ordered(func, tasks, workers=None):
+    """Like ``iter_completed`` but yield results in task order.
+
+    Results that finish early are held until their predecessors arrive, so
+    consumers can write them out sequentially.
+    """
+    held = {}
+    next_index = 0
+    for index, result in iter_completed(func, tasks, workers):
+        held[index] = result
+        while next_index in held:
+            yield held.pop(next_index)
+            next_index += 1
@@ -0,0 +1,271 @@
+"""The dashboard's computations as an explicit dependency graph.
+
+A ``Graph`` declares named inputs and computation nodes.  A node is a
+function named after it whose parameters name what it reads, inputs or
+other nodes::
+
+    @DASHBOARD.node
+    def projection(platform_costs, monthly_revenue, growth_rate, projection_months):
+        ...
+
+Nodes must be declared after everything they read, so the graph is acyclic
+by construction.  ``PipelineState`` holds one session's values:
+
+* ``set`` records inputs.  An input only counts as changed if its value
+  differs (compared with ``cache.make_key``, so an equal list from a rerun
+  is not a change).  Changing an input marks every node downstream of it
+  dirty, and nothing else.
+* ``get`` returns a clean node as is.  A dirty node first brings its
+  dependencies up to date, and is recomputed only if one of them now has
+  a new value.  Node functions call the memoized entry points, which return
+  shared objects, so a recomputed node that gets back the very object it
+  had does not invalidate its own dependents.
+* Nodes nobody reads are never computed: ``upgrade_timeline`` only runs
+  while upgrades are modelled.
+
+In ``DASHBOARD``, ``business_type`` and ``market_focus`` feed no node, so
+changing them recomputes nothing.  Changing ``projection_months`` recomputes
+``projection`` and its chart only.
+
+Figures and frames are imported when their nodes first run, so this module
+stays as headless as the rest of the package.
+"""
+import inspect
+from collections import Counter
+from dataclasses import dataclass
+from typing import Callable
+
+import numpy as np
+
+from .api import compute_crossovers, compute_platform_costs, project_profits, simulate_plan_upgrades
+from .cache import make_key
+
+_MISSING = object()
+
+
+@dataclass(frozen=True)
+class Node:
+    name: str
+    func: Callable
+    deps: tuple[str, ...]
+
+
+class Graph:
+    """Named inputs and the computation nodes that read them."""
+
+    def __init__(self, inputs):
+        self.inputs = tuple(inputs)
+        self.nodes = {}
+        self._dependents = {name: [] for name in self.inputs}
+        self._affected = {}
+
+    def node(self, func):
+        """Register ``func`` as the node named after it; its parameters name its dependencies."""
+        name = func.__name__
+        if name in self._dependents:
+            raise ValueError(f"{name!r} is already an input or node of this graph")
+        deps = tuple(inspect.signature(func).parameters)
+        for dep in deps:
+            if dep not in self._dependents:
+                raise ValueError(f"node {name!r} reads {dep!r}, which is not declared before it")
+        self.nodes[name] = Node(name, func, deps)
+        self._dependents[name] = []
+        for dep in deps:
+            self._dependents[dep].append(name)
+        self._affected.clear()
+        return func
+
+    def affected(self, name) -> frozenset[str]:
+        """Every node downstream of ``name``, transitively."""
+        affected = self._affected.get(name)
+        if affected is None:
+            found = set()
+            stack = [name]
+            while stack:
+                for dependent in self._dependents[stack.pop()]:
+                    if dependent not in found:
+                        found.add(dependent)
+                        stack.append(dependent)
+            affected = self._affected[name] = frozenset(found)
+        return affected
+
+
+class PipelineState:
+    """One session's inputs and node values for a ``Graph`` (see the module docstring).
+
+    ``recomputed`` lists the nodes recomputed since ``begin_run``, in order;
+    ``counts`` totals recomputations per node over the session.
+    """
+
+    def __init__(self, graph: Graph):
+        self.graph = graph
+        self.values = {}
+        self.versions = {}     # input or node -> version of its current value
+        self.dirty = set(graph.nodes)
+        self.recomputed = []
+        self.counts = Counter()
+        self._keys = {}        # input -> make_key of its value
+        self._computed_from = {}   # node -> versions of its dependencies when computed
+
+    def begin_run(self):
+        self.recomputed = []
+
+    def set(self, **inputs) -> set[str]:
+        """Record input values; return the names of those that changed."""
+        changed = set()
+        for name, value in inputs.items():
+            if name not in self.graph._dependents or name in self.graph.nodes:
+                raise KeyError(f"{name!r} is not an input of this graph")
+            key = make_key(value)
+            if self._keys.get(name, _MISSING) == key:
+                continue
+            self._keys[name] = key
+            self.values[name] = value
+            self.versions[name] = self.versions.get(name, 0) + 1
+            self.dirty |= self.graph.affected(name)
+            changed.add(name)
+        return changed
+
+    def get(self, name):
+        """The current value of an input or node, recomputing only what is dirty."""
+        node = self.graph.nodes.get(name)
+        if node is None:
+            if name not in self.values:
+                raise KeyError(f"input {name!r} has not been set")
+            return self.values[name]
+        if name not in self.dirty:
+            return self.values[name]
+
+        args = [self.get(dep) for dep in node.deps]
+        versions = tuple(self.versions[dep] for dep in node.deps)
+        if self._computed_from.get(name) != versions:
+            value = node.func(*args)
+            self.recomputed.append(name)
+            self.counts[name] += 1
+            if value is not self.values.get(name, _MISSING):
+                self.values[name] = value
+                self.versions[name] = self.versions.get(name, 0) + 1
+            self._computed_from[name] = versions
+        self.dirty.discard(name)
+        return self.values[name]
+
+    def node_values(self) -> list:
+        """Current node values: shared with other sessions where memoized."""
+        return [self.values[name] for name in self.graph.nodes if name in self.values]
+
+
+DASHBOARD = Graph(inputs=(
+    'catalog',
+    'business_size',
+    'monthly_revenue',
+    'num_products',
+    'monthly_traffic',
+    'market_focus',
+    'business_type',
+    'plan_selection',
+    'growth_rate',
+    'projection_months',
+    'model_upgrades',
+    'migration_cost',
+    'all_plans',
+))
+
+
+@DASHBOARD.node
+def platform_costs(catalog, monthly_revenue, business_size, plan_selection, monthly_traffic, num_products):
+    return compute_platform_costs(catalog, monthly_revenue, business_size, plan_selection,
+                                  monthly_traffic=monthly_traffic, num_products=num_products)
+
+
+@DASHBOARD.node
+def results(platform_costs):
+    from .frame import results_frame
+    return results_frame(platform_costs)
+
+
+@DASHBOARD.node
+def monthly_cost_figure(platform_costs):
+    from .figures import build_total_cost_figure
+    return build_total_cost_figure(platform_costs, 'total_monthly', "Monthly Total Costs by Platform",
+                                   'Monthly Cost (USD)', 'viridis')
+
+
+@DASHBOARD.node
+def annual_cost_figure(platform_costs):
+    from .figures import build_total_cost_figure
+    return build_total_cost_figure(platform_costs, 'annual_cost', "Annual Total Costs by Platform",
+                                   'Annual Cost (USD)', 'plasma')
+
+
+@DASHBOARD.node
+def breakdown_figure(platform_costs):
+    from .figures import build_breakdown_figure
+    return build_breakdown_figure(platform_costs)
+
+
+@DASHBOARD.node
+def usage_scaling_figure(catalog, num_products, monthly_traffic):
+    from .figures import build_usage_scaling_figure
+    return build_usage_scaling_figure(catalog, num_products, monthly_traffic)
+
+
+def _upgrade_simulation(catalog, business_size, platform_costs, monthly_revenue, growth_rate, projection_months,
+                        migration_cost, monthly_traffic, num_products):
+    return simulate_plan_upgrades(catalog, business_size, platform_costs, monthly_revenue, growth_rate,
+                                  projection_months, migration_cost, monthly_traffic, num_products)
+
+
+@DASHBOARD.node
+def projection(catalog, business_size, platform_costs, monthly_revenue, monthly_traffic, num_products,
+               growth_rate, projection_months, model_upgrades, migration_cost):
+    if model_upgrades:
+        return _upgrade_simulation(catalog, business_size, platform_costs, monthly_revenue, growth_rate,
+                                   projection_months, migration_cost, monthly_traffic, num_products).projection
+    return project_profits(platform_costs, monthly_revenue, growth_rate, projection_months)
+
+
+@DASHBOARD.node
+def projection_figure(platform_costs, projection):
+    from .figures import build_projection_figure
+    return build_projection_figure(tuple(platform_costs), projection)
+
+
+@DASHBOARD.node
+def upgrade_timeline(catalog, business_size, platform_costs, monthly_revenue, monthly_traffic, num_products,
+                     growth_rate, projection_months, migration_cost):
+    # Only read while upgrades are modelled; the simulation is memoized, so
+    # this reuses the one the projection ran
+    from .simulation import upgrade_timeline as timeline
+    simulation = _upgrade_simulation(catalog, business_size, platform_costs, monthly_revenue, growth_rate,
+                                     projection_months, migration_cost, monthly_traffic, num_products)
+    return timeline(simulation, catalog)
+
+
+@DASHBOARD.node
+def crossovers(catalog, business_size, plan_selection, monthly_traffic, num_products):
+    # Over every plan when each platform is priced on its cheapest plan, so
+    # the pick agrees with ``platform_costs``
+    return compute_crossovers(catalog, business_size, plan_selection == 'cheapest', monthly_traffic, num_products)
+
+
+@DASHBOARD.node
+def cheapest_platform(catalog, crossovers, monthly_revenue):
+    envelope, option_platform, _ = crossovers
+    return catalog.platforms[option_platform[envelope.cheapest_at(monthly_revenue)]]
+
+
+@DASHBOARD.node
+def crossover_table(catalog, business_size, all_plans, monthly_traffic, num_products):
+    envelope, option_platform, option_plan = compute_crossovers(catalog, business_size, all_plans,
+                                                                monthly_traffic, num_products)
+    rows = []
+    for start, end, option in envelope.intervals():
+        platform_index = option_platform[option]
+        rows.append({
+            'From': f"${start:,.0f}",
+            'To': f"${end:,.0f}" if np.isfinite(end) else "and above",
+            'Cheapest Platform': catalog.platforms[platform_index],
+            'Plan': catalog.plan_name(platform_index, option_plan[option]),
+            'Monthly Cost at Start': f"${envelope.intercepts[option] + envelope.slopes[option] * start:,.0f}",
+        })
+    return rows
@@ -0,0 +1,82 @@
+"""Vectorized ROI projection.
+
+Revenue compounds monthly from ``monthly_revenue`` at ``growth_rate``
+percent; each platform's cumulative cost is its one-time cost plus
+``total_monthly`` per month.  Every platform is projected at once as a
+(platforms x months) array, in O(platforms x months).
+
+``total_monthly`` includes transaction fees on the starting revenue, as the
+dashboard's projection always has.  Given the platforms' transaction rates,
+``project`` instead charges fees on each month's grown revenue, the model
+of the Monte Carlo and upgrade simulations.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class Projection:
+    months: np.ndarray               # (M,) 1..projection_months
+    revenue: np.ndarray              # (..., M) revenue earned in each month
+    cumulative_revenue: np.ndarray   # (..., M)
+    cumulative_cost: np.ndarray      # (..., P, M), or (P, M) for per-platform costs
+    cumulative_profit: np.ndarray    # (..., P, M)
+    break_even_month: np.ndarray     # (..., P) first month with profit >= 0, NaN if never
+
+
+def break_even_months(cumulative_profit: np.ndarray, months: np.ndarray) -> np.ndarray:
+    """First month whose cumulative profit is non-negative (NaN if none)."""
+    reached = cumulative_profit >= 0
+    first = np.argmax(reached, axis=-1)
+    return np.where(reached.any(axis=-1), months[first], np.nan)
+
+
+def project(monthly_revenue, growth_rate, projection_months: int, total_monthly, one_time,
+            transaction_rate=None) -> Projection:
+    """Project cumulative revenue, cost and profit for every platform.
+
+    ``total_monthly`` and ``one_time`` are per-platform arrays of shape (P,).
+    ``monthly_revenue`` and ``growth_rate`` (percent) may be scalars or arrays
+    of any matching shape ``...``; results then gain those leading axes, so a
+    whole grid of scenarios is projected in one call.  Costs may carry the
+    same leading axes, (..., P), when each scenario has costs of its own.
+    With ``transaction_rate`` (shaped like the costs), fees follow each
+    month's revenue instead of staying at those on ``monthly_revenue``.
+    """
+    months = np.arange(1, projection_months + 1)
+    start = np.asarray(monthly_revenue, dtype=np.float64)[..., None]
+    growth = 1 + np.asarray(growth_rate, dtype=np.float64)[..., None] / 100
+
+    revenue = start * growth ** months
+    cumulative_revenue = np.cumsum(revenue, axis=-1)
+
+    total_monthly = np.asarray(total_monthly, dtype=np.float64)[..., None]
+    one_time = np.asarray(one_time, dtype=np.float64)[..., None]
+    cumulative_cost = total_monthly * months + one_time
+    if transaction_rate is not None:
+        # Swap the fees on the starting revenue for those on each month's
+        rate = np.asarray(transaction_rate, dtype=np.float64)[..., None]
+        cumulative_cost = cumulative_cost + rate * (cumulative_revenue[..., None, :] - start[..., None, :] * months)
+
+    cumulative_profit = cumulative_revenue[..., None, :] - cumulative_cost
+
+    return Projection(
+        months=months,
+        revenue=revenue,
+        cumulative_revenue=cumulative_revenue,
+        cumulative_cost=cumulative_cost,
+        cumulative_profit=cumulative_profit,
+        break_even_month=break_even_months(cumulative_profit, months),
+    )
+
+
+def project_platform_costs(platform_costs: dict, monthly_revenue, growth_rate,
+                           projection_months: int, fees_follow_revenue: bool = False) -> Projection:
+    """Convenience wrapper taking the ``{platform: costs}`` dict used by the dashboard."""
+    total_monthly = np.array([costs['total_monthly'] for costs in platform_costs.values()])
+    one_time = np.array([costs['one_time_costs'] for costs in platform_costs.values()])
+    transaction_rate = None
+    if fees_follow_revenue:
+        transaction_rate = np.array([costs['transaction_rate'] for costs in platform_costs.values()])
+    return project(monthly_revenue, growth_rate, projection_months, total_monthly, one_time, transaction_rate)
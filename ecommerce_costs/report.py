@@ -0,0 +1,421 @@
+"""Report export: the comparison table, cost charts and ROI projection of one
+or more scenarios in a single self-contained file.
+
+``export_report`` renders the report and returns its bytes; ``start_report``
+runs the same export on a background thread and returns a ``ReportJob`` to
+poll, so the dashboard stays responsive while it runs.
+
+* ``html`` reports are interactive.  plotly.js is inlined once and each chart
+  is drawn from its Plotly JSON, so the file opens offline and prints to PDF
+  from any browser.
+* ``pdf`` reports are pages of static images.  They need the optional
+  kaleido package to render the figures, and the tables are drawn as
+  figures too.
+
+Every figure asset (Plotly JSON or PNG) is keyed by an asset hash.  The hash
+covers the catalog and the scenario inputs that figure depends on: the cost
+charts ignore the projection's growth and horizon.  Assets are cached
+process-wide and in the persistent result store.  Within a job each distinct
+asset is rendered once, whatever the number of scenarios sharing it.  Misses
+are rendered on the shared process pool.
+
+pandas and plotly are imported here, not by the package, so import this
+module explicitly.
+"""
+import html
+import io
+import threading
+import time
+from dataclasses import dataclass, replace
+
+import numpy as np
+import pandas as pd
+
+from .api import compute_platform_costs, get_compiled_catalog, project_profits
+from .cache import get_cache
+from .engine import CompiledCatalog
+from .figures import build_breakdown_figure, build_projection_figure, build_total_cost_figure
+from .frame import results_frame
+from .parallel import iter_completed
+from .store import get_store, persistent, scenario_hash
+
+FORMATS = ('html', 'pdf')
+MEDIA_TYPES = {'html': 'text/html', 'pdf': 'application/pdf'}
+# Figures of every report, in page order; PDF reports draw their tables as figures too
+FIGURES = ('monthly_total', 'annual_total', 'breakdown', 'projection')
+PDF_FIGURES = ('comparison_table', 'monthly_total', 'annual_total', 'breakdown', 'projection', 'break_even_table')
+_COST_FIGURES = frozenset({'comparison_table', 'monthly_total', 'annual_total', 'breakdown'})
+
+# PDF pages: A4 at 150 dpi
+PAGE_SIZE = (1240, 1754)
+PAGE_DPI = 150
+PAGE_MARGIN = 60
+
+_assets = get_cache('ecommerce_costs.report.assets', maxsize=512)
+
+
+@dataclass(frozen=True)
+class ReportScenario:
+    """The dashboard inputs behind one section of a report."""
+    monthly_revenue: float
+    business_size: str
+    plan_selection: str = 'size'
+    monthly_traffic: int | None = None
+    num_products: int | None = None
+    growth_rate: float = 10.0
+    projection_months: int = 12
+    title: str = ''
+
+    @property
+    def label(self) -> str:
+        if self.title:
+            return self.title
+        plans = 'cheapest plans' if self.plan_selection == 'cheapest' else 'plans by size'
+        return f"{self.business_size.split(' ')[0]}, ${self.monthly_revenue:,.0f}/month, {plans}"
+
+    def describe(self) -> str:
+        parts = [f"Business size: {self.business_size}", f"Monthly revenue: ${self.monthly_revenue:,.0f}"]
+        if self.num_products is not None:
+            parts.append(f"Products: {self.num_products:,}")
+        if self.monthly_traffic is not None:
+            parts.append(f"Monthly traffic: {self.monthly_traffic:,}")
+        parts.append(f"Projection: {self.projection_months} months at {self.growth_rate:g}% monthly growth")
+        return ' · '.join(parts)
+
+
+def scenario_costs(catalog: CompiledCatalog, scenario: ReportScenario) -> dict:
+    return compute_platform_costs(catalog, scenario.monthly_revenue, scenario.business_size,
+                                  scenario.plan_selection, scenario.monthly_traffic, scenario.num_products)
+
+
+def scenario_projection(catalog: CompiledCatalog, scenario: ReportScenario):
+    return project_profits(scenario_costs(catalog, scenario), scenario.monthly_revenue,
+                           scenario.growth_rate, scenario.projection_months)
+
+
+def comparison_table(platform_costs: dict) -> pd.DataFrame:
+    """The dashboard's comparison table, formatted for a report."""
+    frame = results_frame(platform_costs)
+    usd = '${:,.0f}'.format
+    table = pd.DataFrame({
+        'Platform': frame['platform'].astype(str),
+        'Plan': frame['plan'].astype(str),
+        'Monthly Platform Fee': frame['monthly_platform'].map(usd),
+        'Monthly Additional': frame['monthly_additional'].map(usd),
+        'Usage-based': frame['monthly_usage'].map(usd),
+        'Transaction Fees': frame['monthly_transaction_fees'].map(usd),
+        'Total Monthly': frame['total_monthly'].map(usd),
+        'Annual Cost': frame['annual_cost'].map(usd),
+        'Transaction Rate': frame['transaction_rate'].map('{:.2%}'.format),
+    })
+    if 'runner_up_plan' in frame:
+        table['Runner-up Plan'] = frame['runner_up_plan'].astype(object).fillna('—')
+        table['Saving vs Runner-up'] = frame['runner_up_margin'].map(lambda v: '—' if np.isnan(v) else usd(v))
+    return table
+
+
+def break_even_table(platform_costs: dict, projection) -> pd.DataFrame:
+    """Break-even month and final cumulative profit per platform."""
+    return pd.DataFrame({
+        'Platform': list(platform_costs),
+        'Break-even': [f"Month {month:.0f}" if not np.isnan(month) else "Not reached"
+                       for month in projection.break_even_month],
+        f"Profit after {len(projection.months)} months": [
+            f"${profit:,.0f}" for profit in projection.cumulative_profit[..., -1]],
+    })
+
+
+def _table_figure(table):
+    import plotly.graph_objects as go
+    fig = go.Figure(go.Table(
+        header=dict(values=list(table.columns), fill_color='#1f77b4', font=dict(color='white'), align='left'),
+        cells=dict(values=[table[column] for column in table.columns], align='left'),
+    ))
+    fig.update_layout(height=60 + 32 * len(table), margin=dict(l=0, r=0, t=0, b=0))
+    return fig
+
+
+def build_report_figure(catalog: CompiledCatalog, scenario: ReportScenario, figure: str):
+    """One of the report's figures (see ``FIGURES`` and ``PDF_FIGURES``) for ``scenario``."""
+    platform_costs = scenario_costs(catalog, scenario)
+    if figure == 'monthly_total':
+        return build_total_cost_figure(platform_costs, 'total_monthly', "Monthly Total Costs by Platform",
+                                       'Monthly Cost (USD)', 'viridis')
+    if figure == 'annual_total':
+        return build_total_cost_figure(platform_costs, 'annual_cost', "Annual Total Costs by Platform",
+                                       'Annual Cost (USD)', 'plasma')
+    if figure == 'breakdown':
+        return build_breakdown_figure(platform_costs)
+    if figure == 'comparison_table':
+        return _table_figure(comparison_table(platform_costs))
+    projection = scenario_projection(catalog, scenario)
+    if figure == 'projection':
+        return build_projection_figure(tuple(platform_costs), projection)
+    if figure == 'break_even_table':
+        return _table_figure(break_even_table(platform_costs, projection))
+    raise ValueError(f"unknown report figure {figure!r}")
+
+
+def _figure_inputs(scenario, figure):
+    # Key each figure on the inputs it depends on only, so scenarios that
+    # differ in growth or horizon share their cost charts
+    scenario = replace(scenario, title='')
+    if figure in _COST_FIGURES:
+        scenario = replace(scenario, growth_rate=0.0, projection_months=0)
+    return scenario
+
+
+def asset_hash(catalog: CompiledCatalog, scenario: ReportScenario, figure: str, fmt: str) -> str:
+    return scenario_hash('report.asset', (catalog, _figure_inputs(scenario, figure), figure, fmt), {})
+
+
+@persistent
+def render_asset(catalog: CompiledCatalog, scenario: ReportScenario, figure: str, fmt: str) -> str | bytes:
+    """One figure as Plotly JSON (HTML reports) or a PNG image (PDF reports)."""
+    fig = build_report_figure(catalog, scenario, figure)
+    if fmt == 'html':
+        return fig.to_json()
+    width = PAGE_SIZE[0] - 2 * PAGE_MARGIN
+    return fig.to_image(format='png', width=width, height=fig.layout.height or 500)
+
+
+def _render_task(task):
+    content = render_asset(*task)
+    # Pool workers exit without running atexit hooks: commit the store's
+    # buffered writes while the worker is known to be alive
+    store = get_store()
+    if store is not None:
+        store.flush()
+    return content
+
+
+def pdf_available() -> bool:
+    """Whether PDF reports can be rendered (kaleido draws the figures)."""
+    try:
+        import kaleido  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def render_assets(catalog: CompiledCatalog, scenarios, fmt: str = 'html', workers: int | None = None,
+                  progress=None) -> dict:
+    """Every figure asset of ``scenarios``, keyed by asset hash.
+
+    Each distinct asset is looked up once, and the misses are rendered on the
+    shared process pool.  ``progress(done, total)`` is called as assets
+    arrive, cached ones first.
+    """
+    figures = FIGURES if fmt == 'html' else PDF_FIGURES
+    wanted = {}
+    for scenario in scenarios:
+        for figure in figures:
+            wanted.setdefault(asset_hash(catalog, scenario, figure, fmt),
+                              (catalog, _figure_inputs(scenario, figure), figure, fmt))
+    assets = {}
+    missing = []
+    for key, task in wanted.items():
+        content = _assets.get(key)
+        if content is None:
+            # Rendered by an earlier job, possibly in another process
+            content = render_asset.lookup(*task)
+            if content is not None:
+                _assets.put(key, content)
+        if content is None:
+            missing.append(key)
+        else:
+            assets[key] = content
+    if progress is not None:
+        progress(len(assets), len(wanted))
+    for index, content in iter_completed(_render_task, [wanted[key] for key in missing], workers):
+        assets[missing[index]] = content
+        _assets.put(missing[index], content)
+        if progress is not None:
+            progress(len(assets), len(wanted))
+    return assets
+
+
+_CSS = """
+body { font-family: -apple-system, "Segoe UI", Roboto, sans-serif; color: #222; margin: 2rem auto; max-width: 1200px; }
+h1 { color: #1f77b4; }
+section { page-break-before: always; }
+section:first-of-type { page-break-before: auto; }
+.meta { color: #666; }
+table.report { border-collapse: collapse; width: 100%; font-size: 0.9rem; margin: 1rem 0; }
+table.report th { background: #1f77b4; color: white; text-align: left; padding: 0.4rem; }
+table.report td { border-bottom: 1px solid #ddd; padding: 0.4rem; }
+.row { display: flex; gap: 1rem; }
+.row > .chart { flex: 1; min-width: 0; }
+.chart { break-inside: avoid; }
+"""
+
+
+def _html_table(table):
+    return table.to_html(index=False, border=0, classes='report', escape=True)
+
+
+class _Charts:
+    """Chart placeholders with ids unique within the document."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, spec):
+        self.count += 1
+        chart_id = f'chart-{self.count}'
+        # Plotly JSON may contain "</script>" inside strings
+        spec = spec.replace('</', '<\\/')
+        return (f'<div class="chart" id="{chart_id}"></div>\n<script>(function () {{ var spec = {spec}; '
+                f'Plotly.newPlot("{chart_id}", spec.data, spec.layout, '
+                f'{{displayModeBar: false, responsive: true}}); }})();</script>')
+
+
+def _html_report(catalog, scenarios, assets):
+    from plotly.offline import get_plotlyjs
+    chart = _Charts()
+
+    def asset(scenario, figure):
+        return chart(assets[asset_hash(catalog, scenario, figure, 'html')])
+
+    sections = []
+    for scenario in scenarios:
+        platform_costs = scenario_costs(catalog, scenario)
+        projection = scenario_projection(catalog, scenario)
+        sections.append(f"""<section>
+<h2>{html.escape(scenario.label)}</h2>
+<p class="meta">{html.escape(scenario.describe())}</p>
+<h3>Platform Cost Comparison</h3>
+{_html_table(comparison_table(platform_costs))}
+<div class="row">{asset(scenario, 'monthly_total')}{asset(scenario, 'annual_total')}</div>
+<h3>Detailed Cost Breakdown</h3>
+{asset(scenario, 'breakdown')}
+<h3>ROI &amp; Break-even Analysis</h3>
+{asset(scenario, 'projection')}
+{_html_table(break_even_table(platform_costs, projection))}
+</section>""")
+
+    title = 'Ecommerce Platform Cost Report'
+    generated = time.strftime('%Y-%m-%d %H:%M')
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<style>{_CSS}</style>
+<script>{get_plotlyjs()}</script>
+</head>
+<body>
+<h1>{title}</h1>
+<p class="meta">Generated {generated} with pricing catalog {html.escape(catalog.version or 'in memory')}.</p>
+{''.join(sections)}
+</body>
+</html>
+""".encode()
+
+
+def _pdf_report(catalog, scenarios, assets):
+    from PIL import Image, ImageDraw, ImageFont
+    heading, body = ImageFont.load_default(size=32), ImageFont.load_default(size=18)
+    width, height = PAGE_SIZE
+    pages = []
+    y = height
+
+    def new_page():
+        nonlocal y
+        pages.append(Image.new('RGB', PAGE_SIZE, 'white'))
+        y = PAGE_MARGIN
+
+    for scenario in scenarios:
+        new_page()
+        draw = ImageDraw.Draw(pages[-1])
+        draw.text((PAGE_MARGIN, y), scenario.label, font=heading, fill='#1f77b4')
+        y += 50
+        for line in scenario.describe().split(' · '):
+            draw.text((PAGE_MARGIN, y), line, font=body, fill='#666666')
+            y += 26
+        y += 20
+        for figure in PDF_FIGURES:
+            image = Image.open(io.BytesIO(assets[asset_hash(catalog, scenario, figure, 'pdf')])).convert('RGB')
+            if y + image.height > height - PAGE_MARGIN:
+                new_page()
+            pages[-1].paste(image, (PAGE_MARGIN, y))
+            y += image.height + 30
+
+    buffer = io.BytesIO()
+    pages[0].save(buffer, format='PDF', save_all=True, append_images=pages[1:], resolution=PAGE_DPI)
+    return buffer.getvalue()
+
+
+def export_report(scenarios, fmt: str = 'html', catalog: CompiledCatalog | None = None,
+                  workers: int | None = None, progress=None) -> bytes:
+    """Render a report of ``scenarios`` (``ReportScenario``) and return its bytes."""
+    if fmt not in FORMATS:
+        raise ValueError(f"unknown report format {fmt!r} (expected one of {', '.join(FORMATS)})")
+    if not scenarios:
+        raise ValueError("a report needs at least one scenario")
+    if fmt == 'pdf' and not pdf_available():
+        raise RuntimeError("PDF reports need the kaleido package to render figures (pip install kaleido)")
+    if catalog is None:
+        catalog = get_compiled_catalog()
+    assets = render_assets(catalog, scenarios, fmt, workers, progress)
+    build = _html_report if fmt == 'html' else _pdf_report
+    return build(catalog, scenarios, assets)
+
+
+class ReportJob:
+    """A report export running on a background thread.
+
+    ``done``, ``completed`` and ``total`` (figure assets) can be polled from
+    any thread; ``result()`` waits for the report bytes, re-raising the
+    export's error if it failed.
+    """
+
+    def __init__(self, scenarios, fmt='html', catalog=None, workers=None):
+        self.scenarios = tuple(scenarios)
+        self.format = fmt
+        self.file_name = f'platform_cost_report.{fmt}'
+        self.media_type = MEDIA_TYPES.get(fmt)
+        self.completed = 0
+        self.total = 0
+        self.started = time.time()
+        self.finished = None
+        self._catalog = catalog
+        self._workers = workers
+        self._report = None
+        self._error = None
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='report-export', daemon=True)
+        self._thread.start()
+
+    def _progress(self, completed, total):
+        self.completed, self.total = completed, total
+
+    def _run(self):
+        try:
+            self._report = export_report(self.scenarios, self.format, self._catalog, self._workers, self._progress)
+        except Exception as exc:   # handed to whoever collects the result
+            self._error = exc
+        finally:
+            self.finished = time.time()
+            self._done.set()
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    @property
+    def fraction(self) -> float:
+        return self.completed / self.total if self.total else 0.0
+
+    def result(self, timeout=None) -> bytes:
+        if not self._done.wait(timeout):
+            raise TimeoutError("the report is still being rendered")
+        if self._error is not None:
+            raise self._error
+        return self._report
+
+
+def start_report(scenarios, fmt: str = 'html', catalog: CompiledCatalog | None = None,
+                 workers: int | None = None) -> ReportJob:
+    """Export a report in the background; see ``ReportJob``."""
+    return ReportJob(scenarios, fmt, catalog, workers)
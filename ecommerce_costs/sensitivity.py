@@ -0,0 +1,167 @@
+"""Revenue x growth sensitivity grids, evaluated in cached tiles.
+
+Every point starts at a monthly revenue that grows by a monthly rate, and
+each platform charges its fixed monthly fees plus transaction fees on that
+month's revenue.  The cheapest platform and the cost spread compare what
+the platforms cost in total over the horizon, so both move with growth as
+well as revenue; the break-even month is the first in which cumulative
+revenue covers cumulative cost, one-time costs included.
+
+Grid points lie on a fixed lattice (multiples of a "nice" revenue and growth
+step), and the lattice is cut into square tiles of ``TILE_SIZE`` points.
+Tiles are cached process-wide by their lattice coordinates.  Panning the
+window over the same lattice, or returning to an earlier zoom level, only
+evaluates the tiles that are not cached yet.  Missing tiles are spread over
+the shared process pool.
+"""
+import math
+from dataclasses import dataclass
+
+import numpy as np
+
+from .cache import get_cache, make_key
+from .parallel import iter_completed
+
+TILE_SIZE = 128
+
+
+@dataclass(frozen=True)
+class SensitivityGrid:
+    revenues: np.ndarray          # (R,) monthly revenue axis
+    growth_rates: np.ndarray      # (G,) monthly growth axis, percent
+    cheapest: np.ndarray          # (G, R) index of the cheapest platform over the horizon
+    spread: np.ndarray            # (G, R) most minus least expensive cumulative cost over the horizon
+    break_even: np.ndarray        # (P, G, R) break-even month per platform, NaN if never
+    tiles_computed: int
+    tiles_cached: int
+
+    def cheapest_break_even(self) -> np.ndarray:
+        """Break-even month of whichever platform is cheapest at each point."""
+        return np.take_along_axis(self.break_even, self.cheapest[None].astype(np.intp), axis=0)[0]
+
+
+@dataclass(frozen=True)
+class _Tile:
+    fixed_monthly: np.ndarray
+    transaction_rate: np.ndarray
+    one_time: np.ndarray
+    horizon: int
+    revenue_step: float
+    growth_step: float
+    row: int       # tile index along growth
+    col: int       # tile index along revenue
+
+
+def nice_step(span: float, points: int) -> float:
+    """Largest round step (x 10^k) giving at least ``points`` samples over ``span``."""
+    if span <= 0 or points < 2:
+        return 1.0
+    raw = span / (points - 1)
+    magnitude = 10 ** math.floor(math.log10(raw))
+    for factor in (8, 6, 5, 4, 3, 2.5, 2, 1.5, 1.25):
+        if factor * magnitude <= raw:
+            return factor * magnitude
+    return magnitude
+
+
+def _evaluate_tile(tile):
+    start = np.arange(tile.col * TILE_SIZE, (tile.col + 1) * TILE_SIZE)
+    revenues = start * tile.revenue_step
+    growth = 1 + np.arange(tile.row * TILE_SIZE, (tile.row + 1) * TILE_SIZE) * tile.growth_step / 100
+
+    # Month m costs fixed + rate * revenue_m, so a platform is in profit once
+    # cumulative revenue reaches (fixed * m + one_time) / (1 - rate): one
+    # threshold per platform and month.  Walk the months once, tracking the
+    # first month each (platform, point) crosses it; memory stays
+    # O(P x T x T) for any horizon.
+    margin = 1 - tile.transaction_rate
+    n_platforms = len(tile.fixed_monthly)
+    break_even = np.full((n_platforms, TILE_SIZE, TILE_SIZE), np.nan, dtype=np.float32)
+    monthly = np.broadcast_to(revenues, (TILE_SIZE, TILE_SIZE)).astype(np.float64)
+    cumulative_revenue = np.zeros((TILE_SIZE, TILE_SIZE))
+    for month in range(1, tile.horizon + 1):
+        monthly = monthly * growth[:, None]
+        cumulative_revenue += monthly
+        with np.errstate(divide='ignore'):
+            threshold = np.where(margin > 0, (tile.fixed_monthly * month + tile.one_time) / margin, np.inf)
+        reached = (cumulative_revenue >= threshold[:, None, None]) & np.isnan(break_even)
+        break_even[reached] = month
+
+    # Rank platforms by what they cost over the whole horizon
+    cumulative_cost = ((tile.one_time + tile.fixed_monthly * tile.horizon)[:, None, None]
+                       + tile.transaction_rate[:, None, None] * cumulative_revenue)      # (P, G, R)
+    cheapest = np.argmin(cumulative_cost, axis=0).astype(np.int8)
+    spread = (cumulative_cost.max(axis=0) - cumulative_cost.min(axis=0)).astype(np.float32)
+    return cheapest, spread, break_even
+
+
+def evaluate_grid(fixed_monthly, transaction_rate, one_time, horizon,
+                  revenue_range=(0, 500000), growth_range=(0, 50), resolution=100,
+                  workers=None) -> SensitivityGrid:
+    """Evaluate every platform over a ``resolution`` x ``resolution`` grid.
+
+    ``fixed_monthly`` (platform + additional fees), ``transaction_rate`` and
+    ``one_time`` are per-platform arrays; ``horizon`` is the period in months
+    costs are compared over and break-even is searched within.
+    """
+    fixed_monthly = np.asarray(fixed_monthly, dtype=np.float64)
+    transaction_rate = np.asarray(transaction_rate, dtype=np.float64)
+    one_time = np.asarray(one_time, dtype=np.float64)
+
+    revenue_step = nice_step(revenue_range[1] - revenue_range[0], resolution)
+    growth_step = nice_step(growth_range[1] - growth_range[0], resolution)
+    cols = np.arange(math.ceil(revenue_range[0] / revenue_step), math.floor(revenue_range[1] / revenue_step) + 1)
+    rows = np.arange(math.ceil(growth_range[0] / growth_step), math.floor(growth_range[1] / growth_step) + 1)
+
+    tile_cols = range(cols[0] // TILE_SIZE, cols[-1] // TILE_SIZE + 1)
+    tile_rows = range(rows[0] // TILE_SIZE, rows[-1] // TILE_SIZE + 1)
+    pricing_key = make_key((fixed_monthly, transaction_rate, one_time, horizon, revenue_step, growth_step))
+
+    cache = get_cache('sensitivity_tiles', maxsize=1024)
+    tiles = {}
+    missing = []
+    for row in tile_rows:
+        for col in tile_cols:
+            cached = cache.get((pricing_key, row, col))
+            if cached is None:
+                missing.append(_Tile(fixed_monthly, transaction_rate, one_time, horizon,
+                                     revenue_step, growth_step, row, col))
+            else:
+                tiles[row, col] = cached
+    for index, result in iter_completed(_evaluate_tile, missing, workers):
+        tile = missing[index]
+        tiles[tile.row, tile.col] = result
+        cache.put((pricing_key, tile.row, tile.col), result)
+
+    # Stitch the tiles, then crop to the requested window
+    row0, col0 = tile_rows[0] * TILE_SIZE, tile_cols[0] * TILE_SIZE
+    stitched = [
+        np.concatenate([
+            np.concatenate([tiles[row, col][part] for col in tile_cols], axis=-1)
+            for row in tile_rows
+        ], axis=-2)
+        for part in range(3)
+    ]
+    rows_slice = slice(rows[0] - row0, rows[-1] - row0 + 1)
+    cols_slice = slice(cols[0] - col0, cols[-1] - col0 + 1)
+
+    return SensitivityGrid(
+        revenues=cols * revenue_step,
+        growth_rates=rows * growth_step,
+        cheapest=stitched[0][rows_slice, cols_slice],
+        spread=stitched[1][rows_slice, cols_slice],
+        break_even=stitched[2][:, rows_slice, cols_slice],
+        tiles_computed=len(missing),
+        tiles_cached=len(tile_rows) * len(tile_cols) - len(missing),
+    )
+
+
+def evaluate_platform_costs_grid(platform_costs: dict, horizon: int, **kwargs) -> SensitivityGrid:
+    """Convenience wrapper taking the ``{platform: costs}`` dict used by the dashboard."""
+    costs = list(platform_costs.values())
+    return evaluate_grid(
+        [c['monthly_platform'] + c['monthly_additional'] for c in costs],
+        [c['transaction_rate'] for c in costs],
+        [c['one_time_costs'] for c in costs],
+        horizon, **kwargs,
+    )
@@ -0,0 +1,145 @@
+"""Path-dependent monthly cost simulation with automatic plan upgrades.
+
+The static projection charges one fixed ``total_monthly`` forever.  Here a
+store's revenue compounds month by month, transaction fees are charged on
+each month's revenue, and every platform moves up through its plans:
+
+* **forced** when trailing-12-month revenue exceeds the current plan's
+  ``annual_revenue_limit`` (e.g. BigCommerce's sales caps);
+* **voluntary** when a higher plan is cheaper at the current revenue and the
+  monthly saving repays ``migration_cost`` within ``payback_months``.
+
+Plans never go down.  Each upgrade adds a one-time ``migration_cost`` in the
+month it happens.  The loop runs over months only; every step is vectorized
+over scenarios x platforms.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+from .engine import business_size_code
+from .projection import Projection, break_even_months
+
+
+@dataclass(frozen=True)
+class UpgradeSimulation:
+    projection: Projection       # cumulative revenue/cost/profit with upgrades applied
+    start_plan: np.ndarray       # (..., P) plan each platform starts on
+    plan: np.ndarray             # (..., P, M) plan index in force each month
+    monthly_cost: np.ndarray     # (..., P, M) cost incurred each month, migrations included
+    forced: np.ndarray           # (..., P, M) True where the month's upgrade was cap-driven
+
+
+def simulate_upgrades(optimizer, monthly_revenue, growth_rate, projection_months,
+                      migration_cost=500.0, payback_months=12, start_plan=None) -> UpgradeSimulation:
+    """Simulate every platform month by month for one or many scenarios.
+
+    ``optimizer`` is a ``PlanOptimizer`` (it carries the catalog, the
+    business size and the per-plan cost lines).  ``monthly_revenue`` and
+    ``growth_rate`` (percent) may be scalars or 1-D arrays of scenarios.
+    ``start_plan`` defaults to the business-size plan of each platform.
+    """
+    catalog = optimizer.catalog
+    scalar = np.ndim(monthly_revenue) == 0 and np.ndim(growth_rate) == 0
+    start = np.atleast_1d(np.asarray(monthly_revenue, dtype=np.float64))
+    growth = 1 + np.atleast_1d(np.asarray(growth_rate, dtype=np.float64)) / 100
+    start, growth = np.broadcast_arrays(start, growth)
+    n_scenarios, n_platforms = len(start), len(catalog.platforms)
+
+    months = np.arange(1, projection_months + 1)
+    revenue = start[:, None] * growth[:, None] ** months                 # (S, M)
+    cumulative_revenue = np.cumsum(revenue, axis=1)
+    trailing = cumulative_revenue - np.concatenate(
+        [np.zeros((n_scenarios, 12)), cumulative_revenue[:, :-12]], axis=1)[:, :projection_months]
+
+    if start_plan is None:
+        start_plan = catalog.size_plan[:, business_size_code(optimizer.business_size)]
+    start_plan = np.broadcast_to(np.asarray(start_plan, dtype=np.intp), (n_scenarios, n_platforms))
+    current = start_plan.copy()
+
+    platform = np.arange(n_platforms)
+    # Month-major while stepping so each month's writes are contiguous
+    plan = np.empty((projection_months, n_scenarios, n_platforms), dtype=np.intp)
+    monthly_cost = np.empty((projection_months, n_scenarios, n_platforms))
+    forced = np.zeros((projection_months, n_scenarios, n_platforms), dtype=bool)
+
+    # Everything that does not depend on the plan path is computed up front,
+    # for all months at once: the lowest plan the trailing sales still allow
+    # (plan caps ascend, so a binary search per platform; the top plan is
+    # never capped out) ...
+    min_plan = np.stack([
+        np.minimum(np.searchsorted(catalog.revenue_limit[p, :n], trailing.T, side='left'), n - 1)
+        for p, n in enumerate(catalog.n_plans)
+    ], axis=-1)                                                          # (M, S, P)
+    # ... and the cheapest of those plans at each month's revenue
+    intercepts, slopes = optimizer.intercepts.ravel(), optimizer.slopes.ravel()
+    offset = platform * optimizer.intercepts.shape[1]
+    plan_costs = optimizer.intercepts + optimizer.slopes * revenue.T[..., None, None]          # (M, S, P, K)
+    eligible = np.arange(plan_costs.shape[-1]) >= min_plan[..., None]
+    plan_costs = np.where(eligible, plan_costs, np.inf)
+    best = np.argmin(plan_costs, axis=-1)
+    cost_best = np.take_along_axis(plan_costs, best[..., None], axis=-1)[..., 0]
+
+    for m in range(projection_months):
+        r = revenue[:, m, None]                                         # (S, 1)
+        cap_upgrade = min_plan[m] > current
+
+        # Cost-driven upgrade, only if the saving repays the migration in time
+        index = current + offset
+        cost_now = intercepts[index] + slopes[index] * r
+        worth_it = (best[m] > current) & ((cost_now - cost_best[m]) * payback_months > migration_cost)
+
+        target = np.where(worth_it, best[m], np.maximum(current, min_plan[m]))
+        upgraded = target != current
+        if upgraded.any():
+            index = target + offset
+            cost_now = intercepts[index] + slopes[index] * r + upgraded * migration_cost
+        current = target
+
+        plan[m] = current
+        forced[m] = cap_upgrade
+        monthly_cost[m] = cost_now
+
+    plan, monthly_cost, forced = (np.ascontiguousarray(np.moveaxis(a, 0, -1)) for a in (plan, monthly_cost, forced))
+    cumulative_cost = np.cumsum(monthly_cost, axis=-1) + catalog.one_time[:, None]
+    cumulative_profit = cumulative_revenue[:, None, :] - cumulative_cost
+
+    if scalar:
+        start_plan, revenue, cumulative_revenue = start_plan[0], revenue[0], cumulative_revenue[0]
+        plan, monthly_cost, forced = plan[0], monthly_cost[0], forced[0]
+        cumulative_cost, cumulative_profit = cumulative_cost[0], cumulative_profit[0]
+
+    return UpgradeSimulation(
+        projection=Projection(
+            months=months,
+            revenue=revenue,
+            cumulative_revenue=cumulative_revenue,
+            cumulative_cost=cumulative_cost,
+            cumulative_profit=cumulative_profit,
+            break_even_month=break_even_months(cumulative_profit, months),
+        ),
+        start_plan=start_plan,
+        plan=plan,
+        monthly_cost=monthly_cost,
+        forced=forced,
+    )
+
+
+def upgrade_timeline(simulation: UpgradeSimulation, catalog) -> list[dict]:
+    """List the upgrades of a single-scenario simulation, in month order.
+
+    Returns dicts with ``platform``, ``month``, ``from_plan``, ``to_plan``
+    and ``reason`` (``'revenue cap'`` or ``'lower cost'``).
+    """
+    plan = simulation.plan
+    previous = np.concatenate([simulation.start_plan[:, None], plan[:, :-1]], axis=1)
+    events = []
+    for p, m in zip(*np.nonzero(plan != previous)):
+        events.append({
+            'platform': catalog.platforms[p],
+            'month': int(simulation.projection.months[m]),
+            'from_plan': catalog.plan_name(p, previous[p, m]),
+            'to_plan': catalog.plan_name(p, plan[p, m]),
+            'reason': 'revenue cap' if simulation.forced[p, m] else 'lower cost',
+        })
+    return sorted(events, key=lambda event: event['month'])
@@ -0,0 +1,283 @@
+"""Persistent SQLite store for computed results, shared across restarts.
+
+Results are keyed by a hash of the normalized inputs (see
+``cache.make_key``), the function, the pricing-catalog version and the code
+version of the whole package (see ``code_version``): a function is usually a
+thin wrapper, so its own code says little about what computed the result.
+``persistent`` wraps a function so the store is consulted before computing;
+stack ``memoize`` on top so warm lookups never leave memory.
+
+* The database runs in WAL mode, so readers in other sessions and processes
+  are never blocked by a writer.
+* Writes (and access-time updates) are buffered and committed in batches.
+* Rows of every catalog and code version live side by side, so processes
+  sharing a database with different catalogs never delete each other's
+  results; when the stored values exceed ``max_bytes``, the least recently
+  used rows, old versions first in practice, are evicted.
+* Superseded catalog versions are deleted outright: the catalog loader
+  drops the version it replaces when a pricing file changes, and
+  ``ResultStore.purge`` deletes every version but those kept (an admin
+  call for a database no other catalog shares).
+
+The store is off unless ``ECOMMERCE_RESULT_STORE`` is set: to a database
+path, or to ``on`` for ``~/.cache/ecommerce_costs/results.sqlite3``.
+Values are pickled: only point it at a file you trust.
+"""
+import atexit
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from functools import cache, wraps
+from pathlib import Path
+
+from .cache import make_key
+from .engine import CompiledCatalog
+
+STORE_PATH_ENV = 'ECOMMERCE_RESULT_STORE'
+DEFAULT_MAX_BYTES = 256 * 2**20
+
+_MISSING = object()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    namespace TEXT NOT NULL,
+    catalog_version TEXT NOT NULL,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed);
+"""
+
+
+class ResultStore:
+    """SQLite-backed result store with batched writes and LRU eviction."""
+
+    def __init__(self, path, max_bytes=DEFAULT_MAX_BYTES, batch_size=64, flush_interval=1.0):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._pending = {}        # key -> row awaiting insert
+        self._touched = {}        # key -> access time awaiting update
+        self._last_flush = time.monotonic()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+
+        with self._connection() as db:
+            db.executescript(_SCHEMA)
+            self._bytes = db.execute('SELECT COALESCE(SUM(size), 0) FROM results').fetchone()[0]
+
+    def _connection(self):
+        # One connection per thread: sqlite3 connections are not shareable,
+        # and WAL lets each of them read while another writes
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('PRAGMA synchronous=NORMAL')
+            self._local.db = db
+        return db
+
+    def get(self, key, catalog_version, default=None):
+        with self._lock:
+            row = self._pending.get(key)
+        if row is not None and row[2] == catalog_version:
+            value = row[3]
+        else:
+            value = self._connection().execute(
+                'SELECT value FROM results WHERE key = ? AND catalog_version = ?', (key, catalog_version)
+            ).fetchone()
+            value = value[0] if value is not None else None
+        if value is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        with self._lock:
+            self._touched[key] = time.time()
+        return pickle.loads(value)
+
+    def put(self, key, namespace, catalog_version, value):
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._pending[key] = (key, namespace, catalog_version, blob, len(blob), time.time())
+            due = (len(self._pending) >= self.batch_size
+                   or time.monotonic() - self._last_flush >= self.flush_interval)
+        if due:
+            self.flush()
+
+    def flush(self):
+        """Commit buffered writes and access times in one transaction."""
+        with self._lock:
+            rows, self._pending = list(self._pending.values()), {}
+            touched, self._touched = [(t, k) for k, t in self._touched.items()], {}
+            self._last_flush = time.monotonic()
+        if not rows and not touched:
+            return
+        db = self._connection()
+        with db:
+            db.execute('BEGIN IMMEDIATE')
+            # Rows replaced in place give back their old size
+            replaced = sum(size for row in rows
+                           for size, in db.execute('SELECT size FROM results WHERE key = ?', (row[0],)))
+            db.executemany('INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)', rows)
+            db.executemany('UPDATE results SET accessed = ? WHERE key = ?', touched)
+        self.writes += len(rows)
+        self._bytes += sum(row[4] for row in rows) - replaced
+        if self._bytes > self.max_bytes:
+            self.evict()
+
+    def evict(self, target=0.9):
+        """Delete least recently used rows until under ``target * max_bytes``."""
+        db = self._connection()
+        with db:
+            db.execute('BEGIN IMMEDIATE')
+            total = db.execute('SELECT COALESCE(SUM(size), 0) FROM results').fetchone()[0]
+            excess = total - int(self.max_bytes * target)
+            doomed = []
+            if excess > 0:
+                for key, size in db.execute('SELECT key, size FROM results ORDER BY accessed'):
+                    doomed.append((key,))
+                    excess -= size
+                    if excess <= 0:
+                        break
+                db.executemany('DELETE FROM results WHERE key = ?', doomed)
+            self._bytes = db.execute('SELECT COALESCE(SUM(size), 0) FROM results').fetchone()[0]
+        self.evictions += len(doomed)
+
+    def drop_version(self, catalog_version) -> int:
+        """Delete the rows of one (superseded) catalog version; return how many."""
+        return self._delete('catalog_version = ?', (catalog_version,),
+                            lambda version: version == catalog_version)
+
+    def purge(self, keep) -> int:
+        """Delete the rows of every catalog version not in ``keep``; return how many."""
+        keep = tuple(keep)
+        return self._delete(f"catalog_version NOT IN ({', '.join('?' * len(keep))})", keep,
+                            lambda version: version not in keep)
+
+    def _delete(self, where, params, doomed):
+        with self._lock:
+            self._pending = {key: row for key, row in self._pending.items() if not doomed(row[2])}
+        db = self._connection()
+        with db:
+            db.execute('BEGIN IMMEDIATE')
+            deleted = db.execute(f'DELETE FROM results WHERE {where}', params).rowcount
+            self._bytes = db.execute('SELECT COALESCE(SUM(size), 0) FROM results').fetchone()[0]
+        return deleted
+
+    def clear(self):
+        with self._lock:
+            self._pending.clear()
+            self._touched.clear()
+        self._connection().execute('DELETE FROM results')
+        self._bytes = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        rows = self._connection().execute('SELECT COUNT(*) FROM results').fetchone()[0]
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'writes': self.writes,
+            'evictions': self.evictions,
+            'rows': rows,
+            'bytes': self._bytes,
+            'max_bytes': self.max_bytes,
+        }
+
+
+_store = _MISSING
+_store_lock = threading.Lock()
+
+
+def default_store_path():
+    cache_home = Path(os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache')
+    return cache_home / 'ecommerce_costs' / 'results.sqlite3'
+
+
+def get_store() -> ResultStore | None:
+    """Return the process-wide store, or None when disabled (the default)."""
+    global _store
+    if _store is _MISSING:
+        with _store_lock:
+            if _store is _MISSING:
+                path = os.environ.get(STORE_PATH_ENV, '')
+                if path.lower() in ('', 'off'):
+                    _store = None
+                else:
+                    _store = ResultStore(default_store_path() if path.lower() == 'on' else path)
+                if _store is not None:
+                    atexit.register(_store.flush)
+    return _store
+
+
+def scenario_hash(namespace, args, kwargs) -> str:
+    key = make_key((args, tuple(sorted(kwargs.items()))))
+    return hashlib.sha256(f"{namespace}\0{key!r}".encode()).hexdigest()
+
+
+@cache
+def code_version() -> str:
+    """Digest of every module of the package: any code change retires stored results."""
+    digest = hashlib.sha256()
+    for module in sorted(Path(__file__).parent.glob('*.py')):
+        digest.update(module.name.encode() + b'\0' + module.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def _catalog_version(args, kwargs):
+    for value in (*args, *kwargs.values()):
+        if isinstance(value, CompiledCatalog):
+            return value.version
+    from .catalog import catalog_version
+    return catalog_version()
+
+
+def persistent(func):
+    """Look ``func`` results up in the result store before computing them.
+
+    ``wrapper.lookup(*args, **kwargs)`` returns the stored result without
+    computing it, or None.
+    """
+    name = f"{func.__module__}.{func.__qualname__}"
+
+    def _locate(args, kwargs):
+        store = get_store()
+        if store is None:
+            return None, None, None, None
+        version = _catalog_version(args, kwargs)
+        if not version:
+            # Compiled from an in-memory dict: nothing to version it by
+            return None, None, None, None
+        namespace = f"{name}:{code_version()}"
+        return store, namespace, version, scenario_hash(f"{namespace}\0{version}", args, kwargs)
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        store, namespace, version, key = _locate(args, kwargs)
+        if store is None:
+            return func(*args, **kwargs)
+        value = store.get(key, version, _MISSING)
+        if value is _MISSING:
+            value = func(*args, **kwargs)
+            store.put(key, namespace, version, value)
+        return value
+
+    def lookup(*args, **kwargs):
+        store, _, version, key = _locate(args, kwargs)
+        return None if store is None else store.get(key, version)
+
+    wrapper.lookup = lookup
+    return wrapper
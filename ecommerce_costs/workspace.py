@@ -0,0 +1,215 @@
+"""A workspace of named what-if scenarios, compared side by side.
+
+``ScenarioWorkspace`` holds named ``Scenario`` parameter sets.  ``evaluate``
+prices every scenario whose result is missing or out of date in one
+batched pass: one ``batch_platform_costs`` call per plan selection and
+usage mode, then one vectorized projection per horizon.  Adding or editing
+a scenario therefore recomputes that scenario only, and renaming one or
+changing its market mix recomputes nothing (the catalog does not price by
+market, as in the dashboard).
+
+Results are also cached process-wide, keyed by the catalog fingerprint and
+the scenario's priced inputs, so sessions comparing the same scenarios
+share them.
+
+``comparison`` and ``deltas`` give a metric as a (scenarios x platforms)
+array, as is or relative to a baseline scenario, for the side-by-side and
+delta views.
+"""
+from dataclasses import dataclass, fields
+
+import numpy as np
+
+from .api import PLAN_SELECTIONS, select_plans
+from .cache import get_cache
+from .engine import BUSINESS_SIZES, CompiledCatalog, batch_platform_costs, business_size_code, is_business_size
+from .projection import project
+
+# Per platform metrics of a ScenarioResult, with their display names
+METRICS = {
+    'total_monthly': 'Total monthly cost',
+    'annual_cost': 'Annual cost',
+    'monthly_transaction_fees': 'Transaction fees',
+    'break_even_month': 'Break-even month',
+    'final_profit': 'Cumulative profit at horizon',
+}
+
+_results = get_cache('ecommerce_costs.workspace.results', maxsize=4096)
+
+
+@dataclass(frozen=True)
+class Scenario:
+    """One named set of dashboard inputs."""
+    name: str
+    monthly_revenue: float
+    business_size: str
+    plan_selection: str = 'size'
+    monthly_traffic: int | None = None
+    num_products: int | None = None
+    growth_rate: float = 10.0
+    projection_months: int = 12
+    market_focus: tuple[str, ...] = ()
+
+    def __post_init__(self):
+        if not self.name:
+            raise ValueError("a scenario needs a name")
+        if not is_business_size(self.business_size):
+            raise ValueError(f"business_size must start with one of {', '.join(BUSINESS_SIZES)}, "
+                             f"not {self.business_size!r}")
+        if self.plan_selection not in PLAN_SELECTIONS:
+            raise ValueError(f"plan_selection must be one of {PLAN_SELECTIONS}, not {self.plan_selection!r}")
+        if self.projection_months < 1:
+            raise ValueError("projection_months must be at least 1")
+
+    @property
+    def inputs(self) -> tuple:
+        """The inputs the results depend on: not the name or the market mix."""
+        return tuple(getattr(self, f.name) for f in fields(self) if f.name not in ('name', 'market_focus'))
+
+
+@dataclass(frozen=True)
+class ScenarioResult:
+    """Per-platform costs and ROI of one scenario, in catalog platform order."""
+    plan: tuple[str, ...]
+    total_monthly: np.ndarray
+    annual_cost: np.ndarray
+    monthly_transaction_fees: np.ndarray
+    one_time_costs: np.ndarray
+    break_even_month: np.ndarray     # NaN where not reached within the horizon
+    final_profit: np.ndarray         # cumulative profit after projection_months
+    cheapest_platform: str
+
+
+def evaluate_scenarios(catalog: CompiledCatalog, scenarios: list[Scenario]) -> list[ScenarioResult]:
+    """Price and project ``scenarios`` in batched passes; results in order."""
+    n = len(scenarios)
+    platforms = np.arange(len(catalog.platforms))
+    costs = {key: np.empty((n, len(platforms))) for key in
+             ('total_monthly', 'annual_cost', 'monthly_transaction_fees', 'one_time_costs')}
+    plan_index = np.empty((n, len(platforms)), dtype=np.intp)
+
+    groups = {}
+    for i, scenario in enumerate(scenarios):
+        metered = scenario.monthly_traffic is not None or scenario.num_products is not None
+        groups.setdefault((scenario.plan_selection, metered), []).append(i)
+    for (plan_selection, metered), rows in groups.items():
+        group = [scenarios[i] for i in rows]
+        revenue = np.array([s.monthly_revenue for s in group], dtype=np.float64)
+        size = business_size_code([s.business_size for s in group])
+        plan = select_plans(catalog, size, revenue, plan_selection)
+        usage = {}
+        if metered:
+            usage = {'monthly_traffic': np.array([s.monthly_traffic or 0 for s in group], dtype=np.float64)[:, None],
+                     'num_products': np.array([s.num_products or 0 for s in group], dtype=np.float64)[:, None]}
+        batch = batch_platform_costs(catalog, revenue[:, None], size[:, None], platforms, plan=plan, **usage)
+        for key, values in costs.items():
+            values[rows] = batch[key]
+        plan_index[rows] = batch['plan_index']
+
+    # One projection per horizon, of every scenario with it
+    break_even = np.empty((n, len(platforms)))
+    final_profit = np.empty((n, len(platforms)))
+    horizons = {}
+    for i, scenario in enumerate(scenarios):
+        horizons.setdefault(scenario.projection_months, []).append(i)
+    for horizon, rows in horizons.items():
+        projection = project(
+            [scenarios[i].monthly_revenue for i in rows], [scenarios[i].growth_rate for i in rows], horizon,
+            costs['total_monthly'][rows], costs['one_time_costs'][rows],
+        )
+        break_even[rows] = projection.break_even_month
+        final_profit[rows] = projection.cumulative_profit[..., -1]
+
+    # Results are shared across sessions through the cache: freeze them
+    for values in (*costs.values(), break_even, final_profit):
+        values.flags.writeable = False
+    cheapest = np.argmin(costs['total_monthly'], axis=1)
+    return [
+        ScenarioResult(
+            plan=tuple(catalog.plan_name(p, k) for p, k in enumerate(plan_index[i].tolist())),
+            total_monthly=costs['total_monthly'][i],
+            annual_cost=costs['annual_cost'][i],
+            monthly_transaction_fees=costs['monthly_transaction_fees'][i],
+            one_time_costs=costs['one_time_costs'][i],
+            break_even_month=break_even[i],
+            final_profit=final_profit[i],
+            cheapest_platform=catalog.platforms[cheapest[i]],
+        )
+        for i in range(n)
+    ]
+
+
+class ScenarioWorkspace:
+    """Named scenarios and their results, recomputed only when they change.
+
+    ``evaluated`` names the scenarios the last ``evaluate`` actually priced.
+    """
+
+    def __init__(self, scenarios=()):
+        self.scenarios: dict[str, Scenario] = {}
+        self.evaluated: list[str] = []
+        self._results = {}   # name -> (key, ScenarioResult)
+        for scenario in scenarios:
+            self.save(scenario)
+
+    def __len__(self):
+        return len(self.scenarios)
+
+    def __contains__(self, name):
+        return name in self.scenarios
+
+    def save(self, scenario: Scenario):
+        """Add ``scenario``, or replace the one of the same name."""
+        self.scenarios[scenario.name] = scenario
+
+    def remove(self, name: str):
+        self.scenarios.pop(name, None)
+        self._results.pop(name, None)
+
+    def replace_all(self, scenarios):
+        """Make ``scenarios`` the workspace's contents, keeping results of those unchanged."""
+        scenarios = list(scenarios)
+        names = {scenario.name for scenario in scenarios}
+        for name in list(self.scenarios):
+            if name not in names:
+                self.remove(name)
+        self.scenarios = {}
+        for scenario in scenarios:
+            self.save(scenario)
+
+    def evaluate(self, catalog: CompiledCatalog) -> dict[str, ScenarioResult]:
+        """Results of every scenario, in order; only new or edited ones are priced."""
+        stale = []
+        for name, scenario in self.scenarios.items():
+            key = (catalog.fingerprint, scenario.inputs)
+            cached = self._results.get(name)
+            if cached is not None and cached[0] == key:
+                continue
+            result = _results.get(key)
+            if result is not None:
+                self._results[name] = (key, result)
+            else:
+                stale.append((name, key, scenario))
+
+        self.evaluated = [name for name, _, _ in stale]
+        if stale:
+            for (name, key, _), result in zip(stale, evaluate_scenarios(catalog, [s for _, _, s in stale])):
+                self._results[name] = (key, result)
+                _results.put(key, result)
+        return {name: self._results[name][1] for name in self.scenarios}
+
+    def comparison(self, catalog: CompiledCatalog, metric: str) -> np.ndarray:
+        """``metric`` per scenario (rows, in order) and platform (columns)."""
+        if metric not in METRICS:
+            raise ValueError(f"unknown metric {metric!r}; expected one of {list(METRICS)}")
+        results = self.evaluate(catalog)
+        if not results:
+            return np.empty((0, len(catalog.platforms)))
+        return np.stack([getattr(result, metric) for result in results.values()])
+
+    def deltas(self, catalog: CompiledCatalog, metric: str, baseline: str) -> np.ndarray:
+        """``comparison`` minus the ``baseline`` scenario's row."""
+        if baseline not in self.scenarios:
+            raise KeyError(f"no scenario named {baseline!r}")
+        values = self.comparison(catalog, metric)
+        return values - values[list(self.scenarios).index(baseline)]
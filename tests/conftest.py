@@ -0,0 +1,4 @@
+import os
+
+# Tests never read or write the persistent result store
+os.environ['ECOMMERCE_RESULT_STORE'] = 'off'
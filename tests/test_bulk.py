@@ -0,0 +1,33 @@
+"""Bulk quoting rejects rows it cannot price, by row number."""
+import io
+
+import pandas as pd
+import pytest
+
+from ecommerce_costs import get_compiled_catalog
+from ecommerce_costs.bulk import quote_file, quote_frame
+
+
+def scenarios(sizes):
+    return pd.DataFrame({'monthly_revenue': [1000.0] * len(sizes), 'business_size': sizes})
+
+
+def test_quote_frame_rejects_unknown_business_sizes():
+    with pytest.raises(ValueError, match=r"rows 2, 4:"):
+        quote_frame(get_compiled_catalog(), scenarios(['Startup', 'banana', 'Small (10-100 products)', None]))
+
+
+def test_quote_file_numbers_rows_across_chunks():
+    pytest.importorskip('pyarrow')
+    source = io.BytesIO(scenarios(['Startup'] * 5 + ['banana'] + ['Medium'] * 2).to_csv(index=False).encode())
+    with pytest.raises(ValueError, match=r"row 6:"):
+        quote_file(source, io.BytesIO(), chunk_rows=3, workers=1, input_format='csv', output_format='csv')
+
+
+def test_quote_file_prices_known_business_sizes():
+    pytest.importorskip('pyarrow')
+    source = io.BytesIO(scenarios(['Startup', 'Small', 'Medium', 'Enterprise']).to_csv(index=False).encode())
+    destination = io.BytesIO()
+    assert quote_file(source, destination, chunk_rows=3, workers=1, input_format='csv', output_format='csv') == 4
+    quoted = pd.read_csv(io.BytesIO(destination.getvalue()))
+    assert quoted['business_size'].tolist() == ['Startup', 'Small', 'Medium', 'Enterprise']
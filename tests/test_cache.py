@@ -0,0 +1,65 @@
+"""The process-wide LRU caches behind ``memoize``."""
+import threading
+import time
+
+from ecommerce_costs.cache import LRUCache, get_cache, memoize
+
+
+def test_lru_order_and_eviction():
+    cache = LRUCache(maxsize=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1          # 'b' is now least recently used
+    cache.put('c', 3)
+    assert 'b' not in cache and 'a' in cache and 'c' in cache
+    assert cache.stats()['evictions'] == 1
+
+
+def test_shrinking_evicts_least_recently_used():
+    cache = get_cache('tests.cache.shrink', maxsize=10)
+    for i in range(10):
+        cache.put(i, i)
+    cache.get(0)
+    assert get_cache('tests.cache.shrink', maxsize=3) is cache
+    assert len(cache) == 3
+    assert 0 in cache and 9 in cache and 8 in cache
+    assert cache.stats()['evictions'] == 7 and cache.stats()['maxsize'] == 3
+
+
+def test_counters_are_exact_under_concurrency():
+    cache = LRUCache(maxsize=64)
+    threads, lookups = 8, 5_000
+
+    def work(offset):
+        for i in range(lookups):
+            key = (offset + i) % 128
+            if cache.get(key) is None:
+                cache.put(key, key)
+
+    workers = [threading.Thread(target=work, args=(t,)) for t in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    stats = cache.stats()
+    assert stats['hits'] + stats['misses'] == threads * lookups
+    assert stats['size'] <= 64
+
+
+def test_concurrent_misses_compute_once():
+    calls = []
+
+    @memoize(maxsize=4, name='tests.cache.single_flight')
+    def slow(x):
+        calls.append(x)
+        time.sleep(0.05)
+        return x * 2
+
+    results = []
+    workers = [threading.Thread(target=lambda: results.append(slow(21))) for _ in range(6)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert results == [42] * 6
+    assert calls == [21]
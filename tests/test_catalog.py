@@ -0,0 +1,48 @@
+"""Hot reloading of the pricing file."""
+import os
+import shutil
+
+import pytest
+
+from ecommerce_costs.catalog import DEFAULT_PRICING_PATH, catalog_version, get_platform_data, load_catalog
+
+
+@pytest.fixture
+def pricing(tmp_path):
+    path = tmp_path / 'pricing.toml'
+    shutil.copyfile(DEFAULT_PRICING_PATH, path)
+    return path
+
+
+def bump_mtime(path):
+    # Explicit mtimes, so the test does not depend on the filesystem's clock resolution
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_touch_keeps_the_compiled_catalog(pricing):
+    catalog = load_catalog(pricing)
+    version = catalog_version(pricing)
+    bump_mtime(pricing)
+    assert load_catalog(pricing) is catalog
+    assert catalog_version(pricing) == version
+
+
+def test_edit_recompiles_with_a_new_version(pricing):
+    catalog = load_catalog(pricing)
+    version = catalog_version(pricing)
+    assert catalog.version == version
+
+    content = pricing.read_text()
+    assert 'Basic = { monthly = 39,' in content
+    pricing.write_text(content.replace('Basic = { monthly = 39,', 'Basic = { monthly = 45,', 1))
+    bump_mtime(pricing)
+
+    reloaded = load_catalog(pricing)
+    assert reloaded is not catalog
+    assert catalog_version(pricing) != version and reloaded.version == catalog_version(pricing)
+    assert get_platform_data(pricing)['Shopify']['plans']['Basic']['monthly'] == 45
+    p = reloaded.platforms.index('Shopify')
+    assert reloaded.plan_monthly[p, reloaded.plans[p].index('Basic')] == 45
+    # Unchanged until the mtime moves again
+    assert load_catalog(pricing) is reloaded
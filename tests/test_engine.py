@@ -0,0 +1,124 @@
+"""The batch engine against the dashboard's original scalar cost function."""
+import numpy as np
+import pytest
+
+from ecommerce_costs import (
+    BUSINESS_SIZES,
+    batch_platform_costs,
+    calculate_platform_costs,
+    compile_catalog,
+    get_platform_data,
+    quote_all_platforms,
+)
+
+SIZE_LABELS = ("Startup (0-100 products)", "Small Business (100-1,000 products)",
+               "Medium Business (1,000-10,000 products)", "Enterprise (10,000+ products)")
+REVENUES = np.concatenate([[0.0, 0.01, 1.0, 999.99], np.linspace(0, 500_000, 41), [1e7]])
+
+
+def reference_platform_costs(platform_name, platform_data, monthly_revenue, business_size, plan_name=None):
+    """The original dashboard function, verbatim but for the ``plan_name`` override."""
+    plans = platform_data['plans']
+    additional = platform_data['additional_costs']
+
+    if plan_name is not None:
+        pass
+    elif business_size.startswith("Startup"):
+        plan_name = list(plans.keys())[0]
+    elif business_size.startswith("Small"):
+        plan_name = list(plans.keys())[min(1, len(plans)-1)]
+    elif business_size.startswith("Medium"):
+        plan_name = list(plans.keys())[min(2, len(plans)-1)]
+    else:
+        plan_name = list(plans.keys())[-1]
+
+    plan = plans[plan_name]
+    monthly_platform = plan['monthly']
+    transaction_volume = monthly_revenue
+    base_transaction_fee = plan['transaction_fee']
+
+    if platform_name == 'Shopify':
+        total_transaction_rate = (base_transaction_fee + additional.get('third_party_gateway', 0)
+                                  + additional.get('international_fee', 0))
+        monthly_apps = additional['apps_basic'] if business_size.startswith("Startup") else additional['apps_advanced']
+        monthly_additional = monthly_apps
+        one_time = additional['theme']
+    elif platform_name == 'WooCommerce':
+        total_transaction_rate = additional['payment_gateway']
+        monthly_additional = (additional['hosting'] + additional['plugins'] + additional['security']
+                              + additional['ssl'] + additional['maintenance'])
+        one_time = 0
+    elif platform_name == 'Custom Next.js':
+        total_transaction_rate = additional['stripe_fee'] + additional['international_fee']
+        monthly_additional = (additional['database'] + additional['cdn'] + additional['monitoring']
+                              + additional['email_service'])
+        one_time = additional['development']
+    else:
+        total_transaction_rate = base_transaction_fee + additional.get('international_fee', 0)
+        monthly_additional = additional.get('apps', 0)
+        one_time = additional.get('theme', 0)
+
+    monthly_transaction_fees = transaction_volume * total_transaction_rate
+    total_monthly = monthly_platform + monthly_additional + monthly_transaction_fees
+    annual_cost = total_monthly * 12 + one_time
+
+    return {
+        'plan_name': plan_name,
+        'monthly_platform': monthly_platform,
+        'monthly_additional': monthly_additional,
+        'monthly_transaction_fees': monthly_transaction_fees,
+        'total_monthly': total_monthly,
+        'annual_cost': annual_cost,
+        'one_time_costs': one_time,
+        'transaction_rate': total_transaction_rate,
+    }
+
+
+KEYS = ('monthly_platform', 'monthly_additional', 'monthly_transaction_fees', 'total_monthly', 'annual_cost',
+        'one_time_costs', 'transaction_rate')
+
+
+@pytest.fixture(scope='module')
+def platforms_data():
+    return get_platform_data()
+
+
+@pytest.fixture(scope='module')
+def catalog(platforms_data):
+    return compile_catalog(platforms_data)
+
+
+@pytest.mark.parametrize('business_size', SIZE_LABELS)
+def test_scalar_wrapper_matches_reference(platforms_data, business_size):
+    for name, data in platforms_data.items():
+        for revenue in REVENUES:
+            expected = reference_platform_costs(name, data, float(revenue), business_size)
+            actual = calculate_platform_costs(name, data, float(revenue), business_size)
+            assert actual['plan_name'] == expected['plan_name']
+            for key in KEYS:
+                assert actual[key] == expected[key], (name, revenue, key)
+
+
+@pytest.mark.parametrize('business_size', SIZE_LABELS)
+def test_batch_matches_reference_on_every_plan(platforms_data, catalog, business_size):
+    size = BUSINESS_SIZES.index(business_size.split(' ')[0])
+    for p, (name, data) in enumerate(platforms_data.items()):
+        for k, plan_name in enumerate(data['plans']):
+            batch = batch_platform_costs(catalog, REVENUES, size, p, plan=k)
+            for i, revenue in enumerate(REVENUES):
+                expected = reference_platform_costs(name, data, float(revenue), business_size, plan_name)
+                for key in KEYS:
+                    assert float(np.broadcast_to(batch[key], REVENUES.shape)[i]) == expected[key], \
+                        (name, plan_name, revenue, key)
+
+
+@pytest.mark.parametrize('business_size', SIZE_LABELS)
+def test_quote_all_platforms_matches_reference(platforms_data, catalog, business_size):
+    for revenue in REVENUES:
+        quotes = quote_all_platforms(catalog, float(revenue), business_size)
+        assert list(quotes) == list(platforms_data)
+        for name, data in platforms_data.items():
+            expected = reference_platform_costs(name, data, float(revenue), business_size)
+            assert quotes[name]['plan_name'] == expected['plan_name']
+            for key in KEYS:
+                assert quotes[name][key] == expected[key], (name, revenue, key)
@@ -0,0 +1,99 @@
+"""Lower-envelope crossovers against brute-force minimization."""
+import numpy as np
+import pytest
+
+from ecommerce_costs import (
+    batch_platform_costs,
+    catalog_cost_lines,
+    catalog_revenue_limits,
+    compute_crossovers,
+    compute_platform_costs,
+    get_compiled_catalog,
+    lower_envelope,
+)
+
+SIZE_LABELS = ("Startup (0-100 products)", "Small Business (100-1,000 products)",
+               "Medium Business (1,000-10,000 products)", "Enterprise (10,000+ products)")
+
+
+def brute_force(intercepts, slopes, revenue, limits=None):
+    costs = intercepts[None, :] + slopes[None, :] * revenue[:, None]
+    if limits is not None:
+        available = (revenue[:, None] <= limits) | (limits == limits.max())
+        costs = np.where(available, costs, np.inf)
+    return costs.min(axis=1), costs.argmin(axis=1)
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_random_lines(seed):
+    rng = np.random.default_rng(seed)
+    n = rng.integers(1, 40)
+    intercepts = rng.uniform(0, 1_000, n).round(rng.integers(0, 3))
+    slopes = rng.uniform(0, 0.1, n).round(3)   # rounding makes equal slopes and ties likely
+    envelope = lower_envelope(intercepts, slopes)
+    revenue = np.concatenate([np.linspace(0, 200_000, 2_001), envelope.breakpoints])
+    best_cost, _ = brute_force(intercepts, slopes, revenue)
+    np.testing.assert_allclose(envelope.cost_at(revenue), best_cost, rtol=1e-12, atol=1e-9)
+
+    # Strictly inside each interval the cheapest option is unique up to identical lines
+    bounds = np.concatenate([[0.0], envelope.breakpoints, [envelope.breakpoints[-1] * 2 + 1
+                                                             if len(envelope.breakpoints) else 1.0]])
+    middles = (bounds[:-1] + bounds[1:]) / 2
+    _, best = brute_force(intercepts, slopes, middles)
+    chosen = envelope.cheapest_at(middles)
+    np.testing.assert_array_equal(intercepts[chosen], intercepts[best])
+    np.testing.assert_array_equal(slopes[chosen], slopes[best])
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_random_capped_lines(seed):
+    rng = np.random.default_rng(seed)
+    n = rng.integers(1, 20)
+    intercepts = rng.uniform(0, 1_000, n).round(rng.integers(0, 3))
+    slopes = rng.uniform(0, 0.1, n).round(3)
+    limits = np.where(rng.random(n) < 0.6, rng.choice([20_000.0, 50_000.0, 120_000.0], n), np.inf)
+    envelope = lower_envelope(intercepts, slopes, limits=limits)
+    revenue = np.concatenate([np.linspace(0, 200_000, 2_001), np.unique(limits[np.isfinite(limits)])])
+    best_cost, _ = brute_force(intercepts, slopes, revenue, limits)
+    np.testing.assert_allclose(envelope.cost_at(revenue), best_cost, rtol=1e-12, atol=1e-9)
+    chosen = envelope.cheapest_at(revenue)
+    assert ((revenue <= limits[chosen]) | (limits[chosen] == limits.max())).all()
+
+
+def test_capped_plans_are_not_picked_above_their_cap():
+    catalog = get_compiled_catalog()
+    bigcommerce = catalog.platforms.index('BigCommerce')
+    standard_cap = catalog.revenue_limit[bigcommerce, 0] / 12
+    for revenue in (standard_cap + 1, 25_000.0, 300_000.0):
+        costs = compute_platform_costs(catalog, revenue, SIZE_LABELS[0], 'cheapest')['BigCommerce']
+        plan = catalog.plans[bigcommerce].index(costs['plan_name'])
+        assert revenue * 12 <= catalog.revenue_limit[bigcommerce, plan]
+        assert costs['runner_up_plan'] is None or catalog.revenue_limit[
+            bigcommerce, catalog.plans[bigcommerce].index(costs['runner_up_plan'])] >= revenue * 12
+
+    envelope, option_platform, option_plan = compute_crossovers(catalog, SIZE_LABELS[0], True)
+    for start, end, option in envelope.intervals():
+        assert end <= catalog.revenue_limit[option_platform[option], option_plan[option]] / 12 * (1 + 1e-12)
+
+
+@pytest.mark.parametrize('business_size', SIZE_LABELS)
+@pytest.mark.parametrize('all_plans', [False, True])
+@pytest.mark.parametrize('usage', [(None, None), (250_000, 5_000)])
+def test_catalog_crossovers_match_pricing_every_option(business_size, all_plans, usage):
+    catalog = get_compiled_catalog()
+    traffic, products = usage
+    envelope, option_platform, option_plan = compute_crossovers(catalog, business_size, all_plans, traffic, products)
+    revenue = np.linspace(0, 500_000, 1_001)
+
+    intercepts, slopes, platform, plan = catalog_cost_lines(catalog, business_size, all_plans, traffic, products)
+    priced = batch_platform_costs(catalog, revenue[:, None], business_size, platform[None, :], plan[None, :],
+                                  traffic, products)['total_monthly']
+    if all_plans:
+        # Plans are only options up to their revenue cap
+        limits = catalog_revenue_limits(catalog, platform, plan)
+        priced = np.where(revenue[:, None] <= limits, priced, np.inf)
+    option = envelope.cheapest_at(revenue)
+    chosen = priced[np.arange(len(revenue)), option]
+    np.testing.assert_allclose(chosen, priced.min(axis=1), rtol=1e-12, atol=1e-9)
+    np.testing.assert_array_equal(option_platform, platform)
+    np.testing.assert_array_equal(option_plan, plan)
@@ -0,0 +1,73 @@
+"""Usage-based infrastructure tiers against hand-computed bills."""
+import numpy as np
+import pytest
+
+from ecommerce_costs import compute_platform_costs, get_compiled_catalog
+from ecommerce_costs.infrastructure import _parse_tiers, platform_component_costs, usage_drivers
+
+inf = float('inf')
+
+# Default workload: T visits serve T/128 GB and 1.2e-4*T million requests,
+# run 1e-4*T million queries and need ceil(8T / 2,630,016) servers at peak;
+# N products take 5 + N/512 GB of storage.  Bills from pricing.toml.
+CASES = [
+    # (traffic, products, WooCommerce hosting, Next.js cdn, Next.js database)
+    (10_000, 1_000, 0.0, 0.0, 0.0),
+    # 7,812.5 GB: 900 * 0.08 + 6,812.5 * 0.05; 4 servers: 3 * 40
+    # cdn: 6,812.5 GB * 0.085 + 110M requests * 0.75; database: 80M queries * 0.20
+    (1_000_000, 1_000, 72 + 340.625 + 120, 579.0625 + 82.5, 16.0),
+    # 78,125 GB: 900 * 0.08 + 77,125 * 0.05; 31 servers: 30 * 40
+    # cdn: 9,000 * 0.085 + 40,000 * 0.06 + 28,125 * 0.04 + 1,190M * 0.75
+    # database: 480M * 0.20 + 500M * 0.10
+    (10_000_000, 1_000, 72 + 3856.25 + 1200, 765 + 2400 + 1125 + 892.5, 146.0),
+    # 102.65625 GB of media: 82.65625 * 0.10 on the server, 52.65625 * 0.023 in object storage
+    (10_000, 50_000, 8.265625, (102.65625 - 50) * 0.023, 0.0),
+]
+
+
+@pytest.mark.parametrize('traffic, products, hosting, cdn, database', CASES)
+def test_tier_totals(traffic, products, hosting, cdn, database):
+    catalog = get_compiled_catalog()
+    usage = catalog.usage
+    costs = platform_component_costs(usage, usage_drivers(traffic, products))
+    woo, nextjs = catalog.platforms.index('WooCommerce'), catalog.platforms.index('Custom Next.js')
+    assert costs[woo, usage.components.index('hosting')] == pytest.approx(hosting)
+    assert costs[nextjs, usage.components.index('cdn')] == pytest.approx(cdn)
+    assert costs[nextjs, usage.components.index('database')] == pytest.approx(database)
+
+    # The quotes carry the same usage on top of the flat fees
+    quotes = compute_platform_costs(catalog, 10_000, "Startup (0-100 products)",
+                                    monthly_traffic=traffic, num_products=products)
+    assert quotes['WooCommerce']['monthly_usage'] == pytest.approx(hosting)
+    assert quotes['Custom Next.js']['monthly_usage'] == pytest.approx(cdn + database)
+
+
+def test_usage_is_monotone_in_traffic():
+    catalog = get_compiled_catalog()
+    traffic = np.linspace(0, 20_000_000, 401)
+    costs = platform_component_costs(catalog.usage, usage_drivers(traffic, 1_000)).sum(axis=-1)
+    assert (np.diff(costs, axis=0) >= 0).all()
+
+
+@pytest.mark.parametrize('tiers, message', [
+    ([[100, 0], [1000, 0.08]], 'open-ended'),
+    ([], 'open-ended'),
+    ([[100, 0], [50, 0.1], [inf, 0.05]], 'increasing'),
+    ([[0, 0], [inf, 0.05]], 'increasing'),
+])
+def test_parse_tiers_rejects_bad_bounds(tiers, message):
+    with pytest.raises(ValueError, match=message):
+        _parse_tiers('WooCommerce', 'hosting', 'bandwidth_gb', tiers)
+
+
+def test_parse_tiers_rejects_unknown_driver():
+    with pytest.raises(ValueError, match='unknown driver'):
+        _parse_tiers('WooCommerce', 'hosting', 'cpu_hours', [[inf, 0.1]])
+
+
+def test_parse_tiers_splits_marginal_tiers():
+    starts, widths, prices = _parse_tiers('WooCommerce', 'hosting', 'bandwidth_gb',
+                                          [[100, 0], [1000, 0.08], [inf, 0.05]])
+    np.testing.assert_array_equal(starts, [0, 100, 1000])
+    np.testing.assert_array_equal(widths, [100, 900, inf])
+    np.testing.assert_array_equal(prices, [0, 0.08, 0.05])
@@ -0,0 +1,80 @@
+"""Rerun records reach a log handler, and counters a /metrics endpoint."""
+import json
+import logging
+import urllib.error
+import urllib.request
+
+import pytest
+
+from ecommerce_costs import instrumentation
+from ecommerce_costs.instrumentation import RerunProfile, configure_profile_log, start_metrics_server
+
+
+@pytest.fixture
+def fresh(monkeypatch):
+    # Both are set up once per process: give each test its own
+    monkeypatch.setattr(instrumentation, '_log_handler', None)
+    monkeypatch.setattr(instrumentation, '_metrics_server', None)
+    monkeypatch.delenv(instrumentation.PROFILE_LOG_ENV, raising=False)
+    monkeypatch.delenv(instrumentation.METRICS_PORT_ENV, raising=False)
+    level = instrumentation.logger.level
+    yield
+    handler = instrumentation._log_handler
+    if handler is not None:
+        instrumentation.logger.removeHandler(handler)
+        handler.close()
+    instrumentation.logger.setLevel(level)
+    if instrumentation._metrics_server is not None:
+        instrumentation._metrics_server.shutdown()
+        instrumentation._metrics_server.server_close()
+
+
+def test_profile_log_is_off_by_default(fresh):
+    assert configure_profile_log() is None
+    assert instrumentation._log_handler is None
+
+
+def test_profile_log_appends_json_records_to_a_file(fresh, tmp_path, monkeypatch):
+    path = tmp_path / 'reruns.log'
+    monkeypatch.setenv(instrumentation.PROFILE_LOG_ENV, str(path))
+    handler = configure_profile_log()
+    assert configure_profile_log() is handler
+    assert instrumentation.logger.handlers.count(handler) == 1
+
+    profile = RerunProfile()
+    with profile.section('costs'):
+        pass
+    profile.finish()
+    handler.flush()
+    record = json.loads(path.read_text().splitlines()[-1])
+    assert record['event'] == 'rerun'
+    assert set(record['sections_ms']) == {'costs'}
+
+
+def test_metrics_server_is_off_without_a_port(fresh):
+    assert start_metrics_server() is None
+
+
+def test_metrics_server_serves_prometheus_text(fresh):
+    server = start_metrics_server(0, host='127.0.0.1')
+    assert start_metrics_server(0, host='127.0.0.1') is server
+    url = f'http://127.0.0.1:{server.server_address[1]}'
+    RerunProfile().finish()
+    with urllib.request.urlopen(f'{url}/metrics', timeout=5) as response:
+        assert response.status == 200
+        assert 'ecommerce_reruns_total' in response.read().decode()
+    with pytest.raises(urllib.error.HTTPError) as error:
+        urllib.request.urlopen(f'{url}/other', timeout=5)
+    assert error.value.code == 404
+
+
+def test_metrics_server_logs_a_port_in_use(fresh, caplog):
+    first = start_metrics_server(0, host='127.0.0.1')
+    instrumentation._metrics_server = None
+    try:
+        with caplog.at_level(logging.WARNING, logger=instrumentation.logger.name):
+            assert start_metrics_server(first.server_address[1], host='127.0.0.1') is None
+        assert 'metrics server not started' in caplog.text
+    finally:
+        first.shutdown()
+        first.server_close()
@@ -0,0 +1,63 @@
+"""Reproducibility of the Monte Carlo risk simulation."""
+import numpy as np
+import pytest
+
+from ecommerce_costs import compute_platform_costs, get_compiled_catalog, project
+from ecommerce_costs.montecarlo import PERCENTILES, RiskAssumptions, simulate_platform_costs
+
+MONTHLY_REVENUE = 20_000
+MONTHS = 24
+
+
+@pytest.fixture(scope='module')
+def platform_costs():
+    return compute_platform_costs(get_compiled_catalog(), MONTHLY_REVENUE, "Small Business (100-1,000 products)")
+
+
+def run(platform_costs, **kwargs):
+    kwargs.setdefault('n_paths', 5_000)
+    kwargs.setdefault('seed', 7)
+    kwargs.setdefault('workers', 1)
+    return simulate_platform_costs(platform_costs, MONTHLY_REVENUE, MONTHS, **kwargs)
+
+
+def assert_same(a, b):
+    np.testing.assert_array_equal(a.mean_profit, b.mean_profit)
+    np.testing.assert_array_equal(a.break_even_probability, b.break_even_probability)
+    for q in PERCENTILES:
+        np.testing.assert_array_equal(a.percentiles[q], b.percentiles[q])
+
+
+def test_workers_do_not_change_results(platform_costs):
+    assert_same(run(platform_costs, chunk_size=1024, workers=1),
+                run(platform_costs, chunk_size=1024, workers=2))
+
+
+@pytest.mark.parametrize('chunk_size', [1, 1024, 3000, 100_000])
+def test_chunk_size_does_not_change_results(platform_costs, chunk_size):
+    reference = run(platform_costs, chunk_size=2048, max_sample_paths=1_000)
+    result = run(platform_costs, chunk_size=chunk_size, max_sample_paths=1_000)
+
+    # Means are summed per chunk, so they only agree to rounding
+    np.testing.assert_allclose(result.mean_profit, reference.mean_profit, rtol=1e-12)
+    np.testing.assert_array_equal(result.break_even_probability, reference.break_even_probability)
+    for q in PERCENTILES:
+        np.testing.assert_array_equal(result.percentiles[q], reference.percentiles[q])
+
+
+def test_zero_variance_matches_the_deterministic_projection(platform_costs):
+    growth = 3.0
+    assumptions = RiskAssumptions(growth_mean=growth, growth_sd=0, revenue_sd=0, fee_sd=0, monthly_traffic=0)
+    result = run(platform_costs, n_paths=2_500, assumptions=assumptions)
+
+    costs = list(platform_costs.values())
+    expected = project(
+        MONTHLY_REVENUE, growth, MONTHS,
+        np.array([c['total_monthly'] for c in costs]),
+        np.array([c['one_time_costs'] for c in costs]),
+        transaction_rate=np.array([c['transaction_rate'] for c in costs]),
+    ).cumulative_profit
+    np.testing.assert_allclose(result.mean_profit, expected, rtol=1e-9)
+    for q in PERCENTILES:
+        np.testing.assert_allclose(result.percentiles[q], expected, rtol=1e-6)
+    np.testing.assert_array_equal(result.break_even_probability, np.where(expected >= 0, 1.0, 0.0))
@@ -0,0 +1,17 @@
+"""The package exports what ``__all__`` promises."""
+import ecommerce_costs
+
+
+def test_every_name_in_all_is_exported():
+    missing = [name for name in ecommerce_costs.__all__ if not hasattr(ecommerce_costs, name)]
+    assert missing == []
+
+
+def test_star_import():
+    namespace = {}
+    exec('from ecommerce_costs import *', namespace)
+    assert set(ecommerce_costs.__all__) <= set(namespace)
+
+
+def test_all_is_sorted():
+    assert ecommerce_costs.__all__ == sorted(ecommerce_costs.__all__)
@@ -0,0 +1,78 @@
+"""The dashboard dependency graph: what each input change recomputes."""
+import pytest
+
+from ecommerce_costs import compute_platform_costs, get_compiled_catalog
+from ecommerce_costs.pipeline import DASHBOARD, PipelineState
+
+SIZE = "Startup (0-100 products)"
+
+
+def dashboard_state(**inputs):
+    state = PipelineState(DASHBOARD)
+    state.set(**{
+        'catalog': get_compiled_catalog(),
+        'business_size': SIZE,
+        'monthly_revenue': 5_000,
+        'num_products': 50,
+        'monthly_traffic': 10_000,
+        'market_focus': ['Qatar'],
+        'business_type': 'Fashion',
+        'plan_selection': 'size',
+        'growth_rate': 5.0,
+        'projection_months': 12,
+        'model_upgrades': False,
+        'migration_cost': 500.0,
+        'all_plans': False,
+        **inputs,
+    })
+    return state
+
+
+@pytest.mark.parametrize('plan_selection', ['size', 'cheapest'])
+@pytest.mark.parametrize('monthly_revenue', [0, 2_000, 4_500, 30_000, 300_000])
+def test_cheapest_platform_agrees_with_platform_costs(plan_selection, monthly_revenue):
+    state = dashboard_state(plan_selection=plan_selection, monthly_revenue=monthly_revenue)
+    costs = compute_platform_costs(get_compiled_catalog(), monthly_revenue, SIZE, plan_selection,
+                                   monthly_traffic=10_000, num_products=50)
+    cheapest = min(c['total_monthly'] for c in costs.values())
+    assert costs[state.get('cheapest_platform')]['total_monthly'] == pytest.approx(cheapest)
+
+
+def get_dashboard(state):
+    # Every node the dashboard reads while upgrades are not modelled
+    pytest.importorskip('pandas')
+    pytest.importorskip('plotly')
+    state.begin_run()
+    for name in DASHBOARD.nodes:
+        if name != 'upgrade_timeline':
+            state.get(name)
+    return state.recomputed
+
+
+def test_first_run_computes_each_node_once():
+    state = dashboard_state()
+    recomputed = get_dashboard(state)
+    assert sorted(recomputed) == sorted(set(DASHBOARD.nodes) - {'upgrade_timeline'})
+
+
+def test_unchanged_inputs_recompute_nothing():
+    state = dashboard_state()
+    get_dashboard(state)
+    assert state.set(market_focus=['Qatar'], monthly_revenue=5_000) == set()
+    assert get_dashboard(state) == []
+
+
+@pytest.mark.parametrize('name, value', [('business_type', 'Electronics'), ('market_focus', ['Qatar', 'GCC'])])
+def test_inputs_no_node_reads_recompute_nothing(name, value):
+    state = dashboard_state()
+    get_dashboard(state)
+    assert state.set(**{name: value}) == {name}
+    assert get_dashboard(state) == []
+
+
+def test_projection_months_recomputes_only_the_projection():
+    state = dashboard_state()
+    get_dashboard(state)
+    state.set(projection_months=24)
+    assert get_dashboard(state) == ['projection', 'projection_figure']
+    assert len(state.get('projection').months) == 24
@@ -0,0 +1,59 @@
+"""Every entry point chooses the same plans, through ``api.select_plans``."""
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ecommerce_costs import BUSINESS_SIZES, compute_platform_costs, get_compiled_catalog
+from ecommerce_costs.bulk import platform_slug, quote_frame
+from ecommerce_costs.workspace import Scenario, evaluate_scenarios
+
+
+def random_scenarios(n, seed=0):
+    rng = random.Random(seed)
+    scenarios = []
+    for _ in range(n):
+        metered = rng.random() < 0.5
+        scenarios.append({
+            'monthly_revenue': rng.choice([0.0, 2_767.0, 5_000.0, round(rng.uniform(0, 500_000), 2)]),
+            'business_size': rng.choice(BUSINESS_SIZES),
+            'monthly_traffic': rng.randrange(100, 1_000_000) if metered else None,
+            'num_products': rng.randrange(1, 50_000) if metered else None,
+        })
+    return scenarios
+
+
+@pytest.mark.parametrize('plan_selection', ['size', 'cheapest'])
+def test_dashboard_bulk_service_and_workspace_agree(plan_selection):
+    service = pytest.importorskip('ecommerce_costs.service')
+    catalog = get_compiled_catalog()
+    scenarios = random_scenarios(300)
+
+    expected = [compute_platform_costs(catalog, s['monthly_revenue'], s['business_size'], plan_selection,
+                                       s['monthly_traffic'], s['num_products']) for s in scenarios]
+    plans = [[costs['plan_name'] for costs in quotes.values()] for quotes in expected]
+    totals = np.array([[costs['total_monthly'] for costs in quotes.values()] for quotes in expected])
+
+    # Bulk quoting prices a file with usage columns throughout, so compare its metered rows only
+    metered = [i for i, s in enumerate(scenarios) if s['monthly_traffic'] is not None]
+    frame = quote_frame(catalog, pd.DataFrame([scenarios[i] for i in metered]), plan_selection)
+    for p, platform in enumerate(catalog.platforms):
+        slug = platform_slug(platform)
+        assert frame[f'{slug}_plan'].astype(str).tolist() == [plans[i][p] for i in metered]
+        np.testing.assert_allclose(frame[f'{slug}_total_monthly'], totals[metered, p].round(2))
+
+    parsed = [service.parse_scenario({k: v for k, v in s.items() if v is not None}, plan_selection)
+              for s in scenarios]
+    for i, result in enumerate(service.price_scenarios(catalog, parsed)):
+        for p, (platform, quote) in enumerate(result['platforms'].items()):
+            assert quote['plan_name'] == plans[i][p]
+            assert quote['total_monthly'] == round(totals[i, p], 2)
+            if plan_selection == 'cheapest':
+                assert quote['runner_up_plan'] == expected[i][platform]['runner_up_plan']
+
+    results = evaluate_scenarios(catalog, [Scenario(name=str(i), plan_selection=plan_selection, **s)
+                                           for i, s in enumerate(scenarios)])
+    for i, result in enumerate(results):
+        assert list(result.plan) == plans[i]
+        np.testing.assert_allclose(result.total_monthly, totals[i])
@@ -0,0 +1,76 @@
+"""The vectorized projection against the dashboard's original ROI loop."""
+import numpy as np
+import pytest
+
+from ecommerce_costs import compute_platform_costs, get_compiled_catalog, project, project_platform_costs
+
+
+def reference_profits(monthly_revenue, growth_rate, projection_months, total_monthly, one_time):
+    """The original per-platform loop (one platform), verbatim."""
+    months = list(range(1, projection_months + 1))
+    revenues = [monthly_revenue * (1 + growth_rate/100)**i for i in months]
+    cumulative_costs = [total_monthly * i + one_time for i in months]
+    cumulative_revenues = [sum(revenues[:i+1]) for i in range(len(revenues))]
+    return [rev - cost for rev, cost in zip(cumulative_revenues, cumulative_costs)]
+
+
+@pytest.mark.parametrize('monthly_revenue', [0, 1_000, 25_000, 500_000])
+@pytest.mark.parametrize('growth_rate', [0, 2.5, 10, 50])
+@pytest.mark.parametrize('projection_months', [1, 3, 12, 36, 240])
+def test_projection_matches_reference_loop(monthly_revenue, growth_rate, projection_months):
+    catalog = get_compiled_catalog()
+    platform_costs = compute_platform_costs(catalog, monthly_revenue, "Small Business (100-1,000 products)")
+    projection = project_platform_costs(platform_costs, monthly_revenue, growth_rate, projection_months)
+
+    assert projection.cumulative_profit.shape == (len(platform_costs), projection_months)
+    for p, costs in enumerate(platform_costs.values()):
+        expected = reference_profits(monthly_revenue, growth_rate, projection_months,
+                                     costs['total_monthly'], costs['one_time_costs'])
+        np.testing.assert_allclose(projection.cumulative_profit[p], expected, rtol=1e-12, atol=1e-6)
+        reached = [month for month, profit in zip(range(1, projection_months + 1), expected) if profit >= 0]
+        if reached:
+            assert projection.break_even_month[p] == reached[0]
+        else:
+            assert np.isnan(projection.break_even_month[p])
+
+
+def test_grid_projection_matches_scalar_projections():
+    total_monthly = np.array([120.0, 400.0, 75.5])
+    one_time = np.array([300.0, 0.0, 10_000.0])
+    revenue = np.array([[1_000.0], [20_000.0]])
+    growth = np.array([[0.0, 5.0, 20.0]])
+    grid = project(revenue, growth, 24, total_monthly, one_time)
+    assert grid.cumulative_profit.shape == (2, 3, 3, 24)
+    for i in range(2):
+        for j in range(3):
+            single = project(revenue[i, 0], growth[0, j], 24, total_monthly, one_time)
+            np.testing.assert_allclose(grid.cumulative_profit[i, j], single.cumulative_profit)
+            np.testing.assert_array_equal(grid.break_even_month[i, j], single.break_even_month)
+
+
+def test_per_scenario_costs_match_scalar_projections():
+    revenue = np.array([1_000.0, 20_000.0, 250_000.0])
+    growth = np.array([0.0, 5.0, 20.0])
+    total_monthly = np.array([[120.0, 400.0], [900.0, 75.5], [4_000.0, 12_000.0]])
+    one_time = np.array([[300.0, 0.0], [0.0, 10_000.0], [50_000.0, 0.0]])
+    scenarios = project(revenue, growth, 36, total_monthly, one_time)
+    assert scenarios.cumulative_profit.shape == (3, 2, 36)
+    for i in range(3):
+        single = project(revenue[i], growth[i], 36, total_monthly[i], one_time[i])
+        np.testing.assert_array_equal(scenarios.cumulative_profit[i], single.cumulative_profit)
+        np.testing.assert_array_equal(scenarios.break_even_month[i], single.break_even_month)
+
+
+def test_fees_on_monthly_revenue():
+    total_monthly = np.array([120.0, 400.0])
+    one_time = np.array([300.0, 0.0])
+    rate = np.array([0.029, 0.005])
+    flat = project(10_000.0, 0, 12, total_monthly, one_time)
+    # Without growth every month's revenue is the starting revenue
+    np.testing.assert_allclose(project(10_000.0, 0, 12, total_monthly, one_time, transaction_rate=rate).cumulative_profit,
+                               flat.cumulative_profit)
+
+    grown = project(10_000.0, 5, 12, total_monthly, one_time, transaction_rate=rate)
+    flat = project(10_000.0, 5, 12, total_monthly, one_time)
+    np.testing.assert_allclose(flat.cumulative_profit - grown.cumulative_profit,
+                               rate[:, None] * (flat.cumulative_revenue - 10_000.0 * flat.months))
@@ -0,0 +1,72 @@
+"""Report export: shared figure assets and background jobs."""
+from collections import Counter
+
+import pytest
+
+pytest.importorskip('plotly')
+report = pytest.importorskip('ecommerce_costs.report')
+
+from ecommerce_costs.cache import clear_caches  # noqa: E402
+
+SIZE = "Small Business (100-1,000 products)"
+
+
+@pytest.fixture(autouse=True)
+def fresh_caches():
+    clear_caches()
+    yield
+    clear_caches()
+
+
+@pytest.fixture
+def rendered(monkeypatch):
+    counts = Counter()
+    build = report.build_report_figure
+
+    def counting(catalog, scenario, figure):
+        counts[figure] += 1
+        return build(catalog, scenario, figure)
+
+    monkeypatch.setattr(report, 'build_report_figure', counting)
+    return counts
+
+
+def test_cost_charts_are_shared_across_growth_rates(rendered):
+    scenarios = [report.ReportScenario(10_000, SIZE, growth_rate=growth, title=f'{growth}% growth')
+                 for growth in (0, 5, 10)]
+    scenarios.append(report.ReportScenario(40_000, SIZE, title='Bigger store'))
+    progress = []
+    content = report.export_report(scenarios, 'html', workers=1, progress=lambda done, total: progress.append(total))
+
+    # Three growth rates share one set of cost charts; the bigger store has its own
+    assert rendered == {'monthly_total': 2, 'annual_total': 2, 'breakdown': 2, 'projection': 4}
+    assert progress[-1] == 10
+    # Every scenario still gets its own copy of each chart in the document
+    assert content.count(b'Plotly.newPlot(') == 4 * len(report.FIGURES)
+    for scenario in scenarios:
+        assert scenario.label.encode() in content
+
+
+def test_figure_inputs_ignore_title_and_projection_for_cost_charts():
+    a = report.ReportScenario(10_000, SIZE, growth_rate=2, projection_months=12, title='A')
+    b = report.ReportScenario(10_000, SIZE, growth_rate=8, projection_months=36, title='B')
+    for figure in ('comparison_table', 'monthly_total', 'annual_total', 'breakdown'):
+        assert report._figure_inputs(a, figure) == report._figure_inputs(b, figure)
+    for figure in ('projection', 'break_even_table'):
+        assert report._figure_inputs(a, figure) != report._figure_inputs(b, figure)
+    assert report._figure_inputs(a, 'projection') == report._figure_inputs(
+        report.ReportScenario(10_000, SIZE, growth_rate=2, projection_months=12, title='Other'), 'projection')
+
+
+def test_job_result_reraises_the_export_error():
+    job = report.start_report([report.ReportScenario(10_000, SIZE)], fmt='docx', workers=1)
+    with pytest.raises(ValueError, match='unknown report format'):
+        job.result(timeout=30)
+    assert job.done and job.finished is not None
+
+
+def test_job_returns_the_report(rendered):
+    job = report.start_report([report.ReportScenario(10_000, SIZE)], workers=1)
+    content = job.result(timeout=60)
+    assert content.startswith(b'<!DOCTYPE html>')
+    assert job.fraction == 1.0
@@ -0,0 +1,53 @@
+"""The sensitivity grid against a month-by-month loop over single points."""
+import numpy as np
+import pytest
+
+from ecommerce_costs.sensitivity import evaluate_grid
+
+FIXED = np.array([29.0, 79.0, 299.0, 0.0])
+RATE = np.array([0.029, 0.026, 0.024, 0.035])
+ONE_TIME = np.array([0.0, 500.0, 2000.0, 0.0])
+HORIZON = 24
+
+
+def reference_point(revenue, growth_rate):
+    monthly, cumulative_revenue = revenue, 0.0
+    cumulative_cost = ONE_TIME.copy()
+    break_even = np.full(len(FIXED), np.nan)
+    for month in range(1, HORIZON + 1):
+        monthly *= 1 + growth_rate / 100
+        cumulative_revenue += monthly
+        cumulative_cost += FIXED + RATE * monthly
+        break_even[np.isnan(break_even) & (cumulative_revenue >= cumulative_cost)] = month
+    return cumulative_cost, break_even
+
+
+def test_grid_matches_point_by_point_loop():
+    grid = evaluate_grid(FIXED, RATE, ONE_TIME, HORIZON, revenue_range=(0, 20000), growth_range=(0, 50),
+                         resolution=40, workers=1)
+    for g, growth_rate in enumerate(grid.growth_rates):
+        for r, revenue in enumerate(grid.revenues):
+            cumulative_cost, break_even = reference_point(revenue, growth_rate)
+            assert grid.cheapest[g, r] == np.argmin(cumulative_cost)
+            assert np.isclose(grid.spread[g, r], np.ptp(cumulative_cost), rtol=1e-5)
+            np.testing.assert_array_equal(grid.break_even[:, g, r], break_even)
+
+
+def test_cheapest_platform_moves_with_growth():
+    grid = evaluate_grid(FIXED, RATE, ONE_TIME, HORIZON, revenue_range=(0, 20000), growth_range=(0, 50),
+                         resolution=40, workers=1)
+    column = np.searchsorted(grid.revenues, 5000)
+    assert len(set(grid.cheapest[:, column].tolist())) > 1
+    assert np.ptp(grid.spread[:, column]) > 0
+
+
+def test_cheapest_heatmap_carries_no_per_cell_names():
+    pytest.importorskip('plotly')
+    from ecommerce_costs import compute_platform_costs, get_compiled_catalog
+    from ecommerce_costs.figures import build_sensitivity_figures
+
+    platform_costs = compute_platform_costs(get_compiled_catalog(), 10_000, "Startup (0-100 products)")
+    fig_cheapest, _, _ = build_sensitivity_figures(platform_costs, 12, (0, 50_000), (0, 20), 60, 'Shopify')
+    heatmap = fig_cheapest.data[0]
+    assert heatmap.customdata is None
+    assert list(heatmap.colorbar.ticktext) == list(platform_costs)
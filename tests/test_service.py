@@ -0,0 +1,32 @@
+"""The quoting service validates scenarios before pricing them."""
+import pytest
+
+from ecommerce_costs import BUSINESS_SIZES
+
+service = pytest.importorskip('ecommerce_costs.service')
+
+
+@pytest.fixture(scope='module')
+def client():
+    return service.QuoteClient()
+
+
+def test_quote_accepts_every_business_size(client):
+    for label in BUSINESS_SIZES:
+        status, body = client.post('/quote', {'business_size': label, 'monthly_revenue': 1000})
+        assert status == 200, body
+
+
+@pytest.mark.parametrize('business_size', ['banana', '', 'small', 12])
+def test_quote_rejects_unknown_business_size(client, business_size):
+    status, body = client.post('/quote', {'business_size': business_size, 'monthly_revenue': 1000})
+    assert status == 422
+    assert 'business_size' in body['error']
+
+
+def test_batch_reports_the_scenario_with_an_unknown_business_size(client):
+    scenarios = [{'business_size': BUSINESS_SIZES[0], 'monthly_revenue': 1000},
+                 {'business_size': 'banana', 'monthly_revenue': 1000}]
+    status, body = client.post('/quotes', {'scenarios': scenarios})
+    assert status == 422
+    assert body['error'].startswith('scenarios[1]:')
@@ -0,0 +1,69 @@
+"""Month-by-month simulation with plan upgrades."""
+import numpy as np
+import pytest
+
+from ecommerce_costs import compute_platform_costs, get_compiled_catalog, project_profits, simulate_plan_upgrades
+from ecommerce_costs.optimizer import build_plan_optimizer
+from ecommerce_costs.simulation import simulate_upgrades, upgrade_timeline
+
+SIZE = "Startup (0-100 products)"
+
+
+def simulate(monthly_revenue, growth_rate, projection_months, migration_cost):
+    catalog = get_compiled_catalog()
+    platform_costs = compute_platform_costs(catalog, monthly_revenue, SIZE)
+    return platform_costs, simulate_plan_upgrades(catalog, SIZE, platform_costs, monthly_revenue, growth_rate,
+                                                  projection_months, migration_cost)
+
+
+@pytest.mark.parametrize('monthly_revenue', [0, 500, 2_000, 4_000])
+def test_no_growth_and_no_upgrades_is_the_static_projection(monthly_revenue):
+    # Below every sales cap, and migrations too dear to ever pay back
+    platform_costs, simulation = simulate(monthly_revenue, 0, 12, 1e12)
+    assert not simulation.forced.any()
+    assert (simulation.plan == simulation.start_plan[:, None]).all()
+
+    static = project_profits(platform_costs, monthly_revenue, 0, 12)
+    np.testing.assert_allclose(simulation.projection.cumulative_profit, static.cumulative_profit, rtol=1e-12)
+    np.testing.assert_array_equal(simulation.projection.break_even_month, static.break_even_month)
+
+
+@pytest.mark.parametrize('monthly_revenue, growth_rate', [(5_000, 0), (4_000, 2), (20_000, 3), (1_000, 15)])
+def test_forced_upgrade_when_trailing_sales_pass_the_cap(monthly_revenue, growth_rate):
+    catalog = get_compiled_catalog()
+    p = catalog.platforms.index('BigCommerce')
+    standard_cap = catalog.revenue_limit[p, catalog.plans[p].index('Standard')]
+    months = 36
+    revenue = monthly_revenue * (1 + growth_rate / 100) ** np.arange(1, months + 1)
+    trailing = [revenue[max(0, m - 11):m + 1].sum() for m in range(months)]
+    expected = next(m + 1 for m in range(months) if trailing[m] > standard_cap)
+
+    _, simulation = simulate(monthly_revenue, growth_rate, months, 1e12)
+    events = [e for e in upgrade_timeline(simulation, catalog) if e['platform'] == 'BigCommerce']
+    assert events[0]['month'] == expected
+    assert events[0]['from_plan'] == 'Standard' and events[0]['reason'] == 'revenue cap'
+    assert simulation.forced[p, expected - 1] and not simulation.forced[p, :expected - 1].any()
+
+
+def test_plans_never_go_down():
+    rng = np.random.default_rng(3)
+    optimizer = build_plan_optimizer(get_compiled_catalog(), SIZE)
+    simulation = simulate_upgrades(optimizer, rng.uniform(0, 100_000, 200), rng.uniform(-20, 30, 200), 36,
+                                   migration_cost=rng.uniform(0, 2_000))
+    assert (np.diff(simulation.plan, axis=-1) >= 0).all()
+    assert (simulation.plan >= simulation.start_plan[..., None]).all()
+
+
+def test_upgrade_timeline_reasons():
+    catalog = get_compiled_catalog()
+    _, simulation = simulate(20_000, 3, 24, 0)
+    events = upgrade_timeline(simulation, catalog)
+
+    assert [e['month'] for e in events] == sorted(e['month'] for e in events)
+    assert {e['reason'] for e in events} == {'revenue cap', 'lower cost'}
+    for event in events:
+        p, m = catalog.platforms.index(event['platform']), event['month'] - 1
+        assert simulation.forced[p, m] == (event['reason'] == 'revenue cap')
+        assert catalog.plan_name(p, simulation.plan[p, m]) == event['to_plan']
+    bigcommerce = [(e['from_plan'], e['to_plan']) for e in events if e['platform'] == 'BigCommerce']
+    assert bigcommerce == [('Standard', 'Plus'), ('Plus', 'Pro'), ('Pro', 'Enterprise')]
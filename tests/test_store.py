@@ -0,0 +1,108 @@
+"""The persistent result store."""
+import os
+import shutil
+
+import pytest
+
+from ecommerce_costs import store as store_module
+from ecommerce_costs.catalog import DEFAULT_PRICING_PATH, catalog_version
+from ecommerce_costs.store import ResultStore, persistent
+
+
+@pytest.fixture
+def result_store(tmp_path, monkeypatch):
+    result_store = ResultStore(tmp_path / 'results.sqlite3')
+    monkeypatch.setattr(store_module, '_store', result_store)
+    return result_store
+
+
+def test_store_is_off_unless_configured(monkeypatch, tmp_path):
+    monkeypatch.setattr(store_module, '_store', store_module._MISSING)
+    monkeypatch.delenv(store_module.STORE_PATH_ENV, raising=False)
+    assert store_module.get_store() is None
+
+    monkeypatch.setattr(store_module, '_store', store_module._MISSING)
+    monkeypatch.setenv(store_module.STORE_PATH_ENV, str(tmp_path / 'on.sqlite3'))
+    assert store_module.get_store().path == tmp_path / 'on.sqlite3'
+
+
+def test_catalog_versions_coexist(tmp_path):
+    path = tmp_path / 'shared.sqlite3'
+    dashboard, service = ResultStore(path), ResultStore(path)
+    dashboard.put('a', 'ns', 'v1', 'dashboard result')
+    dashboard.flush()
+    service.put('b', 'ns', 'v2', 'service result')
+    service.flush()
+    # Each process still finds its own rows after the other wrote another version
+    assert dashboard.get('a', 'v1') == 'dashboard result'
+    assert service.get('b', 'v2') == 'service result'
+    assert dashboard.get('b', 'v1') is None
+    assert dashboard.stats()['rows'] == 2
+
+
+def test_code_changes_retire_stored_results(result_store, monkeypatch):
+    calls = []
+
+    @persistent
+    def double(x, catalog_version=None):
+        calls.append(x)
+        return 2 * x
+
+    monkeypatch.setattr(store_module, '_catalog_version', lambda args, kwargs: 'v1')
+    assert double(4) == 8 and double(4) == 8
+    assert calls == [4]
+
+    monkeypatch.setattr(store_module, 'code_version', lambda: 'changed')
+    assert double(4) == 8
+    assert calls == [4, 4]
+
+
+def test_least_recently_used_rows_are_evicted(tmp_path):
+    result_store = ResultStore(tmp_path / 'small.sqlite3', max_bytes=2_000)
+    for i in range(20):
+        result_store.put(f'k{i}', 'ns', 'v1' if i < 10 else 'v2', b'x' * 200)
+        result_store.flush()
+    assert result_store.stats()['bytes'] <= 2_000
+    assert result_store.get('k19', 'v2') == b'x' * 200
+    assert result_store.get('k0', 'v1') is None
+
+
+def test_replacing_a_key_does_not_grow_the_byte_count(tmp_path):
+    result_store = ResultStore(tmp_path / 'replace.sqlite3')
+    for size in (500, 300, 300):
+        result_store.put('k', 'ns', 'v1', b'x' * size)
+        result_store.flush()
+    assert result_store.stats()['rows'] == 1
+    assert result_store.stats()['bytes'] == ResultStore(result_store.path).stats()['bytes'] < 500
+
+
+def test_purge_deletes_superseded_versions(tmp_path):
+    result_store = ResultStore(tmp_path / 'purge.sqlite3')
+    for i, version in enumerate(['v1', 'v1', 'v2', 'v3']):
+        result_store.put(f'k{i}', 'ns', version, b'x' * 100)
+    result_store.flush()
+    result_store.put('pending', 'ns', 'v1', b'x' * 100)
+
+    assert result_store.drop_version('v1') == 2
+    assert result_store.purge(keep=['v3']) == 1
+    result_store.flush()
+    assert result_store.stats()['rows'] == 1
+    assert result_store.get('k3', 'v3') == b'x' * 100
+    assert result_store.get('pending', 'v1') is None
+    assert result_store.stats()['bytes'] == ResultStore(result_store.path).stats()['bytes']
+
+
+def test_catalog_reload_drops_the_replaced_version(result_store, tmp_path):
+    pricing = tmp_path / 'pricing.toml'
+    shutil.copyfile(DEFAULT_PRICING_PATH, pricing)
+    pricing.write_text(pricing.read_text().replace('Basic = { monthly = 39,', 'Basic = { monthly = 41,', 1))
+    old = catalog_version(pricing)
+    result_store.put('old', 'ns', old, 'stale')
+    result_store.put('other', 'ns', 'elsewhere', 'kept')
+    result_store.flush()
+
+    pricing.write_text(pricing.read_text().replace('monthly = 41,', 'monthly = 43,', 1))
+    os.utime(pricing, ns=(pricing.stat().st_atime_ns, pricing.stat().st_mtime_ns + 1_000_000_000))
+    assert catalog_version(pricing) != old
+    assert result_store.get('old', old) is None
+    assert result_store.get('other', 'elsewhere') == 'kept'
@@ -0,0 +1,88 @@
+"""Scenario workspace: incremental evaluation and the comparison views."""
+import dataclasses
+
+import numpy as np
+import pytest
+
+from ecommerce_costs import compute_platform_costs, get_compiled_catalog
+from ecommerce_costs.cache import clear_caches
+from ecommerce_costs.workspace import METRICS, Scenario, ScenarioWorkspace
+
+
+@pytest.fixture(autouse=True)
+def fresh_caches():
+    # Results are shared process-wide; start every test from nothing
+    clear_caches()
+    yield
+    clear_caches()
+
+
+def workspace():
+    return ScenarioWorkspace([
+        Scenario('Today', 5_000, "Startup (0-100 products)", market_focus=('Qatar',)),
+        Scenario('Next year', 12_000, "Small Business (100-1,000 products)", growth_rate=5.0, projection_months=24),
+        Scenario('Scale', 80_000, "Medium Business (1,000-10,000 products)", 'cheapest',
+                 monthly_traffic=200_000, num_products=5_000),
+    ])
+
+
+def test_first_evaluation_prices_every_scenario():
+    ws = workspace()
+    results = ws.evaluate(get_compiled_catalog())
+    assert list(results) == ['Today', 'Next year', 'Scale']
+    assert ws.evaluated == ['Today', 'Next year', 'Scale']
+
+
+def test_results_match_the_dashboard_pricing():
+    catalog = get_compiled_catalog()
+    ws = workspace()
+    results = ws.evaluate(catalog)
+    for name, scenario in ws.scenarios.items():
+        costs = compute_platform_costs(catalog, scenario.monthly_revenue, scenario.business_size,
+                                       scenario.plan_selection, monthly_traffic=scenario.monthly_traffic,
+                                       num_products=scenario.num_products)
+        np.testing.assert_allclose(results[name].total_monthly, [c['total_monthly'] for c in costs.values()])
+
+
+def test_editing_a_scenario_prices_only_that_scenario():
+    catalog = get_compiled_catalog()
+    ws = workspace()
+    ws.evaluate(catalog)
+    ws.save(dataclasses.replace(ws.scenarios['Next year'], monthly_revenue=15_000))
+    ws.evaluate(catalog)
+    assert ws.evaluated == ['Next year']
+    ws.evaluate(catalog)
+    assert ws.evaluated == []
+
+
+def test_renaming_or_changing_market_recomputes_nothing():
+    catalog = get_compiled_catalog()
+    ws = workspace()
+    before = ws.evaluate(catalog)
+
+    ws.save(dataclasses.replace(ws.scenarios['Today'], market_focus=('Qatar', 'GCC')))
+    ws.evaluate(catalog)
+    assert ws.evaluated == []
+
+    renamed = dataclasses.replace(ws.scenarios['Scale'], name='Scale (renamed)')
+    ws.replace_all([ws.scenarios['Today'], ws.scenarios['Next year'], renamed])
+    after = ws.evaluate(catalog)
+    assert ws.evaluated == []
+    assert after['Scale (renamed)'] is before['Scale']
+
+
+@pytest.mark.parametrize('metric', list(METRICS))
+def test_deltas_are_comparison_minus_baseline(metric):
+    catalog = get_compiled_catalog()
+    ws = workspace()
+    comparison = ws.comparison(catalog, metric)
+    assert comparison.shape == (len(ws), len(catalog.platforms))
+    np.testing.assert_array_equal(ws.deltas(catalog, metric, 'Next year'), comparison - comparison[1])
+
+
+def test_unknown_metric_and_baseline():
+    ws = workspace()
+    with pytest.raises(ValueError):
+        ws.comparison(get_compiled_catalog(), 'profit')
+    with pytest.raises(KeyError):
+        ws.deltas(get_compiled_catalog(), 'annual_cost', 'Nope')